@@ -7,92 +7,149 @@ st.set_page_config(
     menu_items=None
 )
 from config.styles import CSS_STYLES
-from utils.data_processing import load_and_preprocess_data, filter_dataframe, create_dataset
-from utils.metrics import (calculate_ytd_metrics, 
-                            calculate_yearly_target,
-                            calculate_downloads_metrics, 
-                            calculate_mau_metrics,
-                            create_metric_card)
-from utils.visualizations import create_agent_performance_chart
-import os
+from utils.indexes import centers_for_units
+from utils.instrumentation import debug_enabled, record_payload, rerun_trace, show_debug_panel, span
+from utils.memo import memoized_selection, memoized_series, selection_key
+from utils.metrics import create_metric_card
+from utils.partitions import default_units, get_partition_cache
+from utils.ranking import rank_agents
+from utils.store import current_source
+from utils.trends import PERIOD_PRESETS, RESAMPLE_RULES, delta_label, period_label, preset_range
+from utils.visualizations import agent_chart_spec, series_chart_spec
 
-def main():
+def render():
     st.logo(image="images/mtnlong.jpg", size="large")
     
     st.markdown(CSS_STYLES, unsafe_allow_html=True)
     
-    df = load_and_preprocess_data("data/mymtn.csv")
-    
-    dataset_path = "mtnghana/mymtn"
-    if not os.path.exists(os.path.join("datasets", dataset_path)) or not os.path.isfile(os.path.join("datasets", dataset_path, 'data.parquet')):
-        create_dataset(df)
+    source = current_source()
+    partitions = get_partition_cache(source)
+    available_units = partitions.units()
+    requested_units = [unit for value in st.query_params.get_all("region") for unit in value.split(",")]
     
     with st.sidebar:
         st.title("MyMTN Dashboard")
         st.header("Filters")
         
-        business_units = ["All"] + sorted(df['salesbusinessunitname'].unique().tolist())
+        business_units = ["All"] + available_units
+        # Seeded once from ?region=; afterwards the widget owns its state.
+        # A changing default would reset the widget and drop every other change.
+        if "units" not in st.session_state:
+            st.session_state["units"] = default_units(available_units, requested_units)
         selected_units = st.multiselect(
             "Select Business Unit(s)",
             business_units,
-            default=["All"]
+            key="units"
         )
+        st.query_params["region"] = ",".join(selected_units)
         
-        if "All" in selected_units:
-            available_centers = df['servicecentername'].unique()
-        else:
-            available_centers = df[df['salesbusinessunitname'].isin(selected_units)]['servicecentername'].unique()
+        with span("partitions.cube_for"):
+            cube = partitions.cube_for(selected_units)
+        
+        available_centers = centers_for_units(cube.agents_index, selected_units)
         
         selected_centers = st.multiselect(
             "Select Service Center(s)",
-            ["All"] + sorted(available_centers.tolist()),
+            ["All"] + available_centers,
             default=["All"]
         )
+        
+        date_range = None
+        if not cube.daily.empty:
+            first_date, latest_date = cube.daily.index[0], cube.daily.index[-1]
+            period = st.selectbox("Period", PERIOD_PRESETS)
+            date_range = preset_range(period, latest_date)
+            if period == "Custom":
+                picked = st.date_input(
+                    "Date range",
+                    value=(first_date, latest_date),
+                    min_value=first_date,
+                    max_value=latest_date
+                )
+                if len(picked) == 2:
+                    date_range = picked
     
-    filtered_df = filter_dataframe(df, selected_units, selected_centers)
+    with span("memoized_selection"):
+        filtered_df, metrics = memoized_selection(cube, selected_units, selected_centers, date_range)
     
     if filtered_df.empty:
         st.warning("No data available for the selected filters. Please adjust your selection.")
     
-    ytd_achieved, ytd_delta, ytd_delta_pct = calculate_ytd_metrics(filtered_df)
-    yearly_target, target_delta, target_delta_pct = calculate_yearly_target(filtered_df)
-    downloads, downloads_delta, downloads_delta_pct = calculate_downloads_metrics(filtered_df)
-    mau, mau_delta, mau_delta_pct = calculate_mau_metrics(filtered_df)
+    ytd_achieved, ytd_delta, ytd_delta_pct = metrics["ytd"]
+    yearly_target, target_delta, target_delta_pct = metrics["yearly_target"]
+    # No target for this selection: the target card holds the 1.2x estimate instead.
+    estimated = target_delta is None
+    downloads, downloads_delta, downloads_delta_pct = metrics["downloads"]
+    mau, mau_delta, mau_delta_pct = metrics["mau"]
     
     cols = st.columns(4)
     
     create_metric_card(
         cols[0],
-        "YTD Achieved",
+        "YTD Achieved (vs estimate)" if estimated else "YTD Achieved",
         ytd_achieved,
-        is_percentage=True
+        is_percentage=True,
+        delta=(ytd_delta, ytd_delta_pct),
+        delta_label="vs last YTD"
     )
     
     create_metric_card(
         cols[1],
-        "Yearly Target",
-        yearly_target
+        "Yearly Target (estimate)" if estimated else "Yearly Target",
+        yearly_target,
+        delta=None if estimated else (target_delta, target_delta_pct),
+        delta_label="projected vs target"
     )
     
     create_metric_card(
         cols[2],
-        "Downloads",
-        downloads
+        f"Downloads ({period_label(date_range)})",
+        downloads,
+        delta=(downloads_delta, downloads_delta_pct),
+        delta_label=delta_label(date_range)
     )
     
     create_metric_card(
         cols[3],
-        "MAU",
-        mau
+        f"MAU ({period_label(date_range)})",
+        mau,
+        delta=(mau_delta, mau_delta_pct),
+        delta_label=delta_label(date_range)
     )
     
+    frequency = st.radio("Granularity", list(RESAMPLE_RULES), horizontal=True, format_func=str.title)
+    st.markdown(f'<div class="chart-title">{frequency.title()} Trend</div>', unsafe_allow_html=True)
+    series = memoized_series(cube, selected_units, selected_centers, date_range, frequency)
+    chart_trend = series_chart_spec(
+        series,
+        key=selection_key(cube, selected_units, selected_centers, date_range) + (frequency,) if cube.version else None
+    )
+    with span("plotly_chart.trend"):
+        st.plotly_chart(chart_trend.figure, use_container_width=True, key="trend")
+    
+    with span("rank_agents"):
+        top_agents, bottom_agents = rank_agents(filtered_df, n_agents=5)
+    
     st.markdown('<div class="chart-title">Top 5 Agents Performance</div>', unsafe_allow_html=True)
-    fig_top = create_agent_performance_chart(filtered_df, n_agents=5, direction=False)
-    st.plotly_chart(fig_top, use_container_width=True, key="top_agents")
+    chart_top = agent_chart_spec(top_agents)
+    with span("plotly_chart.top_agents"):
+        st.plotly_chart(chart_top.figure, use_container_width=True, key="top_agents")
+    if debug_enabled():
+        record_payload("plotly.top_agents", chart_top.payload_bytes)
 
     st.markdown('<div class="chart-title">Bottom 5 Agents Performance</div>', unsafe_allow_html=True)
-    fig_bottom = create_agent_performance_chart(filtered_df, n_agents=5, direction=True)
-    st.plotly_chart(fig_bottom, use_container_width=True, key="bottom_agents")
+    chart_bottom = agent_chart_spec(bottom_agents)
+    with span("plotly_chart.bottom_agents"):
+        st.plotly_chart(chart_bottom.figure, use_container_width=True, key="bottom_agents")
+    if debug_enabled():
+        record_payload("plotly.trend", chart_trend.payload_bytes)
+        record_payload("plotly.bottom_agents", chart_bottom.payload_bytes)
+
+def main():
+    with rerun_trace("dashboard") as trace:
+        render()
+        if debug_enabled():
+            show_debug_panel(trace)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
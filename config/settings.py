@@ -0,0 +1,71 @@
+import os
+from typing import Optional, Tuple
+
+def _regions(value: str) -> Optional[Tuple[str, ...]]:
+    """Parse a comma-separated region list; "*" (or empty) means every region"""
+    regions = tuple(region.strip() for region in value.split(",") if region.strip())
+    if not regions or regions == ("*",):
+        return None
+    return regions
+
+# Raw extract used when no partitioned store has been ingested yet.
+DATA_SOURCE = os.getenv("MYMTN_DATA_SOURCE", "data/mymtn.csv")
+
+# Partitioned store written by `python -m utils.ingest`.
+STORE_DIR = os.getenv("MYMTN_STORE_DIR", os.path.join("data", "store"))
+
+# Business units this deployment serves. None serves every unit in the data.
+REGIONS = _regions(os.getenv("MYMTN_REGIONS", "*"))
+
+# Units pre-selected in the sidebar when the URL has no ?region= query param.
+# None falls back to the first available unit.
+DEFAULT_REGIONS = _regions(os.getenv("MYMTN_DEFAULT_REGIONS", "Eastern Volta"))
+
+# Upper bound on memory held by lazily loaded region partitions per process.
+PARTITION_MEMORY_BUDGET_MB = int(os.getenv("MYMTN_PARTITION_MEMORY_MB", "512"))
+
+# Y'ello Agent response cache. Set the fuzzy threshold (0-1, e.g. 0.92) to also
+# reuse answers for near-identical questions; leave empty for exact matches only.
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("MYMTN_RESPONSE_CACHE_ENTRIES", "512"))
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("MYMTN_RESPONSE_CACHE_TTL", "3600"))
+RESPONSE_CACHE_FUZZY_THRESHOLD = float(os.getenv("MYMTN_RESPONSE_CACHE_FUZZY", "0") or 0) or None
+
+# Y'ello Agent worker pool: concurrent LLM calls per process, jobs allowed
+# in flight (queued or still running), and the per-question timeout.
+AGENT_MAX_WORKERS = int(os.getenv("MYMTN_AGENT_WORKERS", "4"))
+AGENT_MAX_QUEUED = int(os.getenv("MYMTN_AGENT_QUEUE", "32"))
+AGENT_TIMEOUT_SECONDS = int(os.getenv("MYMTN_AGENT_TIMEOUT", "120"))
+# pandasai dataset handles shared by those workers (each holds its own copy).
+AGENT_POOL_SIZE = int(os.getenv("MYMTN_AGENT_POOL_SIZE", "2"))
+
+# Chat turns kept on the Y'ello Agent page; older turns are paged in on demand.
+CHAT_HISTORY_WINDOW = int(os.getenv("MYMTN_CHAT_HISTORY_WINDOW", "30"))
+
+# Chart artifacts served from static/charts: total size cap and maximum age.
+ARTIFACT_MAX_MB = int(os.getenv("MYMTN_ARTIFACT_MAX_MB", "256"))
+ARTIFACT_MAX_AGE_HOURS = float(os.getenv("MYMTN_ARTIFACT_MAX_AGE_HOURS", "24"))
+
+# Full agent result tables kept for paging and download, and rows per page.
+RESULT_STORE_MB = int(os.getenv("MYMTN_RESULT_STORE_MB", "128"))
+RESULT_PAGE_ROWS = int(os.getenv("MYMTN_RESULT_PAGE_ROWS", "10"))
+
+# Yearly download targets per unit, center or agent (see utils/targets.py).
+# Without this file the dashboard falls back to an estimated target.
+TARGETS_SOURCE = os.getenv("MYMTN_TARGETS_SOURCE", os.path.join("data", "targets.csv"))
+
+# Instrumentation: Prometheus text file refreshed at most every interval
+# (empty disables it), and the opt-in sidebar debug panel (also ?debug=1).
+METRICS_FILE = os.getenv("MYMTN_METRICS_FILE", "")
+METRICS_FILE_INTERVAL_SECONDS = float(os.getenv("MYMTN_METRICS_FILE_INTERVAL", "10"))
+DEBUG_PANEL = os.getenv("MYMTN_DEBUG_PANEL", "0") == "1"
+
+# Line charts: points kept per trace after downsampling, and the trace length
+# above which they are drawn with WebGL.
+CHART_MAX_POINTS = int(os.getenv("MYMTN_CHART_MAX_POINTS", "2000"))
+CHART_WEBGL_POINTS = int(os.getenv("MYMTN_CHART_WEBGL_POINTS", "1000"))
+
+# Shared read-only data: directory a loader process (python -m utils.shared)
+# publishes generations into, and how many generations it keeps on disk.
+# Empty disables shared mode; each process then loads its own copy.
+SHARED_DIR = os.getenv("MYMTN_SHARED_DIR", "")
+SHARED_KEEP_GENERATIONS = int(os.getenv("MYMTN_SHARED_KEEP_GENERATIONS", "2"))
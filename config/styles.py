@@ -31,6 +31,10 @@ CSS_STYLES = """
         }
         .chat-icon {
             border-radius: 5px;
+            width: 32px;
+            height: 32px;
+            flex-shrink: 0;
+            background-size: cover;
         }
         [data-testid="stFormSubmitButton"] button {
             background-color: #FECA05;
@@ -72,7 +76,8 @@ CSS_STYLES = """
             word-break: break-word;
         }
         .metric-delta-positive,
-        .metric-delta-negative {
+        .metric-delta-negative,
+        .metric-delta-neutral {
             font-size: clamp(0.75rem, 2vw, 1rem);
             display: inline-block;
             margin-top: 0.5rem;
@@ -93,6 +98,10 @@ CSS_STYLES = """
             background-color: #991B1B;
             color: #FCA5A5;
         }
+        .metric-delta-neutral {
+            background-color: #374151;
+            color: #D1D5DB;
+        }
         .stColumn {
             padding: 0.5rem !important;
         }
@@ -108,7 +117,8 @@ CSS_STYLES = """
             font-size: 1.5rem;
         }
         .metric-delta-positive,
-        .metric-delta-negative {
+        .metric-delta-negative,
+        .metric-delta-neutral {
             font-size: 0.75rem;
         }
         .stColumn {
@@ -7,12 +7,23 @@ st.set_page_config(
         menu_items=None
     )
 import streamlit.components.v1 as components
+from config.settings import CHAT_HISTORY_WINDOW
 from config.styles import CSS_STYLES
 import base64
 import os
-from utils.data_processing import load_and_preprocess_data, create_dataset
-from utils.agent import generate_response
+import uuid
+from functools import partial
+from utils.bootstrap import dataset_current, dataset_ready, dataset_fingerprint, start_background_bootstrap
+from utils.response_cache import get_response_cache
+from utils.agent import generate_response, get_agent_service
+from utils.services import warm_up
+from utils.store import current_source, source_version
+from utils.artifacts import store_artifact
+from utils.results import get_result_store, page_count, result_page
+from utils.instrumentation import debug_enabled, rerun_trace, show_debug_panel, timed
+from utils.jobs import get_job_queue, DONE, FAILED, RENDERING, STATUS_LABELS, TIMED_OUT
 
+@timed()
 def process_response(response):
     """Handle different pandasai response types using class name detection"""
     response_type = response.__class__.__name__
@@ -25,16 +36,19 @@ def process_response(response):
             return f"📊 Result: {response.value:,}"
             
         elif response_type == 'DataFrameResponse':
+            df = response.value
             return (
                 "📋 Data Overview:",
-                response.value.head().to_html(classes='styled-table', index=False, border=0, justify='center')
+                {
+                    "result_id": get_result_store().put(df),
+                    "rows": len(df),
+                    "html": table_html(result_page(df))
+                }
             )
             
         elif response_type == 'ChartResponse':
             if os.path.exists(response.value):
-                with open(response.value, "rb") as img_file:
-                    base64_img = base64.b64encode(img_file.read()).decode()
-                return f'<img src="data:image/png;base64,{base64_img}" style="max-width: 100%;">'
+                return f'<img src="{store_artifact(response.value)}" style="max-width: 100%;">'
             return "📊 Chart generated but couldn't load image"
             
         elif response_type == 'ErrorResponse':
@@ -46,7 +60,85 @@ def process_response(response):
     except Exception as e:
         return f"⚠️ Error processing response: {str(e)}"
 
+def table_html(df):
+    return df.to_html(classes='styled-table', index=False, border=0, justify='center')
+
+def is_cacheable(response):
+    """Only successful pandasai answers are worth reusing; errors come back as plain strings"""
+    return not isinstance(response, str) and response.__class__.__name__ != 'ErrorResponse'
+
+def append_assistant_message(processed_content):
+    """Append a processed answer (text, or a (caption, html or result table) pair) to the chat history"""
+    if isinstance(processed_content, tuple) and isinstance(processed_content[1], dict):
+        table = processed_content[1]
+        st.session_state.messages.append({
+            "role": "assistant",
+            "content": processed_content[0],
+            "type": "text"
+        })
+        st.session_state.messages.append({
+            "role": "assistant",
+            "content": table["html"],
+            "result_id": table["result_id"],
+            "rows": table["rows"],
+            "type": "table"
+        })
+    elif isinstance(processed_content, tuple):
+        st.session_state.messages.append({
+            "role": "assistant",
+            "content": processed_content[0],
+            "type": "text"
+        })
+        st.session_state.messages.append({
+            "role": "assistant",
+            "content": processed_content[1],
+            "type": "html"
+        })
+    else:
+        st.session_state.messages.append({
+            "role": "assistant",
+            "content": processed_content,
+            "type": "text"
+        })
+
+def answer_question(job, question, version, response_cache):
+    """Worker-side pipeline for one question; runs on the agent pool, off the script thread"""
+    raw_response = generate_response(question)
+    job.set_status(RENDERING)
+    processed_content = process_response(raw_response) if raw_response else None
+    if processed_content and is_cacheable(raw_response):
+        response_cache.put(question, version, processed_content)
+    return processed_content
+
+@st.fragment(run_every=1)
+def show_pending_job():
+    """Poll the pending agent job, showing its progress until the answer can be appended"""
+    job_queue = get_job_queue()
+    job_id = st.session_state.pending_job
+    job = job_queue.get(job_id)
+    
+    if job is None or job.finished:
+        del st.session_state.pending_job
+        job_queue.pop(job_id)
+        if job is None or job.status == FAILED:
+            append_assistant_message("An error occurred while generating a response.")
+        elif job.status == TIMED_OUT:
+            append_assistant_message("⌛ That question took too long to answer. Please try a simpler one.")
+        elif job.status == DONE and job.result:
+            append_assistant_message(job.result)
+        st.rerun()
+    
+    cols = st.columns((0.9, 0.1))
+    cols[0].markdown(
+        create_chat_html("assistant", f"⏳ {STATUS_LABELS[job.status]}"),
+        unsafe_allow_html=True
+    )
+    if cols[1].button("Cancel", key="cancel-job"):
+        job_queue.cancel(job_id)
+
 def initialize_chat_history():
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
     if "messages" not in st.session_state:
         st.session_state.messages = [
             {"role": "assistant", "content": "Hello! I'm Y'ello Agent, your friendly MTN assistant. How can I help you today?"}
@@ -55,23 +147,85 @@ def initialize_chat_history():
 def get_image_base64(image_path):
     with open(image_path, "rb") as img_file:
         return base64.b64encode(img_file.read()).decode()
-    
-def create_chat_html(role, content):
+
+@st.cache_resource
+def get_avatar_css():
+    """Avatar images are read and encoded once per process and sent once per page, as CSS classes"""
     user_icon = get_image_base64("images/user_icon.png")
     bot_icon = get_image_base64("images/bot_icon.png")
     return f"""
+    <style>
+        .user-icon {{ background-image: url(data:image/png;base64,{user_icon}); }}
+        .assistant-icon {{ background-image: url(data:image/png;base64,{bot_icon}); }}
+    </style>
+    """
+    
+def create_chat_html(role, content):
+    icon = 'user-icon' if role == 'user' else 'assistant-icon'
+    return f"""
     <div class="chat-row {'row-reverse' if role == 'user' else ''}">
-        <img class="chat-icon" src="data:image/png;base64,{user_icon if role == 'user' else bot_icon}" width=32 height=32>
+        <div class="chat-icon {icon}"></div>
         <div class="chat-bubble {role}-bubble">
             {content}
         </div>
     </div>
     """
 
-def main():
+def render_message(message):
+    """HTML for one chat message, rendered once; messages are never edited after they are appended"""
+    if "html" not in message:
+        if message.get("type") in ("html", "table"):
+            message["html"] = message["content"]
+        else:
+            message["html"] = create_chat_html(message["role"], message["content"])
+    return message["html"]
+
+def show_chat_history():
+    """Render the newest window of the conversation, with older turns paged in on demand"""
+    messages = st.session_state.messages
+    window = st.session_state.setdefault("history_window", CHAT_HISTORY_WINDOW)
+    hidden = max(len(messages) - window, 0)
+    
+    if hidden and st.button(f"Show {min(hidden, CHAT_HISTORY_WINDOW)} earlier messages", key="show-earlier"):
+        st.session_state.history_window += CHAT_HISTORY_WINDOW
+        st.rerun()
+    
+    for position, message in enumerate(messages[hidden:], start=hidden):
+        if message.get("type") == "table":
+            show_result_table(message, key=f"result-{position}")
+        else:
+            st.markdown(render_message(message), unsafe_allow_html=True)
+
+def show_result_table(message, key):
+    """Page, sort and download a stored result table without asking the agent again"""
+    df = get_result_store().get(message["result_id"]) if message.get("result_id") else None
+    if df is None:
+        st.markdown(render_message(message), unsafe_allow_html=True)
+        return
+    
+    cols = st.columns((0.35, 0.2, 0.2, 0.25))
+    sort_by = cols[0].selectbox("Sort by", ["—", *df.columns], key=f"{key}-sort", label_visibility="collapsed")
+    descending = cols[1].toggle("Descending", key=f"{key}-desc")
+    page = cols[2].number_input(
+        "Page", min_value=1, max_value=page_count(len(df)), value=1,
+        key=f"{key}-page", label_visibility="collapsed"
+    )
+    cols[3].download_button(
+        f"⬇️ CSV ({len(df):,} rows)",
+        data=lambda: df.to_csv(index=False),
+        file_name=f"result-{message['result_id'][:8]}.csv",
+        mime="text/csv",
+        key=f"{key}-csv",
+        on_click="ignore"
+    )
+    page_df = result_page(df, page, None if sort_by == "—" else sort_by, ascending=not descending)
+    st.markdown(table_html(page_df), unsafe_allow_html=True)
+
+def render():
     st.logo(image="images/mtnlong.jpg", size="large")
     
     st.markdown(CSS_STYLES, unsafe_allow_html=True)
+    st.markdown(get_avatar_css(), unsafe_allow_html=True)
     
     with st.sidebar:
         st.title("Y'ello Agent:bee:")
@@ -98,19 +252,24 @@ def main():
         
     st.title("Hey! I'm Y'ello Agent!:bee:")
     
+    source = current_source()
+    if not dataset_current(source):
+        # Only this page loads pandasai; the dashboard leaves publishing to it and the CLI.
+        start_background_bootstrap(source, source_version(source))
+    
+    if not dataset_ready():
+        st.info("The agent dataset is still being prepared. Answers will be available once it is published.")
+    elif get_agent_service(dataset_fingerprint()).health()["last_error"]:
+        st.warning("The agent dataset failed to load. It will be retried on the next question.")
+    else:
+        warm_up()
+    
     initialize_chat_history()
     
     chat_container = st.container()
     
     with chat_container:
-        for message in st.session_state.messages:
-            if message.get("type") == "html":
-                st.markdown(message["content"], unsafe_allow_html=True)
-            else:
-                st.markdown(
-                    create_chat_html(message["role"], message["content"]), 
-                    unsafe_allow_html=True
-                )
+        show_chat_history()
     
     for _ in range(3):
         st.markdown("")
@@ -124,32 +283,30 @@ def main():
         )
         submitted = cols[1].form_submit_button("Send", type="primary")
         
-        if submitted and user_input:
+        if submitted and user_input and "pending_job" not in st.session_state:
             st.session_state.messages.append({"role": "user", "content": user_input})
-            raw_response = generate_response(user_input)
             
-            if raw_response:
-                processed_content = process_response(raw_response)
-                
-                if isinstance(processed_content, tuple):
-                    st.session_state.messages.append({
-                        "role": "assistant",
-                        "content": processed_content[0],
-                        "type": "text"
-                    })
-                    st.session_state.messages.append({
-                        "role": "assistant",
-                        "content": processed_content[1],
-                        "type": "html"
-                    })
+            version = dataset_fingerprint()
+            processed_content = get_response_cache().get(user_input, version)
+            if processed_content is not None:
+                append_assistant_message(processed_content)
+            else:
+                job_id = get_job_queue().submit(
+                    st.session_state.session_id,
+                    user_input,
+                    partial(answer_question, question=user_input, version=version, response_cache=get_response_cache())
+                )
+                if job_id is None:
+                    append_assistant_message("🐝 I'm handling a lot of questions right now. Please try again in a moment.")
                 else:
-                    st.session_state.messages.append({
-                        "role": "assistant",
-                        "content": processed_content,
-                        "type": "text"
-                    })
+                    st.session_state.pending_job = job_id
                 
             st.rerun()
+        elif submitted and user_input:
+            st.toast("Please wait for the current answer before asking another question.")
+    
+    if "pending_job" in st.session_state:
+        show_pending_job()
     
     components.html("""
     <script>
@@ -166,5 +323,11 @@ def main():
     </script>
     """, height=0, width=0)
 
+def main():
+    with rerun_trace("agent") as trace:
+        render()
+        if debug_enabled():
+            show_debug_panel(trace)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
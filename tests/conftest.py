@@ -0,0 +1,63 @@
+import os
+import pandas as pd
+import pytest
+import utils.data_processing as data_processing
+from utils.benchmark import generate_extract
+
+@pytest.fixture(autouse=True)
+def isolated_cwd(tmp_path, monkeypatch):
+    """Run each test from a temp directory, so relative data/ and datasets/ paths stay out of the repo"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+@pytest.fixture
+def extract(tmp_path):
+    """A small synthetic raw extract with the real file's columns and quirks"""
+    return generate_extract(str(tmp_path / "extract.csv"), rows=5000, units=3, centers=9, agents=60, days=90)
+
+@pytest.fixture
+def reference(extract):
+    """The extract cleaned the slow, obvious way, for checking the optimized paths' numbers"""
+    df = pd.read_csv(extract)
+    df['salesbusinessunitname'] = df['salesbusinessunitname'].str.title().str.replace(r'\s*\([^)]*\)', '', regex=True)
+    for col in ['servicecentername', 'agentname']:
+        df[col] = df[col].str.title()
+    df[['salesbusinessunitname', 'servicecentername', 'agentname']] = (
+        df[['salesbusinessunitname', 'servicecentername', 'agentname']].fillna('N/A')
+    )
+    df['date_key'] = pd.to_datetime(df['date_key'].astype(str), format='%Y%m%d')
+    return df.rename(columns={'MAU': 'mau'})
+
+class FakeDataset:
+    def __init__(self, path):
+        self.path = path
+        self.pushed = False
+
+    def push(self):
+        self.pushed = True
+
+class FakePandasAI:
+    """Writes datasets the way pandasai does (datasets/<org>/<name>/data.parquet), without the dependency"""
+
+    def __init__(self):
+        self.loaded = []
+
+    def DataFrame(self, df):
+        return df
+
+    def create(self, path, df, **kwargs):
+        directory = os.path.join("datasets", path)
+        os.makedirs(directory)
+        df.to_parquet(os.path.join(directory, "data.parquet"))
+        return FakeDataset(path)
+
+    def load(self, path):
+        dataset = FakeDataset(path)
+        self.loaded.append(dataset)
+        return dataset
+
+@pytest.fixture
+def fake_pandasai(monkeypatch):
+    fake = FakePandasAI()
+    monkeypatch.setattr(data_processing, "pandasai", lambda: fake)
+    return fake
@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+import pytest
+import utils.agent as agent
+from utils.agent import AgentService, AgentUnavailable
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(agent, "LOAD_BACKOFF_SECONDS", 0)
+
+class Handle:
+    def chat(self, question):
+        return f"answer to {question}"
+
+def test_configure_failure_is_unavailable_and_cools_down(monkeypatch):
+    calls = []
+    def broken():
+        calls.append(1)
+        raise ImportError("no module named pandasai_openai")
+    monkeypatch.setattr(agent, "configure_llm", broken)
+    service = AgentService(path="org/name", pool_size=1)
+    with pytest.raises(AgentUnavailable):
+        service.chat("hi")
+    assert "pandasai_openai" in service.last_error
+    assert not service.ready()
+    with pytest.raises(AgentUnavailable):
+        service.chat("hi")
+    assert len(calls) == 1  # refused during the cool-down without retrying
+    assert service.health()["instances"] == 0
+
+def test_load_retries_then_reuses_the_handle(monkeypatch):
+    attempts = []
+    def load(path):
+        attempts.append(path)
+        if len(attempts) < 2:
+            raise OSError("backend down")
+        return Handle()
+    monkeypatch.setattr(agent, "configure_llm", lambda: SimpleNamespace(load=load))
+    service = AgentService(path="org/name", pool_size=1)
+    assert service.chat("q1") == "answer to q1"
+    assert service.chat("q2") == "answer to q2"
+    assert len(attempts) == 2
+    assert service.ready() and service.health()["in_use"] == 0
@@ -0,0 +1,53 @@
+import os
+import pytest
+from streamlit.testing.v1 import AppTest
+import utils.bootstrap as bootstrap
+from config.settings import CHAT_HISTORY_WINDOW
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AGENT_PAGE = os.path.join(ROOT, "pages", "1_🐝_Y'ello_Agent.py")
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """The agent page with the dataset treated as current, so no background bootstrap starts"""
+    os.symlink(os.path.join(ROOT, "images"), tmp_path / "images")
+    monkeypatch.setattr(bootstrap, "dataset_current", lambda source: True)
+    return AppTest.from_file(AGENT_PAGE, default_timeout=30)
+
+def _bubbles(app):
+    return [element.value for element in app.markdown if 'class="chat-row' in element.value]
+
+def _conversation(count):
+    return [
+        {"role": "user" if i % 2 else "assistant", "content": f"message {i}", "type": "text"}
+        for i in range(count)
+    ]
+
+def test_message_html_is_rendered_once(app):
+    app.session_state["messages"] = _conversation(3)
+    app.run()
+    messages = app.session_state["messages"]
+    assert all("html" in message for message in messages)
+    assert "message 1" in messages[1]["html"] and "user-bubble" in messages[1]["html"]
+
+    messages[1]["html"] = '<div class="chat-row">cached</div>'
+    app.run()
+    bubbles = _bubbles(app)
+    assert '<div class="chat-row">cached</div>' in bubbles
+    assert not any("message 1" in bubble for bubble in bubbles)
+
+def test_history_is_paged_in_windows(app):
+    total = CHAT_HISTORY_WINDOW + 5
+    app.session_state["messages"] = _conversation(total)
+    app.run()
+    bubbles = _bubbles(app)
+    assert len(bubbles) == CHAT_HISTORY_WINDOW
+    assert f"message {total - 1}" in bubbles[-1]
+    assert not any("message 0" in bubble for bubble in bubbles)
+    assert all("html" not in message for message in app.session_state["messages"][:5])
+
+    app.button(key="show-earlier").click().run()
+    bubbles = _bubbles(app)
+    assert len(bubbles) == total
+    assert "message 0" in bubbles[0]
+    assert not [button for button in app.button if button.key == "show-earlier"]
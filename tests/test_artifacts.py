@@ -0,0 +1,25 @@
+import os
+import time
+from utils.artifacts import STATIC_URL, cleanup_artifacts, store_artifact
+
+def _chart(path, content):
+    with open(path, "wb") as chart:
+        chart.write(content)
+    return str(path)
+
+def test_identical_charts_are_stored_once(tmp_path):
+    first = store_artifact(_chart(tmp_path / "a.png", b"chart"), "static")
+    second = store_artifact(_chart(tmp_path / "b.png", b"chart"), "static")
+    other = store_artifact(_chart(tmp_path / "c.png", b"other"), "static")
+    assert first == second != other
+    assert first.startswith(STATIC_URL + "/") and first.endswith(".png")
+    assert sorted(os.listdir("static")) == sorted(url.rsplit("/", 1)[1] for url in (first, other))
+
+def test_cleanup_removes_expired_then_oldest(tmp_path):
+    os.makedirs("static")
+    now = time.time()
+    for age, name in ((10, "new.png"), (200, "old.png"), (5000, "expired.png")):
+        path = _chart(os.path.join("static", name), b"x" * 100)
+        os.utime(path, (now - age, now - age))
+    assert cleanup_artifacts("static", max_bytes=150, max_age_seconds=3600) == 2
+    assert os.listdir("static") == ["new.png"]
@@ -0,0 +1,19 @@
+import os
+from utils.benchmark import generate_extract, run_benchmarks
+
+def test_benchmark_times_the_live_data_path(tmp_path):
+    path = generate_extract(str(tmp_path / "extract.csv"), rows=1000, units=2, centers=4, agents=20, days=10)
+    names = [case["name"] for case in run_benchmarks(path, repeat=1, history=5)]
+    for name in (
+        "cube.build_cube",
+        "cube.read_store_cube",
+        "partitions.cube_for.all.extract.cold",
+        "partitions.cube_for.all.store.warm",
+        "memo.compute_selection.one_unit",
+        "memo.compute_range.all.30_days",
+        "memo.memoized_selection.all.cached",
+        "chart.series_chart_spec.weekly.cached",
+    ):
+        assert name in names
+    # Snapshots and the store go to a temporary directory, not the caller's.
+    assert sorted(os.listdir(tmp_path)) == ["extract.csv"]
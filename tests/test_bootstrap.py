@@ -0,0 +1,54 @@
+import os
+import pandas as pd
+import utils.bootstrap as bootstrap
+from config.settings import REGIONS
+from utils.store import current_source, load_source
+
+def published_rows() -> int:
+    return len(pd.read_parquet(os.path.join(bootstrap.DATASET_DIR, "data.parquet")))
+
+def test_publish_swaps_the_live_path_atomically(extract, reference, fake_pandasai):
+    assert bootstrap.bootstrap_dataset(extract, force=True)
+    first = os.path.realpath(bootstrap.DATASET_DIR)
+    assert os.path.islink(bootstrap.DATASET_DIR)
+    assert published_rows() == len(reference)
+
+    assert bootstrap.bootstrap_dataset(extract, force=True)
+    second = os.path.realpath(bootstrap.DATASET_DIR)
+    assert second != first
+    # The previous version is kept for readers that opened it before the swap.
+    assert os.path.isdir(first)
+    assert published_rows() == len(reference)
+    assert all(dataset.pushed for dataset in fake_pandasai.loaded)
+    assert not os.path.exists(os.path.join("datasets", "mtnghana-staging"))
+
+def test_changed_source_is_republished(extract, fake_pandasai):
+    assert bootstrap.bootstrap_dataset(extract)
+    assert bootstrap.dataset_current(extract)
+    live = os.path.realpath(bootstrap.DATASET_DIR)
+    before = published_rows()
+
+    df = pd.read_csv(extract)
+    df.iloc[: len(df) // 2].to_csv(extract, index=False)
+    assert not bootstrap.dataset_current(extract)
+    assert bootstrap.bootstrap_dataset(extract)
+    assert bootstrap.dataset_current(extract)
+    assert os.path.realpath(bootstrap.DATASET_DIR) != live
+    assert 0 < published_rows() < before
+    assert published_rows() == len(load_source(extract, REGIONS))
+
+def test_cli_defaults_to_the_source_the_pages_read(extract, fake_pandasai, monkeypatch):
+    os.makedirs("data")
+    os.replace(extract, os.path.join("data", "mymtn.csv"))
+    monkeypatch.setattr("sys.argv", ["bootstrap"])
+    bootstrap.main()
+    assert bootstrap.dataset_current(current_source())
+
+def test_legacy_dataset_survives_the_first_swap(extract, fake_pandasai):
+    # Datasets published before versioning were plain directories under the live path.
+    os.makedirs(bootstrap.DATASET_DIR)
+    pd.DataFrame({"date_key": [1]}).to_parquet(os.path.join(bootstrap.DATASET_DIR, "data.parquet"))
+    assert bootstrap.bootstrap_dataset(extract, force=True)
+    assert os.path.islink(bootstrap.DATASET_DIR)
+    legacy = os.path.join(os.path.dirname(bootstrap.DATASET_DIR), ".mymtn-legacy")
+    assert os.path.isfile(os.path.join(legacy, "data.parquet"))
@@ -0,0 +1,29 @@
+import pandas as pd
+from utils.cube import build_cube, date_bounds, merge_cubes
+from utils.data_processing import read_extract, TEXT_COLUMNS, MEASURE_COLUMNS
+
+def _sums(df, by):
+    frame = df.reset_index()
+    frame[TEXT_COLUMNS] = frame[TEXT_COLUMNS].astype(str)
+    return frame.groupby(by)[MEASURE_COLUMNS].sum().astype('int64').sort_index()
+
+def test_cube_grains_match_reference(extract, reference):
+    cube = build_cube(read_extract(extract))
+    pd.testing.assert_frame_equal(_sums(cube.daily, TEXT_COLUMNS + ['date_key']), _sums(reference, TEXT_COLUMNS + ['date_key']))
+    pd.testing.assert_frame_equal(_sums(cube.agents, TEXT_COLUMNS), _sums(reference, TEXT_COLUMNS))
+    assert cube.daily.index.is_monotonic_increasing
+
+def test_merged_unit_cubes_match_whole_cube(extract):
+    df = read_extract(extract)
+    whole = build_cube(df)
+    units = df['salesbusinessunitname'].cat.categories.tolist()
+    merged = merge_cubes([build_cube(read_extract(extract, regions=[unit])) for unit in units])
+    pd.testing.assert_frame_equal(_sums(merged.agents, TEXT_COLUMNS), _sums(whole.agents, TEXT_COLUMNS))
+    pd.testing.assert_frame_equal(_sums(merged.daily, ['date_key']), _sums(whole.daily, ['date_key']))
+
+def test_date_bounds_cover_inclusive_range(extract):
+    cube = build_cube(read_extract(extract))
+    start, end = pd.Timestamp("2024-01-10"), pd.Timestamp("2024-01-20")
+    lo, hi = date_bounds(cube.daily, start, end)
+    inside = (cube.daily.index >= start) & (cube.daily.index <= end)
+    assert (lo, hi) == (inside.argmax(), len(inside) - inside[::-1].argmax())
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.data_processing import (read_extract,
+                                   list_units,
+                                   concat_compact,
+                                   TEXT_COLUMNS,
+                                   MEASURE_COLUMNS)
+
+def _totals(df, by):
+    frame = df.reset_index() if 'date_key' not in df.columns else df
+    grouped = frame.assign(**{col: frame[col].astype(str) for col in TEXT_COLUMNS}).groupby(by)[MEASURE_COLUMNS].sum()
+    return grouped.astype('int64').sort_index()
+
+def test_compact_representation(extract):
+    df = read_extract(extract)
+    for col in TEXT_COLUMNS:
+        assert isinstance(df[col].dtype, pd.CategoricalDtype)
+    assert all(np.issubdtype(df[col].dtype, np.integer) and df[col].dtype.itemsize <= 2 for col in MEASURE_COLUMNS)
+    assert df.index.name == 'date_key'
+
+@pytest.mark.parametrize('by', ['salesbusinessunitname', 'servicecentername', 'agentname', 'date_key'])
+def test_totals_match_reference(extract, reference, by):
+    pd.testing.assert_frame_equal(_totals(read_extract(extract), by), _totals(reference, by))
+
+def test_concat_compact_unions_categories(extract):
+    units = read_extract(extract)['salesbusinessunitname'].cat.categories.tolist()
+    parts = [read_extract(extract, regions=[unit]) for unit in units]
+    combined = concat_compact(parts)
+    assert isinstance(combined['agentname'].dtype, pd.CategoricalDtype)
+    assert combined['mau'].sum() == sum(part['mau'].sum() for part in parts)
+
+def test_chunked_read_matches_single_read(extract):
+    pd.testing.assert_frame_equal(
+        read_extract(extract, chunksize=700).sort_index(kind='stable').reset_index(),
+        read_extract(extract, chunksize=10**6).sort_index(kind='stable').reset_index(),
+        check_categorical=False
+    )
+
+def test_region_filter_keeps_only_selected_units(extract, reference):
+    units = list_units(extract)
+    assert units == sorted(reference['salesbusinessunitname'].unique())
+    df = read_extract(extract, regions=units[:1], chunksize=700)
+    assert set(df['salesbusinessunitname'].astype(str)) == {units[0]}
+    expected = reference[reference['salesbusinessunitname'] == units[0]]
+    assert df['download'].sum() == expected['download'].sum()
@@ -0,0 +1,27 @@
+import numpy as np
+from utils.data_processing import read_extract
+from utils.indexes import build_selection_index, centers_for_units, select_rows
+
+def test_index_positions_match_a_mask(extract):
+    df = read_extract(extract)
+    index = build_selection_index(df)
+    units = df['salesbusinessunitname'].cat.categories.tolist()
+    centers = df['servicecentername'].cat.categories.tolist()
+    for selected_units, selected_centers in [(units[:1], ["All"]), (units[:2], centers[:3]), (units[:1], ["Nowhere"])]:
+        mask = df['salesbusinessunitname'].isin(selected_units).to_numpy()
+        if "All" not in selected_centers:
+            mask = mask & df['servicecentername'].isin(selected_centers).to_numpy()
+        positions = select_rows(index, selected_units, selected_centers)
+        assert np.array_equal(np.sort(positions), np.flatnonzero(mask))
+
+def test_select_rows_returns_none_for_everything(extract):
+    index = build_selection_index(read_extract(extract))
+    assert select_rows(index, ["All"], ["All"]) is None
+
+def test_centers_for_units_lists_only_their_centers(extract):
+    df = read_extract(extract)
+    index = build_selection_index(df)
+    unit = df['salesbusinessunitname'].cat.categories[0]
+    expected = sorted(df.loc[df['salesbusinessunitname'] == unit, 'servicecentername'].astype(str).unique())
+    assert centers_for_units(index, [unit]) == expected
+    assert centers_for_units(index, ["Nowhere"]) == []
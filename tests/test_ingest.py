@@ -0,0 +1,65 @@
+import os
+import pandas as pd
+import pytest
+from utils.benchmark import generate_extract
+from utils.data_processing import (append_to_dataset, create_dataset, read_extract, DATASET_PATH,
+                                   TEXT_COLUMNS, MEASURE_COLUMNS)
+from utils.ingest import ingest_delta, ingest_frame
+from utils.store import load_source, read_agents, store_units, unit_dir
+
+@pytest.fixture
+def extract(tmp_path):
+    """Fewer days than the shared extract: the store writes files per unit and day"""
+    return generate_extract(str(tmp_path / "extract.csv"), rows=2000, units=3, centers=9, agents=60, days=15)
+
+def _sums(df, by):
+    frame = df.reset_index()
+    frame[TEXT_COLUMNS] = frame[TEXT_COLUMNS].astype(str)
+    return frame.groupby(by)[MEASURE_COLUMNS].sum().astype('int64').sort_index()
+
+def _agent_totals(store):
+    return pd.concat([read_agents(unit_dir(store, unit)) for unit in store_units(store)])
+
+def test_store_totals_match_extract(extract, reference):
+    ingest_frame(read_extract(extract), "store")
+    rows = load_source("store")
+    assert len(rows) == len(reference)
+    pd.testing.assert_frame_equal(_sums(rows, TEXT_COLUMNS + ['date_key']), _sums(reference, TEXT_COLUMNS + ['date_key']))
+    pd.testing.assert_frame_equal(_sums(_agent_totals("store"), TEXT_COLUMNS), _sums(reference, TEXT_COLUMNS))
+
+def test_delta_replaces_its_day(extract, reference):
+    ingest_frame(read_extract(extract), "store")
+    raw = pd.read_csv(extract)
+    last_day = raw['date_key'].max()
+    delta = raw[raw['date_key'] == last_day].copy()
+    delta['download'] *= 2
+    delta_path = "delta.csv"
+    delta.to_csv(delta_path, index=False)
+
+    expected = reference.copy()
+    expected.loc[expected['date_key'] == pd.Timestamp(str(last_day)), 'download'] *= 2
+    for _ in range(2):  # re-running a delta must not double count
+        ingest_delta(delta_path, "store")
+        pd.testing.assert_frame_equal(_sums(load_source("store"), ['date_key']), _sums(expected, ['date_key']))
+        pd.testing.assert_frame_equal(_sums(_agent_totals("store"), TEXT_COLUMNS), _sums(expected, TEXT_COLUMNS))
+
+def test_single_unit_delta_keeps_other_units_in_the_dataset(extract, reference, fake_pandasai):
+    create_dataset(read_extract(extract), overwrite=True)
+    raw = pd.read_csv(extract)
+    last_day = raw['date_key'].max()
+    unit = raw.loc[raw['date_key'] == last_day, 'salesbusinessunitname'].iloc[0]
+    delta = raw[(raw['date_key'] == last_day) & (raw['salesbusinessunitname'] == unit)].copy()
+    delta['download'] *= 2
+    delta.to_csv("delta.csv", index=False)
+    append_to_dataset(ingest_delta("delta.csv", "store"))
+
+    expected = reference.copy()
+    doubled = (expected['date_key'] == pd.Timestamp(str(last_day))) & (
+        expected['salesbusinessunitname'] == reference.loc[delta.index[0], 'salesbusinessunitname']
+    )
+    expected.loc[doubled, 'download'] *= 2
+    published = pd.read_parquet(os.path.join("datasets", DATASET_PATH, "data.parquet"))
+    published['date_key'] = pd.to_datetime(published['date_key'].astype(str), format='%Y%m%d')
+    by = ['date_key', 'salesbusinessunitname']
+    assert len(published) == len(reference)
+    pd.testing.assert_frame_equal(_sums(published, by), _sums(expected, by))
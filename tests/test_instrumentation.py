@@ -0,0 +1,68 @@
+import json
+import logging
+from utils.data_processing import read_extract
+from utils.ingest import ingest_frame
+from utils.instrumentation import (Registry,
+                                   current_trace,
+                                   record_cache,
+                                   record_payload,
+                                   rerun_trace,
+                                   span,
+                                   timed)
+from utils.partitions import PartitionCache
+
+def test_registry_histogram_and_counters():
+    registry = Registry()
+    for seconds in (0.002, 0.02, 2.0):
+        registry.observe("load", seconds)
+    registry.count_cache("figures", hit=True)
+    registry.count_cache("figures", hit=False)
+    registry.count_cache("figures", hit=True)
+    registry.set_payload("plotly.top_agents", 4096)
+    text = registry.prometheus()
+    assert 'mymtn_span_seconds_bucket{span="load",le="0.001"} 0' in text
+    assert 'mymtn_span_seconds_bucket{span="load",le="0.005"} 1' in text
+    assert 'mymtn_span_seconds_bucket{span="load",le="0.05"} 2' in text
+    assert 'mymtn_span_seconds_bucket{span="load",le="+Inf"} 3' in text
+    assert 'mymtn_span_seconds_sum{span="load"} 2.022000' in text
+    assert 'mymtn_cache_requests_total{cache="figures",result="hit"} 2' in text
+    assert 'mymtn_cache_requests_total{cache="figures",result="miss"} 1' in text
+    assert 'mymtn_payload_bytes{payload="plotly.top_agents"} 4096' in text
+
+def test_rerun_trace_collects_and_logs_a_summary(caplog):
+    @timed()
+    def build():
+        return 1
+
+    with caplog.at_level(logging.INFO, logger="mymtn.metrics"):
+        with rerun_trace("test-page") as trace:
+            build()
+            build()
+            with span("render"):
+                record_cache("selection", hit=False)
+                record_cache("selection", hit=True)
+                record_payload("plotly.trend", 123)
+    assert current_trace() is None
+    summary = json.loads(caplog.records[-1].getMessage())
+    assert summary["page"] == "test-page"
+    assert set(summary["spans"]) == {"build", "render"}
+    assert [name for name, _ in trace.spans] == ["build", "build", "render"]
+    assert summary["cache"] == {"selection": {"hits": 1, "misses": 1}}
+    assert summary["payload_bytes"] == {"plotly.trend": 123}
+
+def test_partition_loads_record_spans_and_snapshot_lookups(extract):
+    budget = 256 * 1024 * 1024
+    with rerun_trace("test-page") as trace:
+        for _ in range(2):  # a fresh process: the second split reads the snapshot the first wrote
+            cache = PartitionCache(extract, budget, regions=None)
+            cache.cube_for([cache.units()[0]])
+    spans = [name for name, _ in trace.spans]
+    assert spans.count("partitions.split_extract") == 2
+    assert spans.count("load_extract") == 2
+    assert trace.cache["snapshot"] == [1, 1]
+
+    ingest_frame(read_extract(extract), "store")
+    with rerun_trace("test-page") as trace:
+        cache = PartitionCache("store", budget, regions=None)
+        cache.cube_for(["All"])
+    assert [name for name, _ in trace.spans].count("read_store_cube") == len(cache.units())
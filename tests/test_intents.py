@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+from utils.data_processing import read_extract
+from utils.intents import IntentMatcher
+
+@pytest.fixture
+def matcher(extract):
+    return IntentMatcher(read_extract(extract))
+
+def test_totals(matcher, reference):
+    assert matcher.answer(matcher.match("What were total downloads?")).value == reference['download'].sum()
+    unit = reference['salesbusinessunitname'].iloc[0]
+    in_unit = reference[reference['salesbusinessunitname'] == unit]
+    assert matcher.answer(matcher.match(f"MAU in {unit}")).value == in_unit['mau'].sum()
+
+def test_relative_periods_are_anchored_on_the_latest_date(matcher, reference):
+    latest = reference['date_key'].max()
+    recent = reference[reference['date_key'] > latest - pd.Timedelta(days=7)]
+    assert matcher.answer(matcher.match("downloads in the last 7 days")).value == recent['download'].sum()
+    this_month = reference[reference['date_key'] >= latest.replace(day=1)]
+    assert matcher.answer(matcher.match("total mau this month")).value == this_month['mau'].sum()
+
+def test_rank_and_breakdown(matcher, reference):
+    ranked = matcher.answer(matcher.match("top 3 agents by downloads")).value
+    expected = reference.groupby('agentname')['download'].sum().nlargest(3)
+    assert ranked['download'].tolist() == expected.tolist()
+
+    by_unit = matcher.answer(matcher.match("downloads by business unit")).value
+    expected = reference.groupby('salesbusinessunitname')['download'].sum().sort_values(ascending=False)
+    assert by_unit['download'].tolist() == expected.tolist()
+
+def test_rank_counts(matcher, reference):
+    assert matcher.match("best agent").n == 1
+    worst = matcher.match("worst agent this month")
+    assert (worst.n, worst.largest) == (1, False)
+    assert matcher.match("top agents").n == 5
+
+    year = reference['date_key'].max().year
+    ranked = matcher.match(f"top 3 agents in {year}")
+    assert ranked.n == 3
+    assert ranked.period == (pd.Timestamp(year, 1, 1), pd.Timestamp(year, 12, 31))
+    counted = matcher.match("top 2020 agents by downloads")
+    assert (counted.n, counted.period) == (2020, None)
+
+def test_other_questions_are_left_to_the_llm(matcher):
+    assert matcher.match("why did downloads drop in accra") is None
+    assert matcher.match("plot a chart of churn") is None
+
+def test_contractions_and_verbs_around_a_total(matcher, reference):
+    center = reference['servicecentername'].iloc[0]
+    in_center = reference[reference['servicecentername'] == center]
+    expected = in_center['download'].sum()
+    assert matcher.answer(matcher.match(f"total downloads in {center}")).value == expected
+    assert matcher.answer(matcher.match(f"What's the total downloads in {center}?")).value == expected
+    assert matcher.answer(matcher.match(f"What\u2019s {center}'s total downloads?")).value == expected
+
+    latest = reference['date_key'].max()
+    month_end = latest.replace(day=1) - pd.Timedelta(days=1)
+    last_month = in_center[(in_center['date_key'] >= month_end.replace(day=1)) & (in_center['date_key'] <= month_end)]
+    question = f"How many downloads did {center} make last month?"
+    assert matcher.answer(matcher.match(question)).value == last_month['download'].sum()
@@ -0,0 +1,53 @@
+import time
+from threading import Event
+import pytest
+from utils.jobs import CANCELLED, DONE, FAILED, TIMED_OUT, JobQueue
+
+def _wait(queue, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job.finished:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+@pytest.fixture
+def release():
+    event = Event()
+    yield event
+    event.set()
+
+def test_results_and_failures():
+    queue = JobQueue(max_workers=2, max_queued=4, timeout_seconds=60)
+    ok = queue.submit("s", "q", lambda job: 42)
+    bad = queue.submit("s", "q", lambda job: 1 / 0)
+    assert _wait(queue, ok).status == DONE and queue.get(ok).result == 42
+    assert _wait(queue, bad).status == FAILED and "division" in queue.get(bad).error
+
+def test_cancelled_jobs_still_running_count_toward_the_bound(release):
+    queue = JobQueue(max_workers=1, max_queued=1, timeout_seconds=60)
+    started = Event()
+    job_id = queue.submit("s", "q", lambda job: started.set() or release.wait())
+    started.wait(5)
+    queue.cancel(job_id)
+    assert queue.get(job_id).status == CANCELLED
+    queue.pop(job_id)
+    # The worker is still busy, so another job would only wait behind it.
+    assert queue.submit("s", "q", lambda job: None) is None
+    release.set()
+    deadline = time.time() + 5
+    while queue.submit("s", "q", lambda job: None) is None:
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+def test_timeout_counts_from_start(release):
+    queue = JobQueue(max_workers=1, max_queued=4, timeout_seconds=0.2)
+    blocker = queue.submit("s", "q", lambda job: release.wait())
+    waiting = queue.submit("s", "q", lambda job: "answer")
+    time.sleep(0.3)
+    assert queue.get(blocker).status == TIMED_OUT
+    # Queued behind the blocker for longer than the timeout, but never started.
+    assert not queue.get(waiting).finished
+    release.set()
+    assert _wait(queue, waiting).status == DONE
@@ -0,0 +1,84 @@
+import pandas as pd
+import pytest
+from utils.cube import build_cube
+from utils.data_processing import read_extract
+from utils.memo import (LRUCache,
+                        memoized_selection,
+                        memoized_series,
+                        normalize_selection,
+                        get_selection_cache,
+                        selection_key)
+
+@pytest.fixture
+def cube(extract):
+    get_selection_cache().clear()
+    return build_cube(read_extract(extract), version="test")
+
+def test_lru_cache_evicts_by_entries_and_bytes():
+    cache = LRUCache(max_entries=2, max_bytes=100)
+    cache.put("a", 1, size=10)
+    cache.put("b", 2, size=10)
+    assert cache.get("a") == 1
+    cache.put("c", 3, size=10)
+    assert cache.get("b") is None and cache.get("a") == 1
+    cache.put("d", 4, size=95)
+    assert cache.get("a") is None and cache.get("c") is None and cache.get("d") == 4
+    assert cache.stats()["bytes"] == 95
+
+def test_lru_cache_keeps_an_entry_larger_than_the_budget(caplog):
+    cache = LRUCache(max_entries=4, max_bytes=100, name="partitions")
+    cache.put("a", 1, size=10)
+    cache.put("all", 2, size=150)
+    assert cache.get("all") == 2 and cache.get("a") is None
+    assert "exceeds the 100 byte budget" in caplog.text
+    cache.put("b", 3, size=10)
+    assert cache.get("all") is None and cache.get("b") == 3
+    assert cache.stats()["bytes"] == 10
+
+def test_normalize_selection_collapses_all_and_duplicates():
+    assert normalize_selection(["b", "a", "b"], ["All", "x"]) == (("a", "b"), ("All",))
+
+def test_selection_totals_match_reference(cube, reference):
+    units = sorted(reference['salesbusinessunitname'].unique())[:2]
+    centers = sorted(reference.loc[reference['salesbusinessunitname'].isin(units), 'servicecentername'].unique())[:4]
+    rows, metrics = memoized_selection(cube, units, centers)
+    expected = reference[reference['salesbusinessunitname'].isin(units) & reference['servicecentername'].isin(centers)]
+    assert rows['download'].sum() == expected['download'].sum()
+    assert metrics["downloads"][0] == expected['download'].sum()
+    assert metrics["mau"][0] == expected['mau'].sum()
+
+def test_repeated_selection_is_served_from_cache(cube):
+    first = memoized_selection(cube, ["All"], ["All"])
+    hits = get_selection_cache().stats()["hits"]
+    second = memoized_selection(cube, ["All"], ["All"])
+    assert get_selection_cache().stats()["hits"] == hits + 1
+    pd.testing.assert_frame_equal(first[0], second[0])
+    assert first[1] == second[1]
+
+def test_range_deltas_compare_the_preceding_range(cube, reference):
+    latest = reference['date_key'].max()
+    start, end = latest - pd.Timedelta(days=9), latest
+    rows, metrics = memoized_selection(cube, ["All"], ["All"], (start, end))
+
+    def total(lo, hi, measure):
+        return reference.loc[(reference['date_key'] >= lo) & (reference['date_key'] <= hi), measure].sum()
+
+    current = total(start, end, 'download')
+    previous = total(start - pd.Timedelta(days=10), start - pd.Timedelta(days=1), 'download')
+    assert rows['download'].sum() == current
+    assert metrics["downloads"][:2] == (current, current - previous)
+    assert metrics["downloads"][2] == pytest.approx((current - previous) / previous * 100)
+    assert metrics["mau"][0] == total(start, end, 'mau')
+
+def test_range_without_earlier_data_has_no_delta(cube, reference):
+    first = reference['date_key'].min()
+    _, metrics = memoized_selection(cube, ["All"], ["All"], (first, first + pd.Timedelta(days=6)))
+    assert metrics["downloads"][1:] == (None, None)
+
+def test_series_matches_selection_and_range(cube, reference):
+    latest = reference['date_key'].max()
+    start = latest - pd.Timedelta(days=13)
+    series = memoized_series(cube, ["All"], ["All"], (start, latest))
+    expected = reference[reference['date_key'] >= start].groupby('date_key')['download'].sum()
+    assert series['download'].to_dict() == expected.to_dict()
+    assert selection_key(cube, ["All"], ["All"], (start.date(), latest.date())) == selection_key(cube, ["All"], ["All"], (start, latest))
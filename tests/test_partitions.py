@@ -0,0 +1,44 @@
+import pandas as pd
+import utils.partitions as partitions
+from utils.data_processing import MEASURE_COLUMNS
+from utils.partitions import PartitionCache, default_units
+
+BUDGET = 256 * 1024 * 1024
+
+def _unit_totals(reference, units):
+    return reference[reference['salesbusinessunitname'].isin(units)][MEASURE_COLUMNS].sum().tolist()
+
+def test_unit_cubes_match_extract(extract, reference):
+    cache = PartitionCache(extract, BUDGET, regions=None)
+    units = cache.units()
+    assert units == sorted(reference['salesbusinessunitname'].unique())
+    for selection in ([units[0]], units[1:], ["All"]):
+        cube = cache.cube_for(selection)
+        expected = _unit_totals(reference, units if selection == ["All"] else selection)
+        assert cube.daily[MEASURE_COLUMNS].sum().tolist() == expected
+        assert cube.agents[MEASURE_COLUMNS].sum().tolist() == expected
+
+def test_extract_is_split_in_one_read(extract, monkeypatch):
+    reads = []
+    load_extract = partitions.load_extract
+    monkeypatch.setattr(partitions, "load_extract", lambda *args: reads.append(args) or load_extract(*args))
+    cache = PartitionCache(extract, BUDGET, regions=None)
+    for unit in cache.units():
+        cache.cube_for([unit])
+    assert len(reads) == 1
+
+def test_changed_extract_invalidates_cubes(extract):
+    cache = PartitionCache(extract, BUDGET, regions=None)
+    unit = cache.units()[0]
+    before = cache.cube_for([unit]).daily['download'].sum()
+
+    raw = pd.read_csv(extract)
+    raw['download'] *= 2
+    raw.to_csv(extract, index=False)
+    assert cache.cube_for([unit]).daily['download'].sum() == 2 * before
+
+def test_default_units():
+    available = ["Eastern", "Western"]
+    assert default_units(available, ["Western", "Unknown"]) == ["Western"]
+    assert default_units(available, ["All"]) == ["All"]
+    assert default_units(available, ["Unknown"]) == ["Eastern"]
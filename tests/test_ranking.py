@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+from utils.ranking import rank_agents
+
+def _frame(rows):
+    return pd.DataFrame(rows, columns=['agentname', 'download', 'mau'])
+
+def test_ties_are_broken_on_the_other_measure():
+    df = _frame([('a', 5, 1), ('b', 5, 3), ('c', 2, 9), ('d', 7, 0), ('e', 2, 1)])
+    top, bottom = rank_agents(df, 3)
+    assert top['agentname'].tolist() == ['d', 'b', 'a']
+    assert bottom['agentname'].tolist() == ['e', 'c', 'a']
+
+def test_totals_are_summed_per_agent_before_ranking():
+    df = _frame([('a', 1, 1), ('a', 9, 1), ('b', 6, 0), ('c', 3, 2)])
+    top, bottom = rank_agents(df, 1)
+    assert top.to_dict('records') == [{'agentname': 'a', 'download': 10, 'mau': 2}]
+    assert bottom['agentname'].tolist() == ['c']
+
+def test_rank_by_mau_and_small_inputs():
+    df = _frame([('a', 1, 4), ('b', 2, 4), ('c', 3, 1)])
+    top, _ = rank_agents(df, 2, by='mau')
+    assert top['agentname'].tolist() == ['b', 'a']
+    top, bottom = rank_agents(df, 10)
+    assert len(top) == len(bottom) == 3
+    empty_top, empty_bottom = rank_agents(df.iloc[:0], 5)
+    assert empty_top.empty and empty_bottom.empty
+
+def test_matches_a_full_sort():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({'agentname': rng.integers(0, 200, 5000).astype(str), 'download': rng.integers(0, 5, 5000), 'mau': rng.integers(0, 3, 5000)})
+    totals = df.groupby('agentname')[['download', 'mau']].sum().reset_index()
+    expected = totals.sort_values(['download', 'mau'], ascending=False, kind='stable').head(5)
+    top, _ = rank_agents(df, 5)
+    assert top[['download', 'mau']].values.tolist() == expected[['download', 'mau']].values.tolist()
@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+import pytest
+import utils.response_cache as response_cache
+from utils.response_cache import ResponseCache, normalize_question
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(response_cache, "time", SimpleNamespace(time=lambda: now.value))
+    return now
+
+def test_normalize_question():
+    assert normalize_question("  Top 5 agents, in Accra?! ") == "top 5 agents in accra"
+
+def test_entries_expire_after_ttl(clock):
+    cache = ResponseCache(max_entries=8, ttl_seconds=60, fuzzy_threshold=None)
+    cache.put("Top agents?", "v1", "answer")
+    clock.value += 60
+    assert cache.get("top agents", "v1") == "answer"
+    clock.value += 1
+    assert cache.get("top agents", "v1") is None
+    assert cache.stats() == {"entries": 0, "hits": 1, "misses": 1}
+
+def test_new_version_drops_entries(clock):
+    cache = ResponseCache(max_entries=8, ttl_seconds=60, fuzzy_threshold=None)
+    cache.put("top agents", "v1", "answer")
+    assert cache.get("top agents", "v2") is None
+    assert cache.get("top agents", "v1") is None
+
+def test_stale_version_puts_are_dropped(clock):
+    cache = ResponseCache(max_entries=8, ttl_seconds=60, fuzzy_threshold=None)
+    cache.put("top agents", "v1", "old")
+    cache.put("mau in accra", "v2", "new")
+    # An answer computed on v1 that lands after v2 must neither be stored nor reset v2.
+    cache.put("top agents", "v1", "old")
+    assert cache.get("top agents", "v1") is None
+    cache.put("downloads in volta", "v2", "newer")
+    assert cache.get("mau in accra", "v2") == "new"
+    assert cache.get("downloads in volta", "v2") == "newer"
+    assert cache.get("top agents", "v2") is None
+    assert cache.stats()["entries"] == 2
+
+def test_oldest_entries_are_evicted(clock):
+    cache = ResponseCache(max_entries=2, ttl_seconds=60, fuzzy_threshold=None)
+    for question in ("first", "second"):
+        cache.put(question, "v1", question)
+    cache.get("first", "v1")
+    cache.put("third", "v1", "third")
+    assert cache.get("second", "v1") is None
+    assert cache.get("first", "v1") == "first"
+    assert cache.get("third", "v1") == "third"
+
+def test_fuzzy_match(clock):
+    cache = ResponseCache(max_entries=8, ttl_seconds=60, fuzzy_threshold=0.9)
+    cache.put("downloads in accra last month", "v1", "answer")
+    assert cache.get("last month downloads in accra", "v1") == "answer"
+    assert cache.get("mau in volta", "v1") is None
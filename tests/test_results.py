@@ -0,0 +1,34 @@
+import pandas as pd
+from utils.results import ResultStore, page_count, result_page
+
+def _table(n):
+    return pd.DataFrame({'agent': [f"a{i:03d}" for i in range(n)], 'download': [i % 7 for i in range(n)]})
+
+def test_store_round_trip_and_content_ids():
+    store = ResultStore(max_bytes=1 << 20)
+    df = _table(250).set_index('agent')
+    result_id = store.put(df)
+    assert store.put(df.copy()) == result_id
+    pd.testing.assert_frame_equal(store.get(result_id), df.reset_index())
+    assert store.get("missing") is None
+
+def test_store_evicts_beyond_budget():
+    store = ResultStore(max_bytes=4096)
+    first = store.put(_table(300))
+    for n in range(301, 320):
+        store.put(_table(n))
+    assert store.get(first) is None
+
+def test_pages_cover_the_table_once():
+    df = _table(105)
+    assert page_count(len(df), 50) == 3
+    assert page_count(0, 50) == 1
+    pages = [result_page(df, page, page_rows=50) for page in range(1, 4)]
+    assert [len(page) for page in pages] == [50, 50, 5]
+    pd.testing.assert_frame_equal(pd.concat(pages), df)
+
+def test_sorted_pages_are_stable():
+    df = _table(105)
+    first = result_page(df, 1, sort_by='download', ascending=False, page_rows=20)
+    assert first['download'].tolist() == [6] * 15 + [5] * 5
+    assert first['agent'].tolist()[:3] == ['a006', 'a013', 'a020']
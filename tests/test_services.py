@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_dashboard_modules_do_not_import_pandasai():
+    modules = "utils.partitions, utils.memo, utils.metrics, utils.visualizations, utils.bootstrap, utils.agent"
+    code = f"import sys, {modules}; print(sorted(m for m in sys.modules if m.startswith('pandasai')))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+def test_dashboard_does_not_start_the_dataset_bootstrap(tmp_path, monkeypatch):
+    from streamlit.testing.v1 import AppTest
+    import utils.bootstrap as bootstrap
+    from utils.benchmark import generate_extract
+
+    os.symlink(os.path.join(ROOT, "images"), tmp_path / "images")
+    os.makedirs(tmp_path / "data")
+    generate_extract(str(tmp_path / "data" / "mymtn.csv"), rows=2000, units=2, centers=4, agents=20, days=30)
+    publishes = []
+    monkeypatch.setattr(bootstrap, "bootstrap_dataset", lambda *args, **kwargs: publishes.append(args))
+
+    app = AppTest.from_file(os.path.join(ROOT, "0_📈_My_MTN.py"), default_timeout=60).run()
+    assert not app.exception
+    for thread in threading.enumerate():
+        if thread.name == "dataset-bootstrap":
+            thread.join()
+    assert publishes == []
+    assert not bootstrap.dataset_ready()
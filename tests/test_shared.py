@@ -0,0 +1,60 @@
+import os
+import pandas as pd
+import pyarrow as pa
+from utils.data_processing import MEASURE_COLUMNS
+from utils.shared import SharedData, current_generation, generation_dir, publish, shared_data
+
+def test_published_cubes_match_extract(extract, reference):
+    generation = publish(extract, "shared", regions=None, keep=2)
+    assert current_generation("shared") == generation == 1
+    data = SharedData("shared", generation)
+    assert data.units == sorted(reference['salesbusinessunitname'].unique())
+    assert len(data.rows()) == len(reference)
+
+    whole = data.cube()
+    assert whole.daily[MEASURE_COLUMNS].sum().tolist() == reference[MEASURE_COLUMNS].sum().tolist()
+    assert whole.agents[MEASURE_COLUMNS].sum().tolist() == reference[MEASURE_COLUMNS].sum().tolist()
+    unit = data.units[0]
+    expected = reference[reference['salesbusinessunitname'] == unit]
+    assert data.cube(unit).agents['download'].sum() == expected['download'].sum()
+    by_date = data.cube(unit).daily.groupby(level=0)['mau'].sum()
+    assert by_date.to_dict() == expected.groupby('date_key')['mau'].sum().to_dict()
+
+def _owner(array):
+    """The object that ultimately owns an array's memory"""
+    while getattr(array, "base", None) is not None and not isinstance(array, pa.Buffer):
+        array = array.base
+    return array
+
+def test_views_alias_the_mapped_files(extract):
+    data = SharedData("shared", publish(extract, "shared", regions=None))
+    daily = data.cube().daily
+    # A copy would be owned by numpy; a view is owned by the memory-mapped Arrow buffer.
+    for values in (
+        daily['download'].array._ndarray,
+        daily['mau'].array._ndarray,
+        daily['agentname'].array._codes,
+        daily.index.asi8,
+    ):
+        assert isinstance(_owner(values), pa.Buffer)
+        assert not values.flags.writeable
+
+def test_prune_keeps_the_previous_generation(extract):
+    for _ in range(3):
+        live = publish(extract, "shared", regions=None, keep=1)
+    assert live == 3
+    assert not os.path.isdir(generation_dir("shared", 1))
+    assert os.path.isdir(generation_dir("shared", 2))
+    assert os.path.isdir(generation_dir("shared", 3))
+    pd.testing.assert_frame_equal(SharedData("shared", 2).cube().agents, SharedData("shared", 3).cube().agents)
+
+def test_stale_generation_is_not_served(extract):
+    publish(extract, "shared", regions=None)
+    assert shared_data(extract, "shared").generation == 1
+
+    with open(extract, "a") as f:
+        f.write(open(extract).read().splitlines()[-1] + "\n")
+    assert shared_data(extract, "shared") is None
+
+    publish(extract, "shared", regions=None)
+    assert shared_data(extract, "shared").generation == 2
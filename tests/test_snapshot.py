@@ -0,0 +1,30 @@
+import os
+import pandas as pd
+from utils.data_processing import load_extract, read_extract
+from utils.snapshot import SNAPSHOT_DIR, read_snapshot, snapshot_key, write_snapshot
+
+def test_snapshot_round_trip_matches_fresh_read(extract):
+    fresh = read_extract(extract)
+    first = load_extract(extract)
+    assert len(os.listdir(SNAPSHOT_DIR)) == 1
+    second = load_extract(extract)
+    pd.testing.assert_frame_equal(first, fresh, check_categorical=False)
+    pd.testing.assert_frame_equal(second, fresh, check_categorical=False)
+
+def test_snapshot_key_changes_with_source(extract):
+    before = snapshot_key(extract)
+    assert snapshot_key(extract) == before
+    with open(extract, "a") as out:
+        out.write("20240102,Region 00 (R00),Center 000,Agent 0001 Surname,1,1\n")
+    assert snapshot_key(extract) != before
+    assert snapshot_key(extract, "Region 00") != snapshot_key(extract)
+
+def test_write_snapshot_replaces_older_snapshots(extract):
+    df = read_extract(extract)
+    old_path = os.path.join(SNAPSHOT_DIR, "extract-old.feather")
+    new_path = os.path.join(SNAPSHOT_DIR, "extract-new.feather")
+    write_snapshot(df, old_path)
+    write_snapshot(df, new_path)
+    assert os.listdir(SNAPSHOT_DIR) == ["extract-new.feather"]
+    pd.testing.assert_frame_equal(read_snapshot(new_path), df, check_categorical=False)
+    assert read_snapshot(old_path) is None
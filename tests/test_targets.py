@@ -0,0 +1,86 @@
+import pandas as pd
+import pytest
+from utils.cube import build_cube
+from utils.data_processing import normalize_unit, read_extract
+from utils.metrics import calculate_yearly_target, TARGET_ESTIMATION_MULTIPLIER
+from utils.targets import build_target_model, rank_by_attainment, read_targets, selection_target
+
+def test_normalize_unit():
+    names = pd.Series(["GREATER ACCRA (GAR)", "eastern volta", "Northern Ghana  (NG) "])
+    assert normalize_unit(names).tolist() == ["Greater Accra", "Eastern Volta", "Northern Ghana "]
+
+@pytest.fixture
+def model(extract, reference, tmp_path):
+    units = sorted(reference['salesbusinessunitname'].unique())
+    centers = sorted(reference.loc[reference['salesbusinessunitname'] == units[1], 'servicecentername'].unique())[:2]
+    agents = reference.loc[reference['salesbusinessunitname'] == units[0], ['servicecentername', 'agentname']].drop_duplicates()[:4]
+    year = reference['date_key'].max().year
+    path = tmp_path / "targets.csv"
+    pd.DataFrame([
+        # Raw-style unit name, normalized on read.
+        (year, f"{units[0].upper()} (XX)", "", "", 1000),
+        (year, units[1], centers[0], "", 300),
+        (year, units[1], centers[1], "", 200),
+        (year - 1, units[2], "", "", 999),  # another year: ignored
+    ] + [
+        # Agent targets under a unit with its own explicit target, which wins.
+        (year, units[0], center, agent, target)
+        for (center, agent), target in zip(agents.itertuples(index=False), [10, 20, 30, 40])
+    ], columns=['year', 'salesbusinessunitname', 'servicecentername', 'agentname', 'download_target']).to_csv(path, index=False)
+    return build_target_model(build_cube(read_extract(extract)), read_targets(str(path))), units, centers
+
+def test_targets_roll_up_and_join_ytd(model, reference):
+    model, units, centers = model
+    by_unit = model.units.set_index('salesbusinessunitname')
+    assert by_unit.loc[units[0], 'target'] == 1000
+    assert by_unit.loc[units[1], 'target'] == 500
+    assert pd.isna(by_unit.loc[units[2], 'target'])
+
+    ytd = reference[reference['date_key'].dt.year == model.year].groupby('salesbusinessunitname')['download'].sum()
+    assert by_unit['ytd'].to_dict() == ytd.to_dict()
+    assert by_unit.loc[units[0], 'attainment'] == pytest.approx(ytd[units[0]] / 1000 * 100)
+
+def test_selection_target(model, reference):
+    model, units, centers = model
+    ytd, target, _ = selection_target(model, [units[1]], [centers[0]])
+    assert target == 300
+    in_center = reference[
+        (reference['salesbusinessunitname'] == units[1])
+        & (reference['servicecentername'] == centers[0])
+        & (reference['date_key'].dt.year == model.year)
+    ]
+    assert ytd == in_center['download'].sum()
+    assert selection_target(model, ["All"], ["All"])[1] == 1500
+
+def test_selection_target_skips_entities_without_a_target(model):
+    model, units, centers = model
+    by_unit = model.units.set_index('salesbusinessunitname')
+    ytd, target, projected = selection_target(model, ["All"], ["All"])
+    # units[2] has no target for this year, so its downloads are left out too.
+    assert ytd == by_unit.loc[units[:2], 'ytd'].sum()
+    assert projected == pytest.approx(by_unit.loc[units[:2], 'projected'].sum())
+    assert target == 1500
+    assert selection_target(model, [units[2]], ["All"]) == (0.0, 0.0, 0.0)
+
+def test_rank_by_attainment(model):
+    model, _, _ = model
+    targeted = model.agents.dropna(subset=['target'])
+    assert len(targeted) == 4
+    expected = targeted.sort_values(['attainment', 'ytd'], ascending=False, kind='stable')
+    top, bottom = rank_by_attainment(model, 3)
+    assert top['agentname'].tolist() == expected['agentname'].head(3).tolist()
+    assert bottom['agentname'].tolist() == expected['agentname'].iloc[::-1].head(3).tolist()
+    top, _ = rank_by_attainment(model, 10, projected=True)
+    assert len(top) == 4
+    assert top['projected_attainment'].is_monotonic_decreasing
+
+def test_untargeted_selection_falls_back_to_an_estimate(model):
+    model, units, _ = model
+    rows = pd.DataFrame({'download': [100, 50]})
+    # An untargeted unit gets the estimate and no made-up delta, even with a targets file.
+    value, *delta = calculate_yearly_target(rows, selection_target(model, [units[2]], ["All"]))
+    assert value == 150 * TARGET_ESTIMATION_MULTIPLIER
+    assert delta == [None, None]
+    value, *delta = calculate_yearly_target(rows, selection_target(model, [units[0]], ["All"]))
+    assert value == 1000
+    assert None not in delta
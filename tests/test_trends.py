@@ -0,0 +1,85 @@
+import pandas as pd
+from utils.cube import build_cube
+from utils.data_processing import read_extract
+from utils.metrics import calculate_downloads_metrics, format_delta
+from utils.trends import (change,
+                          daily_series,
+                          delta_label,
+                          period_label,
+                          period_deltas,
+                          prefix_sums,
+                          preset_range,
+                          resample_series,
+                          previous_range,
+                          range_totals)
+
+def _total(reference, start, end, measure='download'):
+    rows = reference[(reference['date_key'] >= start) & (reference['date_key'] <= end)]
+    return float(rows[measure].sum())
+
+def test_change_without_baseline_is_none():
+    assert change(150, 100) == (50, 50.0)
+    assert change(80, 100) == (-20, -20.0)
+    assert change(24337, 0) is None
+
+def test_missing_baseline_renders_na():
+    metric = calculate_downloads_metrics(pd.DataFrame({'download': [5]}), {'mom': {'download': (5.0, 0.0)}})
+    assert metric == (5, None, None)
+    assert "n/a" in format_delta(*metric[1:])
+    assert "+25.00%" in format_delta(5, 25.0)
+
+def test_period_deltas_match_reference(extract, reference):
+    series = daily_series(build_cube(read_extract(extract)).daily)
+    anchor = reference['date_key'].max()
+    trend = period_deltas(series, anchor=anchor)
+    day = pd.Timedelta(days=1)
+    assert trend['wow']['download'] == (
+        _total(reference, anchor - 6 * day, anchor), _total(reference, anchor - 13 * day, anchor - 7 * day)
+    )
+    last_month = anchor - pd.DateOffset(months=1)
+    assert trend['mom']['mau'] == (
+        _total(reference, anchor.replace(day=1), anchor, 'mau'),
+        _total(reference, last_month.replace(day=1), last_month, 'mau')
+    )
+    assert trend['ytd']['download'][0] == _total(reference, anchor.replace(month=1, day=1), anchor)
+
+def test_range_totals_match_reference(extract, reference):
+    series = daily_series(build_cube(read_extract(extract)).daily)
+    prefix = prefix_sums(series)
+    start, end = series.index[10], series.index[40]
+    assert range_totals(series, prefix, start, end)['download'] == _total(reference, start, end)
+    assert range_totals(series, prefix, end + pd.Timedelta(days=500), end + pd.Timedelta(days=600))['mau'] == 0
+
+def test_preset_ranges():
+    latest = pd.Timestamp("2024-03-15")
+    assert preset_range('Today', latest) == (latest, latest)
+    assert preset_range('Last 7 days', latest) == (pd.Timestamp("2024-03-09"), latest)
+    assert preset_range('This month', latest) == (pd.Timestamp("2024-03-01"), latest)
+    assert preset_range('Last month', latest) == (pd.Timestamp("2024-02-01"), pd.Timestamp("2024-02-29"))
+    assert preset_range('This year', latest) == (pd.Timestamp("2024-01-01"), latest)
+    assert preset_range('All time', latest) is None
+    assert preset_range('Custom', latest) is None
+
+def test_previous_range_and_label():
+    start, end = pd.Timestamp("2024-03-01"), pd.Timestamp("2024-03-15")
+    assert previous_range(start, end) == (pd.Timestamp("2024-02-15"), pd.Timestamp("2024-02-29"))
+    assert previous_range(end, end) == (pd.Timestamp("2024-03-14"),) * 2
+    assert delta_label((start, end)) == "vs previous 15 days"
+    assert delta_label((end, end)) == "vs previous day"
+    assert delta_label(None) == "month to date vs same days last month"
+    assert period_label(None) == "all time"
+    assert period_label((start, end)) == "01 Mar – 15 Mar 2024"
+    assert period_label((end, end)) == "15 Mar 2024"
+
+def test_resample_series_matches_reference(extract, reference):
+    daily = build_cube(read_extract(extract)).daily
+    weekly = resample_series(daily_series(daily), 'weekly')
+    expected = reference.groupby(pd.Grouper(key='date_key', freq='W-MON', label='left', closed='left'))['download'].sum()
+    assert weekly['download'].to_dict() == expected.to_dict()
+    assert (weekly.index.dayofweek == 0).all()
+
+    monthly = resample_series(daily, 'monthly', by='agentname')
+    reference = reference.assign(month=reference['date_key'].dt.to_period('M').dt.start_time)
+    expected = reference.groupby(['agentname', 'month'])['mau'].sum()
+    assert monthly['mau'].to_dict() == expected.to_dict()
+    assert resample_series(daily.iloc[:0], 'monthly').empty
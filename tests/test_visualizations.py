@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+from utils.visualizations import create_series_chart, downsample, get_figure_cache, series_chart_spec
+
+def _series(n):
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2020-01-01", periods=n, name='date_key')
+    return pd.DataFrame({'download': rng.integers(0, 100, n), 'mau': rng.integers(0, 50, n)}, index=index)
+
+def test_downsample_keeps_extremes_in_order():
+    x = np.arange(10_000)
+    y = np.sin(x / 50.0) * 100
+    y[1234], y[8765] = 1000, -1000
+    xs, ys = downsample(x, y, max_points=500)
+    assert len(xs) <= 500
+    assert np.all(np.diff(xs) > 0)
+    assert 1234 in xs and 8765 in xs
+    assert ys.max() == 1000 and ys.min() == -1000
+    short = np.arange(10)
+    assert downsample(short, short, 500)[0] is short
+
+def test_long_series_are_downsampled_and_drawn_with_webgl():
+    figure = create_series_chart(_series(5000), max_points=400, webgl_points=300)
+    assert [trace.type for trace in figure.data] == ['scattergl', 'scattergl']
+    assert all(len(trace.x) <= 400 for trace in figure.data)
+    assert create_series_chart(_series(100), max_points=400, webgl_points=300).data[0].type == 'scatter'
+
+def test_series_specs_are_cached_by_key():
+    get_figure_cache().clear()
+    series = _series(50)
+    spec = series_chart_spec(series, key=("v1", "All"))
+    assert series_chart_spec(series, key=("v1", "All")) is spec
+    assert series_chart_spec(series) is not spec
+    assert spec.payload_bytes == len(spec.figure.to_json())
@@ -1,32 +1,130 @@
 import streamlit as st
-import pandasai as pai
-import os
 import logging
-from utils.data_processing import load_and_preprocess_data
-from pandasai_openai import OpenAI
-from dotenv import load_dotenv
-
-load_dotenv()
+import time
+from queue import Empty, Queue
+from threading import Lock
+from typing import Any, Dict, Optional
+from config.settings import AGENT_POOL_SIZE, AGENT_TIMEOUT_SECONDS
+from utils.bootstrap import dataset_fingerprint
+from utils.data_processing import DATASET_PATH
+from utils.instrumentation import timed
+from utils.intents import answer_locally
+from utils.services import configure_llm
 
 logging.basicConfig(level=logging.INFO)
 
-llm = OpenAI(api_token=os.getenv("OPENAI_API_KEY"))
+LOAD_ATTEMPTS = 3
+LOAD_BACKOFF_SECONDS = 1.0
+LOAD_COOLDOWN_SECONDS = 30.0
 
-pai.config.set({"llm": llm})
+class AgentUnavailable(Exception):
+    pass
 
-@st.cache_resource 
-def load_dataset(path):
-    """
-    Load the dataset from pandasai organization.
+class AgentService:
+    """Shared pandasai dataset handles for every session.
+
+    Handles are loaded lazily on first use, with retries and exponential
+    backoff. After a failed round, loads are refused for a cool-down instead
+    of hammering the backend; the first call after it retries. Up to
+    pool_size handles are created, because a pandasai DataFrame keeps
+    conversation state and is not safe to share between threads. Concurrent
+    LLM calls are bounded by the job queue's workers (see utils.jobs).
     """
-    try:
-        df = pai.load(path)
-        return df
-    except Exception as e:
-        logging.error(f"Error loading dataset: {e}")
-        
-sdf = load_dataset("mtnghana/mymtn")
-    
+
+    def __init__(
+        self,
+        path: str = DATASET_PATH,
+        pool_size: int = AGENT_POOL_SIZE
+    ):
+        self.path = path
+        self.pool_size = max(pool_size, 1)
+        self._idle: Queue = Queue()
+        self._created = 0
+        self._in_use = 0
+        self._lock = Lock()
+        self.last_error: Optional[str] = None
+        self._retry_at = 0.0
+
+    def _unavailable(self, error: Exception) -> AgentUnavailable:
+        """Record a failed load and start the cool-down"""
+        self.last_error = str(error)
+        self._retry_at = time.monotonic() + LOAD_COOLDOWN_SECONDS
+        return AgentUnavailable(f"Dataset unavailable: {self.last_error}")
+
+    def _load(self):
+        if time.monotonic() < self._retry_at:
+            raise AgentUnavailable(f"Dataset unavailable: {self.last_error}")
+        try:
+            pai = configure_llm()
+        except Exception as e:
+            logging.error(f"Error configuring pandasai: {e}")
+            raise self._unavailable(e)
+        for attempt in range(LOAD_ATTEMPTS):
+            try:
+                sdf = pai.load(self.path)
+                self.last_error = None
+                return sdf
+            except Exception as e:
+                error = e
+                self.last_error = str(e)
+                logging.error(f"Error loading dataset (attempt {attempt + 1}/{LOAD_ATTEMPTS}): {e}")
+                if attempt + 1 < LOAD_ATTEMPTS:
+                    time.sleep(LOAD_BACKOFF_SECONDS * 2 ** attempt)
+        raise self._unavailable(error)
+
+    def _checkout(self):
+        """An idle handle, a newly loaded one while the pool has room, or the next one released"""
+        try:
+            return self._idle.get_nowait()
+        except Empty:
+            pass
+        with self._lock:
+            create = self._created < self.pool_size
+            if create:
+                self._created += 1
+        if not create:
+            try:
+                return self._idle.get(timeout=AGENT_TIMEOUT_SECONDS)
+            except Empty:
+                raise AgentUnavailable("No agent became free in time")
+        try:
+            return self._load()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def chat(self, question: str):
+        sdf = self._checkout()
+        with self._lock:
+            self._in_use += 1
+        try:
+            return sdf.chat(question)
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._idle.put(sdf)
+
+    def ready(self) -> bool:
+        """Whether at least one dataset handle has loaded and the last load succeeded"""
+        return self._created > 0 and self.last_error is None
+
+    def health(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "ready": self.ready(),
+                "instances": self._created,
+                "in_use": self._in_use,
+                "pool_size": self.pool_size,
+                "last_error": self.last_error,
+            }
+
+@st.cache_resource(max_entries=1)
+def get_agent_service(version: Optional[str]) -> AgentService:
+    """Process-wide agent service; replaced when the published dataset changes"""
+    return AgentService()
+
+@timed()
 def generate_response(user_message):
     """
     Generate a response to a user's question.
@@ -38,8 +136,18 @@ def generate_response(user_message):
     str: The generated response.
     """
     try:
-        response = sdf.chat(user_message)
-        return response
+        response = answer_locally(user_message)
+        if response is not None:
+            logging.info("Answered locally without the LLM")
+            return response
+    except Exception as e:
+        logging.warning(f"Local answer failed, falling back to the LLM: {e}")
+
+    try:
+        return get_agent_service(dataset_fingerprint()).chat(user_message)
+    except AgentUnavailable as e:
+        logging.error(f"Agent unavailable: {e}")
+        return "The agent dataset is not available right now. Please try again shortly."
     except Exception as e:
         logging.error(f"Error generating response: {e}")
         return "An error occurred while generating a response."
@@ -0,0 +1,72 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import time
+from threading import Lock
+from config.settings import ARTIFACT_MAX_AGE_HOURS, ARTIFACT_MAX_MB
+
+logging.basicConfig(level=logging.INFO)
+
+# Generated charts are copied here under their content hash and served by
+# Streamlit's static file server (server.enableStaticServing) at STATIC_URL.
+ARTIFACT_DIR = os.path.join("static", "charts")
+STATIC_URL = "app/static/charts"
+
+_cleanup_lock = Lock()
+
+def _content_digest(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as artifact:
+        for block in iter(lambda: artifact.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def store_artifact(path: str, artifact_dir: str = ARTIFACT_DIR) -> str:
+    """Copy a generated file into the artifact store and return its static URL.
+
+    Files are named by content hash, so identical charts are stored once;
+    storing an existing artifact again refreshes its age.
+    """
+    extension = os.path.splitext(path)[1].lower() or ".png"
+    name = f"{_content_digest(path)}{extension}"
+    target = os.path.join(artifact_dir, name)
+    if os.path.exists(target):
+        os.utime(target)
+    else:
+        os.makedirs(artifact_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=artifact_dir, suffix=".tmp")
+        os.close(fd)
+        shutil.copyfile(path, temp_path)
+        os.replace(temp_path, target)
+        cleanup_artifacts(artifact_dir)
+    return f"{STATIC_URL}/{name}"
+
+def cleanup_artifacts(
+    artifact_dir: str = ARTIFACT_DIR,
+    max_bytes: int = ARTIFACT_MAX_MB * 1024 * 1024,
+    max_age_seconds: float = ARTIFACT_MAX_AGE_HOURS * 3600
+) -> int:
+    """Delete artifacts older than max_age_seconds, then the oldest until under max_bytes"""
+    with _cleanup_lock:
+        try:
+            entries = [entry for entry in os.scandir(artifact_dir) if entry.is_file() and not entry.name.endswith(".tmp")]
+        except FileNotFoundError:
+            return 0
+        now = time.time()
+        files = sorted(((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in entries), reverse=True)
+        kept_bytes = 0
+        removed = 0
+        for mtime, size, path in files:
+            if now - mtime > max_age_seconds or kept_bytes + size > max_bytes:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+            else:
+                kept_bytes += size
+        if removed:
+            logging.info(f"Removed {removed} chart artifacts, {kept_bytes / 1e6:.1f} MB kept")
+        return removed
@@ -0,0 +1,406 @@
+"""Benchmark the dashboard data path and the agent page rendering on synthetic MTN-shaped extracts.
+
+    python -m utils.benchmark --rows 1000000 --out bench/after.json
+    python -m utils.benchmark --rows 1000000 --compare bench/before.json --out bench/after.json
+    python -m utils.benchmark --startup --repeat 3
+
+Each case reports the best and median wall time over --repeat runs, the
+peak RSS growth during one run and the peak bytes allocated (tracemalloc, in
+a separate run so tracing does not skew the timings). --compare exits
+non-zero when any case is slower than the baseline by more than --threshold.
+
+--startup instead measures cold start: each page's first run (imports
+included) in a fresh interpreter through Streamlit's AppTest, and which of
+the heavy optional modules that run loaded.
+"""
+import argparse
+import gc
+import importlib.util
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from config.settings import PARTITION_MEMORY_BUDGET_MB
+from utils.cube import build_cube, read_store_cube
+from utils.data_processing import read_extract, CHUNK_ROWS
+from utils.ingest import ingest_frame
+from utils.memo import compute_range, compute_selection, memoized_selection, memoized_series, selection_key
+from utils.partitions import PartitionCache
+from utils.ranking import rank_agents
+from utils.snapshot import read_snapshot, write_snapshot
+from utils.store import store_units, unit_dir
+from utils.trends import RESAMPLE_RULES
+from utils.visualizations import agent_chart_spec, create_agent_performance_chart, get_figure_cache, series_chart_spec
+
+logging.basicConfig(level=logging.INFO)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DASHBOARD_PAGE = os.path.join(ROOT, "0_📈_My_MTN.py")
+AGENT_PAGE = os.path.join(ROOT, "pages", "1_🐝_Y'ello_Agent.py")
+HEAVY_MODULES = ("pandasai", "pandasai_openai", "openai")
+
+# Run in a fresh interpreter: streamlit itself is imported before the clock
+# starts, as the server has it loaded before any page runs.
+STARTUP_SCRIPT = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+started = time.perf_counter()
+app = AppTest.from_file(sys.argv[1], default_timeout=600).run()
+seconds = time.perf_counter() - started
+print(json.dumps({
+    "seconds": seconds,
+    "exceptions": len(app.exception),
+    "loaded": [name for name in sys.argv[2:] if name in sys.modules],
+}))
+"""
+
+def generate_extract(
+    path: str,
+    rows: int,
+    units: int = 4,
+    centers: int = 40,
+    agents: int = 800,
+    days: int = 285,
+    seed: int = 0,
+    chunk_rows: int = 1_000_000
+) -> str:
+    """Write a shuffled CSV with the raw extract's columns and quirks.
+
+    Units carry a "(CODE)" suffix, agent names mix upper and title case with
+    stray whitespace, and about 0.1% of centers and agents are missing, like
+    data/mymtn.csv. Rows are written in chunks so 50M-row files fit in memory.
+    """
+    rng = np.random.default_rng(seed)
+    unit_names = np.array([f"Region {i:02d} (R{i:02d})" for i in range(units)])
+    center_names = np.array([f"Center {i:03d}" for i in range(centers)])
+    center_unit = np.arange(centers) % units
+    agent_names = np.array([
+        f"AGENT {i:04d} SURNAME" if i % 3 == 0 else f"Agent {i:04d} Surname{' ' if i % 7 == 0 else ''}"
+        for i in range(agents)
+    ])
+    agent_center = rng.integers(0, centers, agents)
+    dates = pd.date_range("2024-01-01", periods=days).strftime("%Y%m%d").to_numpy()
+
+    with open(path, "w") as out:
+        out.write("date_key,salesbusinessunitname,servicecentername,agentname,download,MAU\n")
+        for start in range(0, rows, chunk_rows):
+            n = min(chunk_rows, rows - start)
+            agent = rng.integers(0, agents, n)
+            center = agent_center[agent]
+            chunk = pd.DataFrame({
+                "date_key": dates[rng.integers(0, days, n)],
+                "salesbusinessunitname": unit_names[center_unit[center]],
+                "servicecentername": center_names[center],
+                "agentname": agent_names[agent],
+                "download": rng.poisson(5, n),
+                "MAU": rng.poisson(3, n),
+            })
+            missing = rng.random(n) < 0.001
+            chunk.loc[missing, "servicecentername"] = None
+            chunk.loc[rng.random(n) < 0.001, "agentname"] = None
+            chunk.to_csv(out, header=False, index=False)
+    return path
+
+def _current_rss() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+class _RssSampler:
+    """Peak resident set size while a block runs, sampled from /proc (ru_maxrss elsewhere)"""
+
+    def __enter__(self):
+        self.start = _current_rss()
+        self.peak = self.start or 0
+        self._stop = threading.Event()
+        if self.start is not None:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        else:
+            self._maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(0.005):
+            self.peak = max(self.peak, _current_rss() or 0)
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self.start is not None:
+            self._thread.join()
+            self.peak = max(self.peak, _current_rss() or 0)
+            self.growth = self.peak - self.start
+        else:
+            self.growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 - self._maxrss
+
+def measure(name: str, fn: Callable[[], Any], repeat: int = 5) -> Dict[str, Any]:
+    """Time fn repeat times, then run it once under the RSS sampler and once under tracemalloc"""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+
+    gc.collect()
+    with _RssSampler() as rss:
+        fn()
+
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, alloc_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        "name": name,
+        "repeat": repeat,
+        "wall_min_s": min(timings),
+        "wall_median_s": statistics.median(timings),
+        "peak_rss_growth_mb": rss.growth / 1e6,
+        "alloc_peak_mb": alloc_peak / 1e6,
+    }
+    logging.info(f"{name:<40} {result['wall_min_s'] * 1e3:>10.2f} ms  {result['alloc_peak_mb']:>8.1f} MB alloc")
+    return result
+
+def _load_agent_page():
+    """Import the agent page's functions without running its main()"""
+    spec = importlib.util.spec_from_file_location("yello_agent_page", AGENT_PAGE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+class _Response:
+    def __init__(self, value):
+        self.value = value
+
+def _named(class_name: str, value):
+    return type(class_name, (_Response,), {})(value)
+
+def _data_path_cases(path: str, workdir: str, repeat: int) -> List[Dict[str, Any]]:
+    """Time the calls the dashboard's render() makes, cold and warm, from inside workdir"""
+    results = []
+    results.append(measure("load.read_extract", lambda: read_extract(path, chunksize=CHUNK_ROWS), repeat=max(repeat // 2, 1)))
+
+    df = read_extract(path)
+    snapshot = os.path.join(workdir, "snapshot.feather")
+    write_snapshot(df, snapshot)
+    results.append(measure("load.read_snapshot", lambda: read_snapshot(snapshot), repeat))
+
+    cube = build_cube(df, version="bench")
+    results.append(measure("cube.build_cube", lambda: build_cube(df, version="bench"), repeat))
+    ingest_frame(df, "store")
+    units = store_units("store")
+    results.append(measure(
+        "cube.read_store_cube",
+        lambda: [read_store_cube(unit_dir("store", unit)) for unit in units], repeat
+    ))
+
+    budget = PARTITION_MEMORY_BUDGET_MB * 1024 * 1024
+    for label, source in (("extract", path), ("store", "store")):
+        # A fresh cache per run: the first selection after a deploy or a source change.
+        results.append(measure(
+            f"partitions.cube_for.all.{label}.cold",
+            lambda: PartitionCache(source, budget, regions=None).cube_for(["All"]), repeat
+        ))
+        partitions = PartitionCache(source, budget, regions=None)
+        partitions.cube_for(["All"])
+        results.append(measure(f"partitions.cube_for.all.{label}.warm", lambda: partitions.cube_for(["All"]), repeat))
+
+    centers = cube.agents['servicecentername'].cat.categories.tolist()
+    latest = cube.daily.index.max()
+    date_range = (latest - pd.Timedelta(days=29), latest)
+    selections = {
+        "all": (["All"], ["All"]),
+        "one_unit": (units[:1], ["All"]),
+        "two_units_two_centers": (units[:2], centers[:2]),
+    }
+    for label, (selected_units, selected_centers) in selections.items():
+        results.append(measure(
+            f"memo.compute_selection.{label}",
+            lambda: compute_selection(cube, selected_units, selected_centers), repeat
+        ))
+        base = compute_selection(cube, selected_units, selected_centers)
+        results.append(measure(
+            f"memo.compute_range.{label}.30_days",
+            lambda: compute_range(cube, base, selected_units, selected_centers, *date_range), repeat
+        ))
+        memoized_selection(cube, selected_units, selected_centers, date_range)
+        results.append(measure(
+            f"memo.memoized_selection.{label}.cached",
+            lambda: memoized_selection(cube, selected_units, selected_centers, date_range), repeat
+        ))
+
+    rows, _ = memoized_selection(cube, ["All"], ["All"])
+    top, _ = rank_agents(rows, 5)
+    results.append(measure("ranking.rank_agents", lambda: rank_agents(rows, 5), repeat))
+    results.append(measure("chart.create_agent_performance_chart", lambda: create_agent_performance_chart(top), repeat))
+    get_figure_cache().clear()
+    agent_chart_spec(top)
+    results.append(measure("chart.agent_chart_spec.cached", lambda: agent_chart_spec(top), repeat))
+
+    key = selection_key(cube, ["All"], ["All"])
+    for frequency in RESAMPLE_RULES:
+        series = memoized_series(cube, ["All"], ["All"], frequency=frequency)
+        results.append(measure(
+            f"chart.series_chart_spec.{frequency}.{len(series)}_points",
+            lambda: series_chart_spec(memoized_series(cube, ["All"], ["All"], frequency=frequency)), repeat
+        ))
+        series_chart_spec(series, key=key + (frequency,))
+        results.append(measure(
+            f"chart.series_chart_spec.{frequency}.cached",
+            lambda: series_chart_spec(memoized_series(cube, ["All"], ["All"], frequency=frequency), key=key + (frequency,)),
+            repeat
+        ))
+    return results
+
+def run_benchmarks(path: str, repeat: int = 5, history: int = 200) -> List[Dict[str, Any]]:
+    path = os.path.abspath(path)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="mymtn-bench-") as workdir:
+        # Snapshots and the store are written relative to the working directory.
+        os.chdir(workdir)
+        try:
+            results = _data_path_cases(path, workdir, repeat)
+        finally:
+            os.chdir(cwd)
+
+    page = _load_agent_page()
+    table = pd.read_csv(path, nrows=1000)
+    results.append(measure("chat.process_response.string", lambda: page.process_response(_named("StringResponse", "answer")), repeat))
+    results.append(measure("chat.process_response.number", lambda: page.process_response(_named("NumberResponse", 12345)), repeat))
+    results.append(measure(
+        "chat.process_response.dataframe",
+        lambda: page.process_response(_named("DataFrameResponse", table)), repeat
+    ))
+    messages = [
+        {"role": "user" if i % 2 else "assistant", "content": f"message {i} " * 20, "type": "text"}
+        for i in range(history)
+    ]
+    results.append(measure(
+        f"chat.create_chat_html.{history}_messages",
+        lambda: [page.create_chat_html(message["role"], message["content"]) for message in messages], repeat
+    ))
+    return results
+
+def measure_startup(name: str, page: str, repeat: int = 3) -> Dict[str, Any]:
+    """Time a page's first run in repeat fresh interpreters"""
+    runs = []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, "-c", STARTUP_SCRIPT, page, *HEAVY_MODULES],
+            capture_output=True, text=True, check=True, cwd=ROOT
+        )
+        runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    timings = [run["seconds"] for run in runs]
+    result = {
+        "name": name,
+        "repeat": repeat,
+        "wall_min_s": min(timings),
+        "wall_median_s": statistics.median(timings),
+        "exceptions": runs[-1]["exceptions"],
+        "heavy_modules_loaded": runs[-1]["loaded"],
+    }
+    logging.info(f"{name:<40} {result['wall_min_s'] * 1e3:>10.2f} ms  loaded: {', '.join(result['heavy_modules_loaded']) or '-'}")
+    return result
+
+def run_startup(repeat: int = 3) -> List[Dict[str, Any]]:
+    return [
+        measure_startup("startup.dashboard", DASHBOARD_PAGE, repeat),
+        measure_startup("startup.agent", AGENT_PAGE, repeat),
+    ]
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Names of cases whose best wall time exceeds the baseline's by more than threshold (e.g. 1.2)"""
+    previous = {case["name"]: case for case in baseline["results"]}
+    regressions = []
+    for case in results:
+        before = previous.get(case["name"])
+        if before is None or before["wall_min_s"] <= 0:
+            continue
+        ratio = case["wall_min_s"] / before["wall_min_s"]
+        logging.info(f"{case['name']:<40} {ratio:>6.2f}x")
+        if ratio > threshold:
+            regressions.append(case["name"])
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MyMTN data path and agent page rendering.")
+    parser.add_argument("--rows", type=int, default=50_000, help="Synthetic extract size (50k to 50M)")
+    parser.add_argument("--units", type=int, default=4)
+    parser.add_argument("--centers", type=int, default=40)
+    parser.add_argument("--agents", type=int, default=800)
+    parser.add_argument("--days", type=int, default=285)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--source", help="Benchmark an existing extract instead of generating one")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--history", type=int, default=200, help="Chat messages rendered per chat case")
+    parser.add_argument("--startup", action="store_true", help="Measure each page's cold first run instead")
+    parser.add_argument("--out", help="Write results as JSON")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Slowdown ratio counted as a regression")
+    args = parser.parse_args()
+
+    path = args.source
+    if args.startup:
+        results = run_startup(args.repeat)
+    else:
+        with tempfile.TemporaryDirectory(prefix="mymtn-bench-") as workdir:
+            if path is None:
+                path = os.path.join(workdir, "extract.csv")
+                logging.info(f"Generating {args.rows:,} rows at {path}")
+                generate_extract(path, args.rows, args.units, args.centers, args.agents, args.days, args.seed)
+            results = run_benchmarks(path, args.repeat, args.history)
+
+    report = {
+        "meta": {
+            "mode": "startup" if args.startup else "data",
+            "rows": args.rows if args.source is None and not args.startup else None,
+            "source": args.source,
+            "units": args.units,
+            "centers": args.centers,
+            "agents": args.agents,
+            "days": args.days,
+            "seed": args.seed,
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as out:
+            json.dump(report, out, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            regressions = compare(report["results"], json.load(baseline), args.threshold)
+        if regressions:
+            logging.error(f"Regressions beyond {args.threshold:.2f}x: {', '.join(regressions)}")
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Build and publish the Y'ello Agent dataset outside the dashboard request path.
+
+Run ahead of deployment (or from cron) with:
+
+    python -m utils.bootstrap [--source data/mymtn.csv] [--force]
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional
+import streamlit as st
+from config.settings import REGIONS
+from utils.data_processing import create_dataset, DATASET_PATH
+from utils.store import current_source, load_source, source_version, write_json_atomic
+
+logging.basicConfig(level=logging.INFO)
+
+DATASET_DIR = os.path.join("datasets", DATASET_PATH)
+# Kept beside the dataset, not in it: the dataset path is a symlink swapped on every publish.
+READY_FLAG = DATASET_DIR + ".ready"
+LOCK_FILE = os.path.join("datasets", ".bootstrap.lock")
+STALE_LOCK_SECONDS = 30 * 60
+
+def dataset_ready() -> bool:
+    """Cheap readiness check: the flag is only written after a successful publish"""
+    return os.path.isfile(READY_FLAG)
+
+def dataset_version() -> Optional[str]:
+    """Source version recorded by the last successful publish, if any"""
+    try:
+        with open(READY_FLAG) as flag:
+            return json.load(flag).get("source_version")
+    except (OSError, ValueError):
+        return None
+
+def dataset_fingerprint() -> Optional[str]:
+    """Cheap fingerprint of the published parquet; changes whenever the dataset is rebuilt"""
+    try:
+        stat = os.stat(os.path.join(DATASET_DIR, "data.parquet"))
+    except OSError:
+        return None
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+def acquire_lock() -> bool:
+    """Take the bootstrap lock so only one process builds at a time"""
+    os.makedirs(os.path.dirname(LOCK_FILE), exist_ok=True)
+    if os.path.exists(LOCK_FILE) and time.time() - os.path.getmtime(LOCK_FILE) > STALE_LOCK_SECONDS:
+        logging.warning(f"Removing stale bootstrap lock {LOCK_FILE}")
+        os.remove(LOCK_FILE)
+    try:
+        fd = os.open(LOCK_FILE, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+    with os.fdopen(fd, "w") as lock:
+        lock.write(str(os.getpid()))
+    return True
+
+def release_lock() -> None:
+    if os.path.exists(LOCK_FILE):
+        os.remove(LOCK_FILE)
+
+def mark_ready(source: str, version: str, rows: int) -> None:
+    """Atomically write the readiness flag for a freshly published dataset"""
+    payload = {
+        "source": source,
+        "source_version": version,
+        "rows": rows,
+        "published_at": time.time()
+    }
+    write_json_atomic(os.path.dirname(READY_FLAG), os.path.basename(READY_FLAG), payload)
+
+def bootstrap_dataset(source: str, force: bool = False) -> bool:
+    """Build the agent dataset from source and publish it.
+
+    Returns True when a dataset is published (or already current) and False
+    when another process holds the bootstrap lock.
+    """
+    version = source_version(source)
+    if not force and dataset_ready() and dataset_version() == version:
+        logging.info(f"Dataset at {DATASET_PATH} is current ({version}).")
+        return True
+    if not acquire_lock():
+        logging.info("Another process is bootstrapping the dataset.")
+        return False
+    try:
+        # The previous dataset stays live (and ready) until the new one is swapped in.
+        df = load_source(source, REGIONS)
+        create_dataset(df, overwrite=True)
+        mark_ready(source, version, len(df))
+        logging.info(f"Published dataset {DATASET_PATH} ({version}).")
+        return True
+    finally:
+        release_lock()
+
+def dataset_current(source: str) -> bool:
+    """Whether the published dataset was built from the current version of source"""
+    return dataset_ready() and dataset_version() == source_version(source)
+
+@st.cache_resource
+def start_background_bootstrap(source: str, version: str) -> threading.Thread:
+    """Start (once per process and source version) a daemon thread that bootstraps the dataset"""
+    def _run():
+        try:
+            bootstrap_dataset(source)
+        except Exception as e:
+            logging.error(f"Background dataset bootstrap failed: {e}")
+
+    thread = threading.Thread(target=_run, name="dataset-bootstrap", daemon=True)
+    thread.start()
+    return thread
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and publish the Y'ello Agent dataset.")
+    parser.add_argument(
+        "--source",
+        default=current_source(),
+        help="Raw MTN extract or partitioned store to publish (default: the store if ingested, else the extract)"
+    )
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the published dataset is current")
+    args = parser.parse_args()
+    if not bootstrap_dataset(args.source, force=args.force):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+from typing import List, Tuple
+import pandas as pd
+from utils.data_processing import (concat_compact,
+                                   TEXT_COLUMNS,
+                                   MEASURE_COLUMNS)
+from utils.indexes import SelectionIndex, build_selection_index
+from utils.instrumentation import timed
+from utils.store import read_agents, read_partitions
+
+@dataclass
+class AggregateCube:
+    """Pre-summed measures at two grains.
+
+    daily:  one row per (unit, center, agent, date_key), indexed and sorted by date_key.
+    agents: one row per (unit, center, agent) with the date dimension rolled up.
+    agents_index / daily_index: unit and center inverted indexes over each grain.
+    version: identifies the source data, used to key downstream caches.
+    """
+    daily: pd.DataFrame
+    agents: pd.DataFrame
+    agents_index: SelectionIndex
+    daily_index: SelectionIndex
+    version: str = ""
+
+def build_daily(df: pd.DataFrame) -> pd.DataFrame:
+    """Sum the cleaned fact rows to one row per (unit, center, agent, date_key)"""
+    daily = (
+        df.groupby(TEXT_COLUMNS + [df.index.rename('date_key')], observed=True)[MEASURE_COLUMNS]
+        .sum()
+        .reset_index(level=TEXT_COLUMNS)
+    )
+    daily['year'] = daily.index.year.astype('int16')
+    daily['month'] = daily.index.month.astype('int8')
+    daily['day'] = daily.index.day.astype('int8')
+    return daily
+
+def build_agents(daily: pd.DataFrame) -> pd.DataFrame:
+    """Roll the date dimension up to one row per (unit, center, agent)"""
+    return (
+        daily.groupby(TEXT_COLUMNS, observed=True)[MEASURE_COLUMNS]
+        .sum()
+        .reset_index()
+    )
+
+def assemble_cube(daily: pd.DataFrame, agents: pd.DataFrame, version: str = "") -> AggregateCube:
+    """Wrap prebuilt cube grains and index them, sorting the daily grain by date once"""
+    if not daily.index.is_monotonic_increasing:
+        daily = daily.sort_index(kind='stable')
+    return AggregateCube(
+        daily=daily,
+        agents=agents,
+        agents_index=build_selection_index(agents),
+        daily_index=build_selection_index(daily),
+        version=version
+    )
+
+def build_cube(df: pd.DataFrame, version: str = "") -> AggregateCube:
+    """Aggregate the cleaned fact table once so reruns never scan raw rows"""
+    daily = build_daily(df)
+    return assemble_cube(daily, build_agents(daily), version=version)
+
+@timed()
+def read_store_cube(unit_path: str, version: str = "") -> AggregateCube:
+    """Assemble a cube from one unit partition of the store without re-aggregating.
+
+    The store already holds the per-day cube partitions and running agent totals.
+    """
+    return assemble_cube(read_partitions(unit_path, "cube"), read_agents(unit_path), version=version)
+
+def merge_cubes(cubes: List[AggregateCube]) -> AggregateCube:
+    """Combine cubes for disjoint business units into one"""
+    if len(cubes) == 1:
+        return cubes[0]
+    daily = concat_compact([cube.daily for cube in cubes if not cube.daily.empty])
+    agents = concat_compact([cube.agents for cube in cubes if not cube.agents.empty]).reset_index(drop=True)
+    return assemble_cube(daily, agents, version="+".join(cube.version for cube in cubes))
+
+def date_bounds(daily: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp) -> Tuple[int, int]:
+    """Row bounds [lo, hi) of the dates start..end (inclusive) in the date-sorted daily grain"""
+    return (
+        int(daily.index.searchsorted(pd.Timestamp(start), side='left')),
+        int(daily.index.searchsorted(pd.Timestamp(end), side='right'))
+    )
+
+def cube_nbytes(cube: AggregateCube) -> int:
+    """Approximate memory held by a cube, used for partition budgeting"""
+    index_bytes = sum(
+        positions.nbytes
+        for index in (cube.agents_index, cube.daily_index)
+        for postings in (index.unit_rows, index.center_rows)
+        for positions in postings.values()
+    )
+    return int(cube.daily.memory_usage(deep=True).sum() + cube.agents.memory_usage(deep=True).sum() + index_bytes)
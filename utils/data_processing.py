@@ -1,22 +1,60 @@
+import numpy as np
 import pandas as pd
-from typing import List
-import streamlit as st
-import pandasai as pai
-import tempfile
+from typing import List, Optional, Sequence
+from pandas.api.types import union_categoricals
+import shutil
 import os
 import logging
+import time
+from utils.instrumentation import record_cache, timed
+from utils.services import pandasai
+from utils.snapshot import read_snapshot, snapshot_key, snapshot_path, write_snapshot
 
 logging.basicConfig(level=logging.INFO)
 
-pai.api_key.set(os.getenv("PANDASAI_API_KEY"))
+TEXT_COLUMNS = ['salesbusinessunitname', 'servicecentername', 'agentname']
+MEASURE_COLUMNS = ['download', 'mau']
+DATASET_PATH = "mtnghana/mymtn"
+DATASET_COLUMNS = ['date_key'] + TEXT_COLUMNS + MEASURE_COLUMNS + ['year', 'month', 'day']
+CHUNK_ROWS = 250_000
+RAW_DTYPES = {
+    'date_key': 'int32',
+    'salesbusinessunitname': 'category',
+    'servicecentername': 'category',
+    'agentname': 'category',
+    'download': 'float32',
+    'mau': 'float32'
+}
 
-@st.cache_data
-def load_and_preprocess_data(file_path: str) -> pd.DataFrame:
-    """Load and preprocess the MTN data"""
-    df = pd.read_csv(file_path)
-    
+def _map_categories(column: pd.Series, func) -> pd.Categorical:
+    """Apply a vectorized string transform to the distinct values only, then remap the codes"""
+    categorical = pd.Categorical(column)
+    mapped_codes, uniques = pd.factorize(func(pd.Series(categorical.categories, dtype=object)))
+    codes = categorical.codes
+    new_codes = np.where(codes >= 0, mapped_codes[codes], -1) if len(mapped_codes) else codes
+    return pd.Categorical.from_codes(new_codes, categories=uniques)
+
+def normalize_unit(names: pd.Series) -> pd.Series:
+    """Business unit names as the dashboard shows them: title case without the bracketed region code"""
+    return names.str.title().str.replace(r'\s*\([^)]*\)', '', regex=True)
+
+def preprocess_data(df: pd.DataFrame, regions: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Clean a raw MTN extract: parse dates, normalize names and fill gaps.
+
+    Business units are normalized first so rows outside regions (None keeps
+    every unit) are dropped before the date parsing and the remaining string
+    normalization. String transforms run on each column's distinct values
+    rather than per row.
+    """
     df.columns = df.columns.str.lower()
     
+    units = pd.Series(_map_categories(df['salesbusinessunitname'], normalize_unit), index=df.index)
+    if regions is not None:
+        keep = units.isin(regions).to_numpy()
+        df = df[keep].copy()
+        units = units[keep]
+    df['salesbusinessunitname'] = units
+    
     df['date_key'] = pd.to_datetime(df['date_key'], format='%Y%m%d')
     
     df['year'] = df['date_key'].dt.year
@@ -25,35 +63,180 @@ def load_and_preprocess_data(file_path: str) -> pd.DataFrame:
     
     df.set_index('date_key', inplace=True)
     
-    text_columns = ['salesbusinessunitname', 'servicecentername', 'agentname']
-    for col in text_columns:
-        df[col] = df[col].str.title()
+    for col in ['servicecentername', 'agentname']:
+        df[col] = _map_categories(df[col], lambda names: names.str.title())
     
-    df['salesbusinessunitname'] = df['salesbusinessunitname'].str.replace(r'\s*\([^)]*\)', '', regex=True)
+    for col in TEXT_COLUMNS:
+        if df[col].isna().any():
+            df[col] = df[col].cat.add_categories('N/A').fillna('N/A')
+    df[MEASURE_COLUMNS] = df[MEASURE_COLUMNS].fillna(0)
     
-    df[text_columns] = df[text_columns].fillna('N/A')
-    df[['download', 'mau']] = df[['download', 'mau']].fillna(0)
+    return compact_dataframe(df)
+
+def read_extract(
+    file_path: str,
+    regions: Optional[Sequence[str]] = None,
+    chunksize: int = CHUNK_ROWS
+) -> pd.DataFrame:
+    """Stream a raw extract in chunks, keeping only the cleaned rows for regions.
+
+    Only the known columns are parsed, with explicit dtypes, so peak memory
+    is bounded by chunksize plus the surviving rows rather than the file size.
+    """
+    usecols, dtype = _raw_columns(file_path, RAW_DTYPES)
+    
+    parts = []
+    for chunk in pd.read_csv(file_path, usecols=usecols, dtype=dtype, chunksize=chunksize):
+        part = preprocess_data(chunk, regions)
+        if not part.empty:
+            parts.append(part)
+    return concat_compact(parts)
+
+def _raw_columns(file_path: str, wanted: dict):
+    """Map the (case-insensitive) wanted columns onto the file's header"""
+    header = pd.read_csv(file_path, nrows=0).columns
+    usecols = [col for col in header if col.lower() in wanted]
+    return usecols, {col: wanted[col.lower()] for col in usecols}
+
+def list_units(file_path: str, chunksize: int = CHUNK_ROWS) -> List[str]:
+    """Normalized business units in an extract, reading only that column"""
+    usecols, dtype = _raw_columns(file_path, {'salesbusinessunitname': 'category'})
+    units = set()
+    for chunk in pd.read_csv(file_path, usecols=usecols, dtype=dtype, chunksize=chunksize):
+        categories = chunk.iloc[:, 0].cat.categories
+        units.update(normalize_unit(pd.Series(categories, dtype=object)).dropna())
+    return sorted(units)
+
+def concat_compact(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate compact frames, unioning their categories instead of falling back to strings"""
+    if not frames:
+        return compact_dataframe(pd.DataFrame(
+            {col: pd.Series(dtype=object) for col in TEXT_COLUMNS + MEASURE_COLUMNS + ['year', 'month', 'day']},
+            index=pd.DatetimeIndex([], name='date_key')
+        ))
+    if len(frames) == 1:
+        return frames[0]
+    combined = pd.concat([frame.drop(columns=TEXT_COLUMNS) for frame in frames])
+    for col in TEXT_COLUMNS:
+        columns = [frame[col] for frame in frames]
+        # Partitions read back from Arrow and freshly parsed chunks can disagree on the
+        # categories' dtype (object vs string), which union_categoricals rejects.
+        dtype = columns[0].cat.categories.dtype
+        columns = [
+            column if column.cat.categories.dtype == dtype
+            else column.cat.rename_categories(column.cat.categories.astype(dtype))
+            for column in columns
+        ]
+        combined[col] = union_categoricals(columns, sort_categories=True)
+    return combined[frames[0].columns]
+
+def compact_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """Store dimensions as categorical codes and measures/date parts as the smallest integer types"""
+    df = df.copy()
+    for col in TEXT_COLUMNS:
+        df[col] = df[col].astype('category').cat.remove_unused_categories()
+    for col in MEASURE_COLUMNS:
+        df[col] = pd.to_numeric(df[col].round().astype('int64'), downcast='integer')
+    df['year'] = df['year'].astype('int16')
+    df['month'] = df['month'].astype('int8')
+    df['day'] = df['day'].astype('int8')
+    return df
+
+@timed()
+def load_extract(file_path: str, regions: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Load and preprocess an extract, reusing the columnar snapshot when the source is unchanged"""
+    scope = ",".join(sorted(regions)) if regions is not None else "*"
+    path = snapshot_path(file_path, snapshot_key(file_path, scope), scope)
+    df = read_snapshot(path)
+    record_cache("snapshot", hit=df is not None)
+    if df is not None:
+        logging.info(f"Loaded preprocessed snapshot {path}")
+        return df
     
-    df = df[df['salesbusinessunitname'] == 'Eastern Volta']
+    df = read_extract(file_path, regions)
+    write_snapshot(df, path)
     
     return df
 
-def create_dataset(df):
+def to_dataset_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Flatten the cleaned frame into the column layout declared for the agent dataset"""
+    out = df.reset_index()
+    out['date_key'] = out['date_key'].dt.strftime('%Y%m%d').astype('int64')
+    for col in TEXT_COLUMNS:
+        out[col] = out[col].astype(str)
+    return out[DATASET_COLUMNS]
+
+@timed()
+def create_dataset(df, overwrite: bool = False):
     """
     Create a dataset for the agent.
+
+    The cleaned frame is handed to pandasai in memory; no intermediate CSV
+    is written. An existing dataset is kept unless overwrite is set.
+    """
+    _publish_dataset_frame(to_dataset_frame(df), overwrite=overwrite)
+
+def append_to_dataset(df: pd.DataFrame) -> None:
+    """
+    Add newly cleaned rows to the published agent dataset.
+
+    Existing rows are read back from the dataset's parquet file rather than
+    re-cleaned; rows for the (date, business unit) pairs present in df are
+    replaced, as the store replaces a unit's day partition.
     """
-    temp_path = None
-    dataset_path = "mtnghana/mymtn"
+    parquet_path = os.path.join("datasets", DATASET_PATH, 'data.parquet')
+    new_rows = to_dataset_frame(df)
+    if os.path.isfile(parquet_path):
+        existing = pd.read_parquet(parquet_path, columns=DATASET_COLUMNS)
+        key = ['date_key', 'salesbusinessunitname']
+        replaced = pd.MultiIndex.from_frame(new_rows[key].drop_duplicates())
+        existing = existing[~pd.MultiIndex.from_frame(existing[key]).isin(replaced)]
+        new_rows = pd.concat([existing, new_rows], ignore_index=True)
+    _publish_dataset_frame(new_rows, overwrite=True)
+
+def _swap_into_place(dataset_dir: str, version_dir: str) -> None:
+    """Point the live dataset path at version_dir with one atomic symlink replace, keeping the previous version"""
+    parent = os.path.dirname(dataset_dir)
+    previous = os.path.realpath(dataset_dir) if os.path.islink(dataset_dir) else None
+    if os.path.isdir(dataset_dir) and not os.path.islink(dataset_dir):
+        # Datasets published before versioning were plain directories.
+        previous = os.path.join(parent, f".{os.path.basename(dataset_dir)}-legacy")
+        os.replace(dataset_dir, previous)
+    link = dataset_dir + ".link.tmp"
+    if os.path.lexists(link):
+        os.remove(link)
+    os.symlink(os.path.basename(version_dir), link)
+    os.replace(link, dataset_dir)
+
+    prefix = f".{os.path.basename(dataset_dir)}-"
+    keep = {os.path.realpath(version_dir), os.path.realpath(previous) if previous else None}
+    for name in os.listdir(parent):
+        stale = os.path.realpath(os.path.join(parent, name))
+        if name.startswith(prefix) and stale not in keep:
+            shutil.rmtree(stale, ignore_errors=True)
+
+def _publish_dataset_frame(dataset_df: pd.DataFrame, overwrite: bool) -> None:
+    """Create and push the pandasai dataset from a frame already in DATASET_COLUMNS layout.
+
+    The dataset is built under a staging path and moved to a versioned
+    directory; the live path is a symlink swapped atomically, so readers
+    never see a missing or half-written dataset.
+    """
+    dataset_path = DATASET_PATH
+    dataset_dir = os.path.join("datasets", dataset_path)
+    org, name = dataset_path.split("/")
+    staging_path = f"{org}-staging/{name}"
+    staging_dir = os.path.join("datasets", staging_path)
     try:
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as temp_file:
-            temp_path = temp_file.name
-            df.to_csv(temp_path, index=False)
-        pdf = pai.read_csv(temp_path)
-        if os.path.exists(os.path.join("datasets", dataset_path)) and os.path.isfile(os.path.join("datasets", dataset_path, 'data.parquet')):
+        if os.path.isfile(os.path.join(dataset_dir, 'data.parquet')) and not overwrite:
             logging.info(f"Dataset exists at {dataset_path}, skipping creation.")
         else:
-            mymtn = pai.create(
-                path=dataset_path,
+            if os.path.isdir(staging_dir):
+                shutil.rmtree(staging_dir)
+            pai = pandasai()
+            pdf = pai.DataFrame(dataset_df)
+            pai.create(
+                path=staging_path,
                 df=pdf,
                 description="""
                 This dataset tracks digital service performance metrics (e.g., downloads, monthly active users) across sales business units, service centers, and individual agents. It includes granular details such as geographic regions, service locations, agent names, and daily records of activity. The data enables analysis of operational efficiency, agent productivity, and user engagement trends over time.
@@ -105,29 +288,16 @@ def create_dataset(df):
                     }
                 ]
             )
-            mymtn.push()
+            os.makedirs(os.path.dirname(dataset_dir), exist_ok=True)
+            version_dir = os.path.join(os.path.dirname(dataset_dir), f".{name}-{time.time_ns()}")
+            os.replace(staging_dir, version_dir)
+            try:
+                os.rmdir(os.path.dirname(staging_dir))
+            except OSError:
+                pass
+            _swap_into_place(dataset_dir, version_dir)
+            pai.load(dataset_path).push()
             logging.info(f"Dataset created at {dataset_path} and pushed to PandasAI.")
     except Exception as e:
         logging.error(f"Dataset creation failed: {str(e)}")
         raise
-    finally:
-        if temp_path and os.path.exists(temp_path):
-            os.remove(temp_path)
-            logging.info(f"Cleaned up temporary file: {temp_path}")
-
-def filter_dataframe(
-    df: pd.DataFrame,
-    selected_units: List[str],
-    selected_centers: List[str]
-) -> pd.DataFrame:
-    """Filter dataframe based on selected units and centers with validation"""
-    if not selected_units or not selected_centers:
-        return pd.DataFrame() 
-        
-    filtered_df = df.copy()
-    if "All" not in selected_units:
-        filtered_df = filtered_df[filtered_df['salesbusinessunitname'].isin(selected_units)]
-    if "All" not in selected_centers:
-        filtered_df = filtered_df[filtered_df['servicecentername'].isin(selected_centers)]
-    
-    return filtered_df
\ No newline at end of file
@@ -0,0 +1,87 @@
+from dataclasses import dataclass
+from functools import reduce
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+@dataclass
+class SelectionIndex:
+    """Inverted indexes from business unit / service center to sorted row positions"""
+    unit_rows: Dict[str, np.ndarray]
+    center_rows: Dict[str, np.ndarray]
+    unit_centers: Dict[str, List[str]]
+    n_rows: int
+
+INDEXED_COLUMNS = ['salesbusinessunitname', 'servicecentername']
+
+def _postings(column: pd.Series, order: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """Map each category to the ascending row positions holding it.
+
+    order is the column's stable argsort by category code; pass a published
+    one (see selection_orders) to slice postings out of it without copying.
+    """
+    codes = column.cat.codes.to_numpy()
+    if order is None:
+        order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes[codes >= 0], minlength=len(column.cat.categories))
+    offset = int((codes < 0).sum())
+    postings = {}
+    for category, count in zip(column.cat.categories, counts):
+        if count:
+            postings[category] = order[offset:offset + count]
+        offset += count
+    return postings
+
+def selection_orders(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Stable argsort of each indexed column's codes, the bulk of a SelectionIndex"""
+    return {col: np.argsort(df[col].cat.codes.to_numpy(), kind='stable') for col in INDEXED_COLUMNS}
+
+def build_selection_index(df: pd.DataFrame, orders: Optional[Dict[str, np.ndarray]] = None) -> SelectionIndex:
+    """Build the unit/center inverted indexes and unit→centers map once at load time"""
+    orders = orders or {}
+    pairs = df[['salesbusinessunitname', 'servicecentername']].drop_duplicates()
+    unit_centers = {
+        unit: sorted(group['servicecentername'].astype(str).unique().tolist())
+        for unit, group in pairs.groupby('salesbusinessunitname', observed=True)
+    }
+    return SelectionIndex(
+        unit_rows=_postings(df['salesbusinessunitname'], orders.get('salesbusinessunitname')),
+        center_rows=_postings(df['servicecentername'], orders.get('servicecentername')),
+        unit_centers=unit_centers,
+        n_rows=len(df)
+    )
+
+def _union(postings: Dict[str, np.ndarray], values: List[str]) -> np.ndarray:
+    arrays = [postings[value] for value in values if value in postings]
+    if not arrays:
+        return np.empty(0, dtype=np.intp)
+    if len(arrays) == 1:
+        return arrays[0]
+    return np.sort(np.concatenate(arrays))
+
+def select_rows(
+    index: SelectionIndex,
+    selected_units: List[str],
+    selected_centers: List[str]
+) -> Optional[np.ndarray]:
+    """Sorted row positions matching the selection, or None when every row matches"""
+    selections = []
+    if "All" not in selected_units:
+        selections.append(_union(index.unit_rows, selected_units))
+    if "All" not in selected_centers:
+        selections.append(_union(index.center_rows, selected_centers))
+    if not selections:
+        return None
+    return reduce(lambda a, b: np.intersect1d(a, b, assume_unique=True), selections)
+
+def clip_positions(positions: np.ndarray, lo: int, hi: int) -> np.ndarray:
+    """The sorted positions falling in rows [lo, hi), found by binary search"""
+    return positions[np.searchsorted(positions, lo, side='left'):np.searchsorted(positions, hi, side='left')]
+
+def centers_for_units(index: SelectionIndex, selected_units: List[str]) -> List[str]:
+    """Service centers available under the selected business units"""
+    if "All" in selected_units:
+        units = index.unit_centers.keys()
+    else:
+        units = [unit for unit in selected_units if unit in index.unit_centers]
+    return sorted({center for unit in units for center in index.unit_centers[unit]})
@@ -0,0 +1,142 @@
+"""Incrementally ingest daily MTN extracts into the region- and date-partitioned store.
+
+    python -m utils.ingest --seed data/mymtn.csv          # one-off: split a full extract into partitions
+    python -m utils.ingest data/deltas/20241001.csv ...   # daily: append only the new days
+"""
+import argparse
+import logging
+from typing import Dict, List
+import pandas as pd
+from config.settings import REGIONS, STORE_DIR
+from utils.bootstrap import acquire_lock, release_lock, mark_ready, dataset_ready
+from utils.cube import build_daily, build_agents
+from utils.data_processing import (read_extract,
+                                   append_to_dataset,
+                                   create_dataset,
+                                   concat_compact,
+                                   MEASURE_COLUMNS,
+                                   TEXT_COLUMNS)
+from utils.store import (read_regions,
+                         write_regions,
+                         unit_dir,
+                         unit_slug,
+                         store_units,
+                         read_manifest,
+                         write_manifest,
+                         read_partitions,
+                         read_agents,
+                         write_partition,
+                         write_agents,
+                         recategorize,
+                         load_source,
+                         source_version)
+
+logging.basicConfig(level=logging.INFO)
+
+def _merge_agent_totals(agents: pd.DataFrame, delta: pd.DataFrame, sign: int) -> pd.DataFrame:
+    """Add (sign=1) or subtract (sign=-1) per-agent totals from the running totals"""
+    if delta.empty:
+        return agents
+    delta = delta.copy()
+    delta[MEASURE_COLUMNS] = delta[MEASURE_COLUMNS].astype('int64') * sign
+    merged = recategorize(pd.concat([agents, delta], ignore_index=True))
+    merged = merged.groupby(TEXT_COLUMNS, observed=True)[MEASURE_COLUMNS].sum().reset_index()
+    return merged[(merged[MEASURE_COLUMNS] != 0).any(axis=1)].reset_index(drop=True)
+
+def ingest_frame(df: pd.DataFrame, store_dir: str = STORE_DIR) -> Dict[str, List[str]]:
+    """Split cleaned rows by business unit and ingest each unit's partition.
+
+    Returns the ingested dates (YYYYMMDD) per business unit.
+    """
+    regions = read_regions(store_dir)
+    ingested = {}
+    for unit, rows in df.groupby('salesbusinessunitname', observed=True):
+        rows = rows.copy()
+        for col in TEXT_COLUMNS:
+            rows[col] = rows[col].cat.remove_unused_categories()
+        dates = ingest_unit_frame(rows, unit_dir(store_dir, unit))
+        if dates:
+            regions["units"][unit] = unit_slug(unit)
+            ingested[unit] = dates
+    if ingested:
+        regions["version"] += 1
+        write_regions(store_dir, regions)
+    return ingested
+
+def ingest_unit_frame(df: pd.DataFrame, unit_path: str) -> List[str]:
+    """Write one unit's cleaned rows into per-day partitions and update its aggregates.
+
+    Days already in the partition are replaced: their previous agent totals
+    are subtracted before the new ones are added, so re-running a delta is
+    safe. Returns the ingested dates as YYYYMMDD strings.
+    """
+    manifest = read_manifest(unit_path)
+    known = set(manifest["dates"])
+    agents = read_agents(unit_path)
+    ingested = []
+
+    for day, rows in df.groupby(level='date_key'):
+        key = f"{day:%Y%m%d}"
+        if key in known:
+            previous = read_partitions(unit_path, "cube", [key])
+            agents = _merge_agent_totals(agents, build_agents(previous), sign=-1)
+        daily = build_daily(rows)
+        write_partition(unit_path, "rows", day, rows)
+        write_partition(unit_path, "cube", day, daily)
+        agents = _merge_agent_totals(agents, build_agents(daily), sign=1)
+        manifest["rows"][key] = len(rows)
+        ingested.append(key)
+
+    if ingested:
+        write_agents(unit_path, agents)
+        manifest["dates"] = sorted(known | set(ingested))
+        manifest["version"] += 1
+        write_manifest(unit_path, manifest)
+        logging.info(f"Ingested {len(ingested)} day(s) into {unit_path} (version {manifest['version']}).")
+    return ingested
+
+def ingest_delta(file_path: str, store_dir: str = STORE_DIR) -> pd.DataFrame:
+    """Clean only the rows of a delta extract and ingest them (every region is kept)"""
+    df = read_extract(file_path)
+    ingest_frame(df, store_dir)
+    return df
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally ingest MTN extracts.")
+    parser.add_argument("deltas", nargs="*", help="Per-day delta CSV files")
+    parser.add_argument("--seed", help="Full extract to split into the store (replaces overlapping days)")
+    parser.add_argument("--store", default=STORE_DIR, help="Partitioned store directory")
+    parser.add_argument("--skip-dataset", action="store_true", help="Do not update the Y'ello Agent dataset")
+    args = parser.parse_args()
+
+    if not acquire_lock():
+        raise SystemExit("Another ingest or bootstrap is running.")
+    try:
+        frames = []
+        if args.seed:
+            seed = read_extract(args.seed)
+            ingest_frame(seed, args.store)
+            frames.append(seed)
+        for delta in args.deltas:
+            frames.append(ingest_delta(delta, args.store))
+        if args.skip_dataset or not frames:
+            return
+
+        new_rows = concat_compact(frames)
+        if REGIONS is not None:
+            new_rows = new_rows[new_rows['salesbusinessunitname'].isin(REGIONS)]
+        if dataset_ready():
+            append_to_dataset(new_rows)
+        else:
+            create_dataset(load_source(args.store, REGIONS), overwrite=True)
+        rows = sum(
+            sum(read_manifest(unit_dir(args.store, unit))["rows"].values())
+            for unit in store_units(args.store)
+            if REGIONS is None or unit in REGIONS
+        )
+        mark_ready(args.store, source_version(args.store), rows)
+    finally:
+        release_lock()
+
+if __name__ == "__main__":
+    main()
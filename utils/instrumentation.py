@@ -0,0 +1,222 @@
+import functools
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import streamlit as st
+from config.settings import DEBUG_PANEL, METRICS_FILE, METRICS_FILE_INTERVAL_SECONDS
+
+logging.basicConfig(level=logging.INFO)
+
+logger = logging.getLogger("mymtn.metrics")
+
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+class Registry:
+    """Process-wide span histograms, cache hit/miss counters and last payload sizes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spans: Dict[str, List[float]] = {}  # name -> [count, sum, *bucket counts]
+        self.cache: Dict[Tuple[str, str], int] = {}
+        self.payloads: Dict[str, int] = {}
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            stats = self.spans.get(name)
+            if stats is None:
+                stats = self.spans[name] = [0, 0.0] + [0] * len(BUCKETS)
+            stats[0] += 1
+            stats[1] += seconds
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    stats[2 + i] += 1
+
+    def count_cache(self, cache: str, hit: bool) -> None:
+        key = (cache, "hit" if hit else "miss")
+        with self._lock:
+            self.cache[key] = self.cache.get(key, 0) + 1
+
+    def set_payload(self, name: str, size: int) -> None:
+        with self._lock:
+            self.payloads[name] = size
+
+    def prometheus(self) -> str:
+        """The registry in the Prometheus text exposition format"""
+        lines = [
+            "# HELP mymtn_span_seconds Time spent in instrumented code paths.",
+            "# TYPE mymtn_span_seconds histogram",
+        ]
+        with self._lock:
+            for name, stats in sorted(self.spans.items()):
+                for bound, count in zip(BUCKETS, stats[2:]):
+                    lines.append(f'mymtn_span_seconds_bucket{{span="{name}",le="{bound}"}} {count}')
+                lines.append(f'mymtn_span_seconds_bucket{{span="{name}",le="+Inf"}} {stats[0]}')
+                lines.append(f'mymtn_span_seconds_sum{{span="{name}"}} {stats[1]:.6f}')
+                lines.append(f'mymtn_span_seconds_count{{span="{name}"}} {stats[0]}')
+            lines += [
+                "# HELP mymtn_cache_requests_total Cache lookups by cache and result.",
+                "# TYPE mymtn_cache_requests_total counter",
+            ]
+            for (cache, result), count in sorted(self.cache.items()):
+                lines.append(f'mymtn_cache_requests_total{{cache="{cache}",result="{result}"}} {count}')
+            lines += [
+                "# HELP mymtn_payload_bytes Size of the last payload sent to the browser.",
+                "# TYPE mymtn_payload_bytes gauge",
+            ]
+            for name, size in sorted(self.payloads.items()):
+                lines.append(f'mymtn_payload_bytes{{payload="{name}"}} {size}')
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+@dataclass
+class RerunTrace:
+    """What one script run did: spans in order, cache lookups and payload sizes"""
+    page: str
+    started: float = field(default_factory=time.perf_counter)
+    spans: List[Tuple[str, float]] = field(default_factory=list)
+    cache: Dict[str, List[int]] = field(default_factory=dict)  # cache -> [hits, misses]
+    payloads: Dict[str, int] = field(default_factory=dict)
+    seconds: float = 0.0
+    first: bool = False
+
+    def summary(self) -> Dict:
+        totals: Dict[str, float] = {}
+        for name, seconds in self.spans:
+            totals[name] = totals.get(name, 0.0) + seconds
+        summary = {
+            "event": "rerun",
+            "page": self.page,
+            "seconds": round(self.seconds, 6),
+            "spans": {name: round(seconds, 6) for name, seconds in totals.items()},
+            "cache": {name: {"hits": hits, "misses": misses} for name, (hits, misses) in self.cache.items()},
+            "payload_bytes": self.payloads,
+        }
+        if self.first:
+            summary["first"] = True
+            summary["process_uptime_s"] = process_uptime()
+        return summary
+
+# Streamlit runs each session's script on its own thread, so the active trace
+# is thread-local; spans on worker threads only feed the process registry.
+_local = threading.local()
+_last_export = [0.0]
+_seen_pages = set()
+_seen_lock = threading.Lock()
+
+def process_uptime() -> Optional[float]:
+    """Seconds since this process started, from /proc (None elsewhere)"""
+    try:
+        with open("/proc/self/stat") as stat:
+            start_ticks = int(stat.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as uptime:
+            system_uptime = float(uptime.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(system_uptime - start_ticks / os.sysconf("SC_CLK_TCK"), 3)
+
+def current_trace() -> Optional[RerunTrace]:
+    return getattr(_local, "trace", None)
+
+@contextmanager
+def span(name: str):
+    """Time a block into the registry and, on a script thread, the current rerun trace"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        REGISTRY.observe(name, seconds)
+        trace = current_trace()
+        if trace is not None:
+            trace.spans.append((name, seconds))
+
+def timed(name: Optional[str] = None):
+    """Decorator form of span, named after the function by default"""
+    def decorate(func):
+        span_name = name or func.__name__
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def record_cache(cache: str, hit: bool) -> None:
+    REGISTRY.count_cache(cache, hit)
+    trace = current_trace()
+    if trace is not None:
+        counts = trace.cache.setdefault(cache, [0, 0])
+        counts[0 if hit else 1] += 1
+
+def record_payload(name: str, size: int) -> None:
+    REGISTRY.set_payload(name, size)
+    trace = current_trace()
+    if trace is not None:
+        trace.payloads[name] = size
+
+def export_metrics(path: str = METRICS_FILE) -> None:
+    """Atomically write the registry in Prometheus text format for a node-exporter textfile collector"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w") as out:
+        out.write(REGISTRY.prometheus())
+    os.replace(temp_path, path)
+
+@contextmanager
+def rerun_trace(page: str):
+    """Trace one script run; logs its summary as JSON and refreshes the metrics file on exit.
+
+    Also closes the trace when the run is cut short by st.rerun() or st.stop().
+    The first run of each page in a process is flagged with the process
+    uptime, which measures cold start after a deploy.
+    """
+    with _seen_lock:
+        first = page not in _seen_pages
+        _seen_pages.add(page)
+    trace = RerunTrace(page=page, first=first)
+    _local.trace = trace
+    try:
+        yield trace
+    finally:
+        _local.trace = None
+        trace.seconds = time.perf_counter() - trace.started
+        REGISTRY.observe(f"{'first_rerun' if first else 'rerun'}.{page}", trace.seconds)
+        logger.info(json.dumps(trace.summary()))
+        now = time.monotonic()
+        if METRICS_FILE and now - _last_export[0] >= METRICS_FILE_INTERVAL_SECONDS:
+            _last_export[0] = now
+            try:
+                export_metrics(METRICS_FILE)
+            except OSError as e:
+                logger.warning(f"Could not write metrics file {METRICS_FILE}: {e}")
+
+def debug_enabled() -> bool:
+    """The debug panel is opt-in: MYMTN_DEBUG_PANEL=1 or ?debug=1 in the URL"""
+    return DEBUG_PANEL or st.query_params.get("debug") == "1"
+
+def show_debug_panel(trace: RerunTrace) -> None:
+    """Sidebar expander with this rerun's spans and cache lookups so far"""
+    with st.sidebar.expander("⏱️ Debug timings", expanded=False):
+        summary = trace.summary()
+        elapsed = time.perf_counter() - trace.started
+        st.caption(f"{summary['page']}: {elapsed * 1e3:.1f} ms so far")
+        st.table({
+            "span": list(summary["spans"]),
+            "ms": [f"{seconds * 1e3:.2f}" for seconds in summary["spans"].values()],
+        })
+        if summary["cache"]:
+            st.table({
+                "cache": list(summary["cache"]),
+                "hits": [counts["hits"] for counts in summary["cache"].values()],
+                "misses": [counts["misses"] for counts in summary["cache"].values()],
+            })
+        if summary["payload_bytes"]:
+            st.json(summary["payload_bytes"])
@@ -0,0 +1,230 @@
+import calendar
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+import streamlit as st
+from config.settings import REGIONS
+from utils.bootstrap import dataset_fingerprint
+from utils.ranking import rank_agents
+from utils.shared import current_generation, shared_data
+from utils.store import current_source, load_source
+
+# Response shapes mirroring pandasai's, so process_response renders them the same way.
+class StringResponse:
+    def __init__(self, value: str):
+        self.value = value
+
+class NumberResponse:
+    def __init__(self, value):
+        self.value = value
+
+class DataFrameResponse:
+    def __init__(self, value: pd.DataFrame):
+        self.value = value
+
+MEASURES = {
+    'monthly active users': 'mau',
+    'active users': 'mau',
+    'mau': 'mau',
+    'downloads': 'download',
+    'download': 'download',
+}
+
+BREAKDOWNS = {
+    'business unit': 'salesbusinessunitname',
+    'unit': 'salesbusinessunitname',
+    'region': 'salesbusinessunitname',
+    'service center': 'servicecentername',
+    'center': 'servicecentername',
+    'centre': 'servicecentername',
+    'agent': 'agentname',
+    'month': 'month',
+    'day': 'date_key',
+    'date': 'date_key',
+}
+
+# Words that may surround a templated question without changing its meaning.
+# Anything else left over means the question is not one of ours.
+FILLER = set("""
+    what whats is are was were the a an of in for at from by per on during
+    total sum number how many much show me give list tell get got our we did
+    do does have has make makes made had achieve achieved record recorded
+    there been please who which with to all each overall value count agents agent
+""".split())
+
+# Contraction and possessive endings dropped before matching ("what's" -> "what", "Ho's" -> "ho").
+CONTRACTION_PATTERN = re.compile(r"'(?:s|re|ve|ll|d)\b")
+
+MONTHS = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): number for number, name in enumerate(calendar.month_abbr) if name})
+
+RANK_PATTERN = re.compile(r"\b(top|best|highest|bottom|worst|lowest)\s*(\d+)?\s*(?:performing\s+)?agent(s)?\b")
+
+@dataclass
+class Intent:
+    kind: str  # "total", "rank" or "breakdown"
+    measure: str = 'download'
+    filters: Dict[str, List[str]] = field(default_factory=dict)
+    period: Optional[Tuple[pd.Timestamp, pd.Timestamp]] = None
+    n: int = 5
+    largest: bool = True
+    breakdown: Optional[str] = None
+
+def _normalize(text: str) -> str:
+    """Lowercase, drop contractions and apostrophes, and collapse punctuation to single spaces"""
+    text = CONTRACTION_PATTERN.sub("", text.lower().replace("\u2019", "'")).replace("'", "")
+    return " ".join(re.sub(r"[^\w\s-]", " ", text).split())
+
+def _alternation(phrases) -> str:
+    return "|".join(re.escape(phrase) for phrase in sorted(phrases, key=len, reverse=True))
+
+class IntentMatcher:
+    """Rule-based matcher for templated aggregate questions over the cleaned fact table.
+
+    Recognized: totals of downloads/MAU, top/bottom-N agents (N defaults to 5,
+    or 1 for a singular "best agent") and breakdowns by
+    unit/center/agent/month/day, optionally scoped to named units, centers or
+    agents and to a period ("this month", "last 7 days", "in March 2024", ...).
+    Relative periods are anchored on the latest date in the data. Questions
+    with any unrecognized words are left to the LLM.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.latest = df.index.max() if len(df) else pd.Timestamp.today().normalize()
+        self.entities: Dict[str, Tuple[str, str]] = {}
+        for col in ['salesbusinessunitname', 'servicecentername', 'agentname']:
+            for name in df[col].cat.categories if len(df) else []:
+                key = _normalize(str(name))
+                if key and name != 'N/A':
+                    self.entities.setdefault(key, (col, name))
+        self._entity_pattern = re.compile(rf"\b({_alternation(self.entities)})\b") if self.entities else None
+        self._measure_pattern = re.compile(rf"\b({_alternation(MEASURES)})\b")
+        self._breakdown_pattern = re.compile(rf"\b(?:by|per|for each|each)\s+({_alternation(BREAKDOWNS)})s?\b")
+
+    def _period(self, text: str):
+        """Find a period phrase; returns ((start, end), remaining text) or (None, text)"""
+        latest = self.latest
+        rules = [
+            (r"\btoday\b", lambda m: (latest, latest)),
+            (r"\byesterday\b", lambda m: (latest - pd.Timedelta(days=1),) * 2),
+            (r"\b(?:last|past)\s+(\d+)\s+days?\b", lambda m: (latest - pd.Timedelta(days=int(m.group(1)) - 1), latest)),
+            (r"\bthis\s+week\b", lambda m: (latest - pd.Timedelta(days=latest.weekday()), latest)),
+            (r"\blast\s+week\b", lambda m: (
+                latest - pd.Timedelta(days=latest.weekday() + 7),
+                latest - pd.Timedelta(days=latest.weekday() + 1))),
+            (r"\bthis\s+month\b", lambda m: (latest.replace(day=1), latest)),
+            (r"\blast\s+month\b", lambda m: (
+                (latest.replace(day=1) - pd.Timedelta(days=1)).replace(day=1),
+                latest.replace(day=1) - pd.Timedelta(days=1))),
+            (r"\b(?:this\s+year|year\s+to\s+date|ytd)\b", lambda m: (latest.replace(month=1, day=1), latest)),
+            (r"\blast\s+year\b", lambda m: (
+                pd.Timestamp(latest.year - 1, 1, 1), pd.Timestamp(latest.year - 1, 12, 31))),
+            (rf"\b({_alternation(MONTHS)})\s*(\d{{4}})?\b", self._month_period),
+            (r"\b(20\d{2})\b", lambda m: (pd.Timestamp(int(m.group(1)), 1, 1), pd.Timestamp(int(m.group(1)), 12, 31))),
+        ]
+        for pattern, build in rules:
+            match = re.search(pattern, text)
+            if match:
+                return build(match), text[:match.start()] + " " + text[match.end():]
+        return None, text
+
+    def _month_period(self, match):
+        month = MONTHS[match.group(1)]
+        year = int(match.group(2)) if match.group(2) else self.latest.year
+        start = pd.Timestamp(year, month, 1)
+        return start, start + pd.offsets.MonthEnd(0)
+
+    def match(self, question: str) -> Optional[Intent]:
+        text = _normalize(question)
+
+        filters: Dict[str, List[str]] = {}
+        if self._entity_pattern is not None:
+            for found in self._entity_pattern.findall(text):
+                col, name = self.entities[found]
+                filters.setdefault(col, []).append(name)
+            text = self._entity_pattern.sub(" ", text)
+
+        # Ranks before periods, so a count such as "top 2020 agents" is not read as a year.
+        intent = None
+        rank = RANK_PATTERN.search(text)
+        if rank:
+            intent = Intent(
+                kind="rank",
+                n=int(rank.group(2)) if rank.group(2) else 5 if rank.group(3) else 1,
+                largest=rank.group(1) in ('top', 'best', 'highest')
+            )
+            text = text[:rank.start()] + " " + text[rank.end():]
+
+        period, text = self._period(text)
+
+        breakdown = self._breakdown_pattern.search(text)
+        if breakdown and intent is None:
+            intent = Intent(kind="breakdown", breakdown=BREAKDOWNS[breakdown.group(1)])
+            text = text[:breakdown.start()] + " " + text[breakdown.end():]
+
+        measure = self._measure_pattern.search(text)
+        if measure:
+            text = self._measure_pattern.sub(" ", text)
+        elif intent is None:
+            return None
+        if intent is None:
+            intent = Intent(kind="total")
+        if measure:
+            intent.measure = MEASURES[measure.group(1)]
+
+        leftover = [word for word in text.split() if word not in FILLER]
+        if leftover:
+            return None
+        intent.filters = filters
+        intent.period = period
+        return intent
+
+    def answer(self, intent: Intent):
+        df = self.df
+        if intent.period is not None:
+            start, end = intent.period
+            df = df[(df.index >= start) & (df.index <= end)]
+        for col, names in intent.filters.items():
+            df = df[df[col].isin(names)]
+
+        if intent.kind == "total":
+            return NumberResponse(int(df[intent.measure].sum()))
+
+        if df.empty:
+            return StringResponse("No records match that question.")
+
+        if intent.kind == "rank":
+            top, bottom = rank_agents(df, intent.n, by=intent.measure)
+            ranked = top if intent.largest else bottom
+            return DataFrameResponse(ranked.rename(columns={'agentname': 'agent'}))
+
+        if intent.breakdown == 'date_key':
+            keys = df.index
+        elif intent.breakdown == 'month':
+            keys = [df['year'], df['month']]
+        else:
+            keys = df[intent.breakdown]
+        grouped = df.groupby(keys, observed=True)[['download', 'mau']].sum()
+        if intent.breakdown in ('date_key', 'month'):
+            grouped = grouped.sort_index()
+        else:
+            grouped = grouped.sort_values(intent.measure, ascending=False)
+        return DataFrameResponse(grouped.reset_index())
+
+@st.cache_resource(max_entries=2)
+def get_intent_matcher(source: str, version: Optional[str], generation: Optional[int] = None) -> IntentMatcher:
+    """Matcher over the same rows the agent dataset is built from; rebuilt when the dataset or shared generation changes"""
+    shared = shared_data(source)
+    if shared is not None and shared.covers(REGIONS):
+        return IntentMatcher(shared.rows())
+    return IntentMatcher(load_source(source, REGIONS))
+
+def answer_locally(question: str):
+    """Answer a templated question from the loaded data, or None to fall through to the LLM"""
+    matcher = get_intent_matcher(current_source(), dataset_fingerprint(), current_generation())
+    intent = matcher.match(question)
+    if intent is None:
+        return None
+    return matcher.answer(intent)
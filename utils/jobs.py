@@ -0,0 +1,163 @@
+import logging
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from threading import Event, Lock
+from typing import Any, Callable, Dict, List, Optional, Set
+import streamlit as st
+from config.settings import AGENT_MAX_WORKERS, AGENT_MAX_QUEUED, AGENT_TIMEOUT_SECONDS
+
+logging.basicConfig(level=logging.INFO)
+
+QUEUED = "queued"
+GENERATING = "generating"
+RENDERING = "rendering"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TIMED_OUT = "timed_out"
+
+FINISHED = {DONE, FAILED, CANCELLED, TIMED_OUT}
+
+STATUS_LABELS = {
+    QUEUED: "Waiting for a free agent…",
+    GENERATING: "Generating and executing code…",
+    RENDERING: "Rendering the answer…",
+    DONE: "Done",
+    FAILED: "Failed",
+    CANCELLED: "Cancelled",
+    TIMED_OUT: "Timed out",
+}
+
+class JobCancelled(Exception):
+    pass
+
+@dataclass
+class Job:
+    """One agent request. Workers report progress through set_status."""
+    id: str
+    session_id: str
+    question: str
+    status: str = QUEUED
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    future: Optional[Future] = None
+    _cancel: Event = field(default_factory=Event)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def set_status(self, status: str) -> None:
+        """Advance the job, raising JobCancelled if it was cancelled or timed out meanwhile"""
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.status = status
+
+class JobQueue:
+    """Bounded worker pool for agent requests with per-session job ids.
+
+    Running pandasai calls cannot be interrupted, so cancellation and
+    timeouts are cooperative: the job is marked finished immediately and
+    whatever the worker produces afterwards is discarded. Until its worker
+    actually returns, such a job still counts toward max_queued.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = AGENT_MAX_WORKERS,
+        max_queued: int = AGENT_MAX_QUEUED,
+        timeout_seconds: int = AGENT_TIMEOUT_SECONDS
+    ):
+        self.max_queued = max_queued
+        self.timeout_seconds = timeout_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent")
+        self._jobs: Dict[str, Job] = {}
+        self._active: Set[Future] = set()
+        self._lock = Lock()
+
+    def _run(self, job: Job, fn: Callable[[Job], Any]) -> None:
+        job.started_at = time.time()
+        try:
+            job.set_status(GENERATING)
+            result = fn(job)
+            if job._cancel.is_set():
+                raise JobCancelled()
+            job.result = result
+            job.status = DONE
+        except JobCancelled:
+            pass
+        except Exception as e:
+            logging.error(f"Agent job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = job.finished_at or time.time()
+
+    def _finish(self, job: Job, status: str) -> None:
+        job._cancel.set()
+        if job.future is not None:
+            job.future.cancel()
+        job.status = status
+        job.finished_at = time.time()
+
+    def _purge(self) -> None:
+        """Forget finished jobs nobody collected within an hour"""
+        cutoff = time.time() - 3600
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished and (job.finished_at or 0) < cutoff]:
+            del self._jobs[job_id]
+
+    def submit(self, session_id: str, question: str, fn: Callable[[Job], Any]) -> Optional[str]:
+        """Queue fn(job) and return the job id, or None when the queue is full"""
+        with self._lock:
+            self._purge()
+            if len(self._active) >= self.max_queued:
+                return None
+            job = Job(id=uuid.uuid4().hex, session_id=session_id, question=question)
+            self._jobs[job.id] = job
+            job.future = self._executor.submit(self._run, job, fn)
+            self._active.add(job.future)
+        job.future.add_done_callback(self._release)
+        return job.id
+
+    def _release(self, future: Future) -> None:
+        with self._lock:
+            self._active.discard(future)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job, timing it out if it has been running too long (time spent queued does not count)"""
+        job = self._jobs.get(job_id)
+        if (
+            job is not None and not job.finished and job.started_at is not None
+            and time.time() - job.started_at > self.timeout_seconds
+        ):
+            self._finish(job, TIMED_OUT)
+        return job
+
+    def cancel(self, job_id: str) -> None:
+        job = self._jobs.get(job_id)
+        if job is not None and not job.finished:
+            self._finish(job, CANCELLED)
+
+    def pop(self, job_id: str) -> Optional[Job]:
+        """Remove a finished job once its result has been delivered"""
+        with self._lock:
+            return self._jobs.pop(job_id, None)
+
+    def jobs_for(self, session_id: str) -> List[Job]:
+        return [job for job in self._jobs.values() if job.session_id == session_id]
+
+    def stats(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for job in list(self._jobs.values()):
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
+
+@st.cache_resource
+def get_job_queue() -> JobQueue:
+    """Process-wide agent worker pool shared by every chat session"""
+    return JobQueue()
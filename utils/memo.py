@@ -0,0 +1,236 @@
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.cube import AggregateCube, build_agents, date_bounds
+from utils.instrumentation import record_cache
+from utils.indexes import SelectionIndex, clip_positions, select_rows
+from utils.metrics import (calculate_ytd_metrics,
+                           calculate_yearly_target,
+                           calculate_downloads_metrics,
+                           calculate_mau_metrics,
+                           Metric,
+                           NO_DELTA)
+from utils.targets import selection_target, target_model, targets_version
+from utils.trends import (change,
+                          daily_series,
+                          period_deltas,
+                          prefix_sums,
+                          previous_range,
+                          range_totals,
+                          resample_series)
+
+MAX_SELECTIONS = 256
+MAX_SELECTION_BYTES = 64 * 1024 * 1024
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by entry count and approximate size in bytes"""
+
+    def __init__(self, max_entries: int = MAX_SELECTIONS, max_bytes: int = MAX_SELECTION_BYTES, name: str = ""):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if self.name:
+            record_cache(self.name, hit=entry is not None)
+        return None if entry is None else entry[0]
+
+    def put(self, key: Hashable, value: Any, size: int = 0) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            # The newest entry is always kept, even alone over budget; only older ones are evicted.
+            while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+        if size > self.max_bytes:
+            logging.warning(f"{self.name or 'LRU'} cache entry of {size:,} bytes exceeds the {self.max_bytes:,} byte budget")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+@dataclass(frozen=True)
+class SelectionResult:
+    """Row positions into cube.agents, the selection's daily series and the metric tuples derived from them"""
+    positions: np.ndarray
+    metrics: Dict[str, Metric]
+    series: pd.DataFrame
+    prefix: np.ndarray
+
+@dataclass(frozen=True)
+class RangeResult:
+    """Per-agent rows and metric tuples for a selection restricted to a date range"""
+    rows: pd.DataFrame
+    metrics: Dict[str, Metric]
+
+@st.cache_resource
+def get_selection_cache() -> LRUCache:
+    """Process-wide selection cache shared by every session"""
+    return LRUCache(name="selection")
+
+def normalize_selection(selected_units: List[str], selected_centers: List[str]) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Sort and de-duplicate a selection, collapsing anything containing "All" to ("All",)"""
+    def _normalize(values: List[str]) -> Tuple[str, ...]:
+        if "All" in values:
+            return ("All",)
+        return tuple(sorted(set(values)))
+    return _normalize(selected_units), _normalize(selected_centers)
+
+def _selected_positions(
+    index: SelectionIndex,
+    rows: pd.DataFrame,
+    selected_units: List[str],
+    selected_centers: List[str]
+) -> np.ndarray:
+    if not selected_units or not selected_centers:
+        return np.empty(0, dtype=np.intp)
+    positions = select_rows(index, selected_units, selected_centers)
+    return np.arange(len(rows)) if positions is None else positions
+
+def compute_selection(
+    cube: AggregateCube,
+    selected_units: List[str],
+    selected_centers: List[str]
+) -> SelectionResult:
+    """Filter the cube and derive the metric cards for one selection"""
+    positions = _selected_positions(cube.agents_index, cube.agents, selected_units, selected_centers)
+    daily_positions = _selected_positions(cube.daily_index, cube.daily, selected_units, selected_centers)
+    rows = cube.agents.iloc[positions]
+    series = daily_series(cube.daily.iloc[daily_positions])
+    trend = period_deltas(series, anchor=cube.daily.index.max()) if not cube.daily.empty else None
+    model = target_model(cube)
+    target = selection_target(model, selected_units, selected_centers) if model and len(positions) else None
+    metrics = {
+        "ytd": calculate_ytd_metrics(rows, trend, target),
+        "yearly_target": calculate_yearly_target(rows, target),
+        "downloads": calculate_downloads_metrics(rows, trend),
+        "mau": calculate_mau_metrics(rows, trend),
+    }
+    return SelectionResult(positions=positions, metrics=metrics, series=series, prefix=prefix_sums(series))
+
+def compute_range(
+    cube: AggregateCube,
+    base: SelectionResult,
+    selected_units: List[str],
+    selected_centers: List[str],
+    start: pd.Timestamp,
+    end: pd.Timestamp
+) -> RangeResult:
+    """Narrow a selection to start..end.
+
+    The daily grain is sorted by date, so the range is a row slice found by
+    binary search and intersected with the selection's sorted positions the
+    same way; only rows inside both are aggregated, for the agent ranking.
+    Card totals, and their deltas against the preceding range of the same
+    length, come from the selection's prefix sums.
+    """
+    lo, hi = date_bounds(cube.daily, start, end)
+    positions = clip_positions(
+        _selected_positions(cube.daily_index, cube.daily, selected_units, selected_centers), lo, hi
+    )
+    rows = build_agents(cube.daily.iloc[positions])
+    totals = range_totals(base.series, base.prefix, start, end)
+    previous = range_totals(base.series, base.prefix, *previous_range(start, end))
+    downloads_delta = change(totals['download'], previous['download']) or NO_DELTA
+    mau_delta = change(totals['mau'], previous['mau']) or NO_DELTA
+    metrics = dict(base.metrics)
+    metrics["downloads"] = (totals['download'],) + downloads_delta
+    metrics["mau"] = (totals['mau'],) + mau_delta
+    return RangeResult(rows=rows, metrics=metrics)
+
+def selection_key(
+    cube: AggregateCube,
+    selected_units: List[str],
+    selected_centers: List[str],
+    date_range: Optional[Tuple[pd.Timestamp, pd.Timestamp]] = None
+) -> Tuple:
+    """Cache key for a selection of a cube version, optionally narrowed to a date range"""
+    dates = tuple(pd.Timestamp(date) for date in date_range) if date_range is not None else ()
+    return (cube.version, targets_version()) + dates + normalize_selection(selected_units, selected_centers)
+
+def _cached_selection(
+    cube: AggregateCube,
+    selected_units: List[str],
+    selected_centers: List[str]
+) -> SelectionResult:
+    key = selection_key(cube, selected_units, selected_centers)
+    cache = get_selection_cache()
+    result = cache.get(key)
+    if result is None:
+        result = compute_selection(cube, selected_units, selected_centers)
+        size = result.positions.nbytes + int(result.series.memory_usage().sum()) + result.prefix.nbytes
+        cache.put(key, result, size=size)
+    return result
+
+def memoized_selection(
+    cube: AggregateCube,
+    selected_units: List[str],
+    selected_centers: List[str],
+    date_range: Optional[Tuple[pd.Timestamp, pd.Timestamp]] = None
+) -> Tuple[pd.DataFrame, Dict[str, Metric]]:
+    """Return the selected cube rows and metrics, reusing earlier results for the same selection.
+
+    With a date_range, the rows are per-agent totals within it and the
+    download/MAU cards cover only that range.
+    """
+    result = _cached_selection(cube, selected_units, selected_centers)
+    if date_range is None:
+        return cube.agents.iloc[result.positions], result.metrics
+    
+    start, end = (pd.Timestamp(date) for date in date_range)
+    key = selection_key(cube, selected_units, selected_centers, (start, end))
+    cache = get_selection_cache()
+    ranged = cache.get(key)
+    if ranged is None:
+        ranged = compute_range(cube, result, selected_units, selected_centers, start, end)
+        cache.put(key, ranged, size=int(ranged.rows.memory_usage(deep=True).sum()))
+    return ranged.rows, ranged.metrics
+
+def memoized_series(
+    cube: AggregateCube,
+    selected_units: List[str],
+    selected_centers: List[str],
+    date_range: Optional[Tuple[pd.Timestamp, pd.Timestamp]] = None,
+    frequency: str = 'daily'
+) -> pd.DataFrame:
+    """Download/mau totals per day, week or month for a selection, from the same cache entry as its metrics.
+
+    Weekly and monthly series are resampled from the cached daily series, so
+    they never rescan the cube.
+    """
+    series = _cached_selection(cube, selected_units, selected_centers).series
+    if date_range is not None:
+        start, end = (pd.Timestamp(date) for date in date_range)
+        series = series.loc[start:end]
+    return series if frequency == 'daily' else resample_series(series, frequency)
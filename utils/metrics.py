@@ -1,9 +1,17 @@
-from typing import Tuple, Union
+from typing import Dict, Optional, Tuple, Union
 import pandas as pd
 import streamlit as st
+from utils.instrumentation import timed
+from utils.trends import change
 
 TARGET_ESTIMATION_MULTIPLIER = 1.2
-PREVIOUS_ESTIMATION_MULTIPLIER = 0.95
+
+Trend = Dict[str, Dict[str, Tuple[float, float]]]
+# (ytd downloads, yearly target, projected year-end downloads) for a selection
+Target = Tuple[float, float, float]
+# (value, delta, delta percentage); the delta is (None, None) without a baseline
+Metric = Tuple[float, Optional[float], Optional[float]]
+NO_DELTA = (None, None)
 
 def format_number(num: float) -> str:
     """Format large numbers with commas and handle NaN"""
@@ -11,7 +19,9 @@ def format_number(num: float) -> str:
         return "0"
     return f"{int(num):,}"
 
-def format_delta(value: float, percentage: float) -> str:
+def format_delta(value: Optional[float], percentage: Optional[float]) -> str:
+    if value is None:
+        return """<span class="metric-delta-neutral">n/a</span>"""
     arrow = "↑" if value >= 0 else "↓"
     color_class = "positive" if value >= 0 else "negative"
     formatted_value = format_number(abs(value))
@@ -23,57 +33,79 @@ def create_metric_card(
     col,
     title: str,
     value: Union[int, float],
-    is_percentage: bool = False
+    is_percentage: bool = False,
+    delta: Optional[Tuple[Optional[float], Optional[float]]] = None,
+    delta_label: str = ""
 ) -> None:
     """Create a metric card with title, value, and styled delta"""
     formatted_value = f"{value:.2f}%" if is_percentage else format_number(value)
+    delta_html = f"{format_delta(*delta)} {delta_label}" if delta is not None else ""
     
     with col:
         st.markdown(f"""
             <div class="metric-container">
                 <div class="metric-title">{title}</div>
                 <div class="metric-value">{formatted_value}</div>
+                {delta_html}
             </div>
         """, unsafe_allow_html=True)
 
-def calculate_ytd_metrics(df: pd.DataFrame) -> Tuple[float, float, float]:
-    """Calculate YTD achievement metrics with validation"""
+@timed()
+def calculate_ytd_metrics(
+    df: pd.DataFrame,
+    trend: Optional[Trend] = None,
+    target: Optional[Target] = None
+) -> Metric:
+    """Calculate YTD achievement against the target; the delta compares YTD downloads with the prior YTD"""
     if df.empty:
         return 0.0, 0.0, 0.0
-        
-    current_downloads = df['download'].sum()
-    yearly_target = current_downloads * TARGET_ESTIMATION_MULTIPLIER
-    achievement_percentage = (current_downloads / yearly_target * 100) if yearly_target > 0 else 0
     
-    return achievement_percentage, 0.0, 0.0
+    if target and target[1] > 0:
+        achievement_percentage = target[0] / target[1] * 100
+    else:
+        current_downloads = df['download'].sum()
+        yearly_target = current_downloads * TARGET_ESTIMATION_MULTIPLIER
+        achievement_percentage = (current_downloads / yearly_target * 100) if yearly_target > 0 else 0
+    delta_value, delta_percentage = (change(*trend['ytd']['download']) if trend else None) or NO_DELTA
+    
+    return achievement_percentage, delta_value, delta_percentage
 
-def calculate_yearly_target(df: pd.DataFrame) -> Tuple[float, float, float]:
-    """Calculate yearly target metrics with validation"""
+@timed()
+def calculate_yearly_target(df: pd.DataFrame, target: Optional[Target] = None) -> Metric:
+    """Calculate the yearly target; the delta is the run-rate projection against it.
+
+    Without a target for the selection the value is the 1.2x estimate and
+    the delta is NO_DELTA, which the dashboard shows as an estimate.
+    """
     if df.empty:
         return 0.0, 0.0, 0.0
-        
-    current_target = df['download'].sum() * TARGET_ESTIMATION_MULTIPLIER
     
-    previous_target = current_target * PREVIOUS_ESTIMATION_MULTIPLIER
-    delta_value = current_target - previous_target
-    delta_percentage = (delta_value / previous_target * 100) if previous_target > 0 else 0
+    if not target or target[1] <= 0:
+        return (df['download'].sum() * TARGET_ESTIMATION_MULTIPLIER,) + NO_DELTA
+    
+    _, current_target, projected = target
+    delta_value, delta_percentage = change(projected, current_target)
         
-    return current_target, 0.0, 0.0
+    return current_target, delta_value, delta_percentage
 
-def calculate_downloads_metrics(df: pd.DataFrame) -> Tuple[float, float, float]:
-    """Calculate download metrics with validation"""
+@timed()
+def calculate_downloads_metrics(df: pd.DataFrame, trend: Optional[Trend] = None) -> Metric:
+    """Calculate download metrics; the delta is month to date vs the same span last month"""
     if df.empty:
         return 0.0, 0.0, 0.0
         
     current_downloads = df['download'].sum()
+    delta_value, delta_percentage = (change(*trend['mom']['download']) if trend else None) or NO_DELTA
     
-    return current_downloads, 0.0, 0.0
+    return current_downloads, delta_value, delta_percentage
 
-def calculate_mau_metrics(df: pd.DataFrame) -> Tuple[float, float, float]:
-    """Calculate MAU metrics with validation"""
+@timed()
+def calculate_mau_metrics(df: pd.DataFrame, trend: Optional[Trend] = None) -> Metric:
+    """Calculate MAU metrics; the delta is month to date vs the same span last month"""
     if df.empty:
         return 0.0, 0.0, 0.0
         
     current_mau = df['mau'].sum()
+    delta_value, delta_percentage = (change(*trend['mom']['mau']) if trend else None) or NO_DELTA
     
-    return current_mau, 0.0, 0.0
\ No newline at end of file
+    return current_mau, delta_value, delta_percentage
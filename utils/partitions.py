@@ -0,0 +1,134 @@
+import logging
+from threading import Lock
+from typing import Dict, List, Optional, Sequence, Tuple
+import streamlit as st
+from config.settings import DEFAULT_REGIONS, PARTITION_MEMORY_BUDGET_MB, REGIONS
+from utils.cube import AggregateCube, build_cube, cube_nbytes, merge_cubes, read_store_cube
+from utils.data_processing import concat_compact, list_units, load_extract, TEXT_COLUMNS
+from utils.instrumentation import timed
+from utils.memo import LRUCache
+from utils.shared import shared_data
+from utils.snapshot import snapshot_key
+from utils.store import is_store, source_version, store_units, unit_dir, unit_version
+
+logging.basicConfig(level=logging.INFO)
+
+class PartitionCache:
+    """Lazily loads one aggregate cube per business unit and evicts cold units.
+
+    Store units are only read the first time a session selects them; a CSV
+    extract is read once per source version and split into every unit's
+    cube in one pass. Loaded cubes, and the merged cubes for multi-unit
+    selections, share one LRU bounded by the memory budget.
+    In shared mode (see utils.shared) single units and the all-units cube
+    come from the attached generation instead and only merges of some
+    units are built in-process.
+    """
+
+    def __init__(self, source: str, budget_bytes: int, regions: Optional[Sequence[str]] = REGIONS):
+        self.source = source
+        self.regions = regions
+        self._cubes = LRUCache(max_entries=1024, max_bytes=budget_bytes, name="partitions")
+        self._units: Optional[List[str]] = None
+        self._units_version: Optional[str] = None
+        self._lock = Lock()
+
+    def units(self) -> List[str]:
+        """Business units this deployment serves, without loading any partition"""
+        shared = shared_data(self.source)
+        if shared is not None:
+            return [unit for unit in shared.units if self.regions is None or unit in self.regions]
+        version = source_version(self.source)
+        if self._units is None or self._units_version != version:
+            units = store_units(self.source) if is_store(self.source) else list_units(self.source)
+            self._units = [unit for unit in units if self.regions is None or unit in self.regions]
+            self._units_version = version
+        return self._units
+
+    def resolve(self, selected_units: List[str]) -> Tuple[str, ...]:
+        """Expand "All" and drop units outside this deployment"""
+        available = self.units()
+        if "All" in selected_units:
+            return tuple(available)
+        return tuple(sorted(unit for unit in set(selected_units) if unit in available))
+
+    def _unit_key(self, unit: str) -> str:
+        shared = shared_data(self.source)
+        if shared is not None:
+            return f"{unit}@gen{shared.generation}"
+        if is_store(self.source):
+            return unit_version(self.source, unit)
+        # The content hash is computed once per source size/mtime (see file_fingerprint).
+        return f"{unit}@{snapshot_key(self.source)}"
+
+    @timed("partitions.split_extract")
+    def _split_extract(self) -> Dict[str, AggregateCube]:
+        """Read the extract once and build every served unit's cube, caching them all"""
+        logging.info(f"Splitting {self.source} into unit partitions")
+        df = load_extract(self.source, self.regions)
+        cubes = {}
+        for unit, rows in df.groupby('salesbusinessunitname', observed=True):
+            rows = rows.copy()
+            for col in TEXT_COLUMNS:
+                rows[col] = rows[col].cat.remove_unused_categories()
+            key = self._unit_key(unit)
+            cube = cubes[unit] = build_cube(rows, version=key)
+            self._cubes.put(key, cube, size=cube_nbytes(cube))
+        return cubes
+
+    def _load_unit(self, unit: str) -> AggregateCube:
+        if is_store(self.source):
+            return read_store_cube(unit_dir(self.source, unit), self._unit_key(unit))
+        cube = self._split_extract().get(unit)
+        return cube if cube is not None else build_cube(concat_compact([]))
+
+    def _get_unit(self, unit: str) -> AggregateCube:
+        shared = shared_data(self.source)
+        if shared is not None:
+            return shared.cube(unit)
+        key = self._unit_key(unit)
+        cube = self._cubes.get(key)
+        if cube is None:
+            with self._lock:
+                cube = self._cubes.get(key)
+                if cube is None:
+                    logging.info(f"Loading partition for {unit}")
+                    cube = self._load_unit(unit)
+                    self._cubes.put(key, cube, size=cube_nbytes(cube))
+        return cube
+
+    def cube_for(self, selected_units: List[str]) -> AggregateCube:
+        """Cube covering the selected units, loading any partition not yet in memory"""
+        units = self.resolve(selected_units)
+        if not units:
+            return build_cube(concat_compact([]))
+        if len(units) == 1:
+            return self._get_unit(units[0])
+        shared = shared_data(self.source)
+        if shared is not None and set(units) == set(shared.units):
+            return shared.cube()
+
+        key = tuple(self._unit_key(unit) for unit in units)
+        cube = self._cubes.get(key)
+        if cube is None:
+            cube = merge_cubes([self._get_unit(unit) for unit in units])
+            self._cubes.put(key, cube, size=cube_nbytes(cube))
+        return cube
+
+    def stats(self):
+        return self._cubes.stats()
+
+@st.cache_resource
+def get_partition_cache(source: str) -> PartitionCache:
+    """Process-wide partition cache for a data source"""
+    return PartitionCache(source, PARTITION_MEMORY_BUDGET_MB * 1024 * 1024)
+
+def default_units(available_units: List[str], requested: List[str]) -> List[str]:
+    """Initial sidebar selection: ?region= query params, then the configured default, then the first unit"""
+    for candidates in (requested, DEFAULT_REGIONS or ()):
+        if "All" in candidates:
+            return ["All"]
+        chosen = [unit for unit in candidates if unit in available_units]
+        if chosen:
+            return chosen
+    return available_units[:1]
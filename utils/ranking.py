@@ -0,0 +1,46 @@
+from typing import Tuple
+import numpy as np
+import pandas as pd
+
+RANKING_COLUMNS = ['agentname', 'download', 'mau']
+
+def partial_select(primary: np.ndarray, secondary: np.ndarray, n: int, largest: bool) -> np.ndarray:
+    """Positions of the n best (or worst) agents by primary, ties broken on secondary.
+
+    np.partition finds the n-th primary value in O(k); only agents on the
+    right side of that threshold (ties included) are then sorted.
+    """
+    k = len(primary)
+    if n >= k:
+        candidates = np.arange(k)
+    elif largest:
+        threshold = np.partition(primary, k - n)[k - n]
+        candidates = np.flatnonzero(primary >= threshold)
+    else:
+        threshold = np.partition(primary, n - 1)[n - 1]
+        candidates = np.flatnonzero(primary <= threshold)
+
+    if largest:
+        order = np.lexsort((-secondary[candidates], -primary[candidates]))
+    else:
+        order = np.lexsort((secondary[candidates], primary[candidates]))
+    return candidates[order][:n]
+
+def rank_agents(df: pd.DataFrame, n_agents: int = 5, by: str = 'download') -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Compute per-agent totals once and return (top, bottom) n agents.
+
+    Top agents are ordered by the `by` measure descending and bottom agents
+    ascending; ties are ranked by the other measure in the same direction.
+    """
+    if df.empty or n_agents <= 0:
+        empty = pd.DataFrame(columns=RANKING_COLUMNS)
+        return empty, empty
+
+    totals = df.groupby('agentname', observed=True)[['download', 'mau']].sum()
+    tie_breaker = 'mau' if by == 'download' else 'download'
+    primary = totals[by].to_numpy(dtype='int64')
+    secondary = totals[tie_breaker].to_numpy(dtype='int64')
+
+    top = totals.iloc[partial_select(primary, secondary, n_agents, largest=True)]
+    bottom = totals.iloc[partial_select(primary, secondary, n_agents, largest=False)]
+    return top.reset_index(), bottom.reset_index()
@@ -0,0 +1,103 @@
+import re
+import time
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+import streamlit as st
+from utils.instrumentation import record_cache
+from config.settings import (RESPONSE_CACHE_MAX_ENTRIES,
+                             RESPONSE_CACHE_TTL_SECONDS,
+                             RESPONSE_CACHE_FUZZY_THRESHOLD)
+
+def normalize_question(question: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace so trivially different phrasings match"""
+    question = re.sub(r"[^\w\s]", " ", question.lower())
+    return " ".join(question.split())
+
+class ResponseCache:
+    """Rendered agent answers keyed on (dataset version, normalized question).
+
+    Entries expire after ttl_seconds, the oldest are evicted beyond
+    max_entries, and entries for any other dataset version are dropped as
+    soon as a new version is seen. Versions already moved past are never
+    cached again, so a slow answer computed on the old data cannot reset the
+    cache when it finally lands. With a fuzzy_threshold, a miss falls back
+    to the most similar cached question (difflib ratio over sorted tokens).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = RESPONSE_CACHE_TTL_SECONDS,
+        fuzzy_threshold: Optional[float] = RESPONSE_CACHE_FUZZY_THRESHOLD
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.fuzzy_threshold = fuzzy_threshold
+        self.hits = 0
+        self.misses = 0
+        self._version: Optional[Hashable] = None
+        self._retired: Set[Hashable] = set()
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = Lock()
+
+    def _sync_version(self, version: Hashable) -> bool:
+        """Move to version if it is new; False when it is one the cache has already moved past"""
+        if version == self._version:
+            return True
+        if version in self._retired:
+            return False
+        if self._version is not None:
+            self._retired.add(self._version)
+        self._entries.clear()
+        self._version = version
+        return True
+
+    def _expired(self, stored_at: float) -> bool:
+        return time.time() - stored_at > self.ttl_seconds
+
+    def _fuzzy_key(self, key: str) -> Optional[str]:
+        tokens = " ".join(sorted(key.split()))
+        best_key, best_score = None, self.fuzzy_threshold
+        for candidate in self._entries:
+            score = SequenceMatcher(None, tokens, " ".join(sorted(candidate.split()))).ratio()
+            if score >= best_score:
+                best_key, best_score = candidate, score
+        return best_key
+
+    def get(self, question: str, version: Hashable) -> Optional[Any]:
+        key = normalize_question(question)
+        with self._lock:
+            current = self._sync_version(version)
+            if current and key not in self._entries and self.fuzzy_threshold:
+                key = self._fuzzy_key(key) or key
+            entry = self._entries.get(key) if current else None
+            if entry is None or self._expired(entry[0]):
+                self._entries.pop(key, None)
+                self.misses += 1
+                entry = None
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        record_cache("response", hit=entry is not None)
+        return None if entry is None else entry[1]
+
+    def put(self, question: str, version: Hashable, rendered: Any) -> None:
+        key = normalize_question(question)
+        with self._lock:
+            if not self._sync_version(version):
+                return
+            self._entries[key] = (time.time(), rendered)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+@st.cache_resource
+def get_response_cache() -> ResponseCache:
+    """Process-wide response cache shared by every chat session"""
+    return ResponseCache()
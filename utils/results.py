@@ -0,0 +1,64 @@
+import hashlib
+import io
+import logging
+from typing import Optional
+import pandas as pd
+import streamlit as st
+from config.settings import RESULT_PAGE_ROWS, RESULT_STORE_MB
+from utils.memo import LRUCache
+
+logging.basicConfig(level=logging.INFO)
+
+class ResultStore:
+    """Full agent result tables, kept as zstd-compressed Feather blobs under a byte budget.
+
+    Results are addressed by content hash, so a cached answer replayed in
+    another session pages through the same stored table. Evicted results
+    fall back to the first page rendered into the chat history.
+    """
+
+    def __init__(self, max_bytes: int = RESULT_STORE_MB * 1024 * 1024):
+        self._blobs = LRUCache(max_entries=4096, max_bytes=max_bytes, name="results")
+
+    def put(self, df: pd.DataFrame) -> Optional[str]:
+        """Store a result table and return its id, or None if it cannot be serialized"""
+        df = df.reset_index() if any(df.index.names) else df.reset_index(drop=True)
+        df.columns = [str(col) for col in df.columns]
+        buffer = io.BytesIO()
+        try:
+            df.to_feather(buffer, compression="zstd")
+        except Exception as e:
+            logging.warning(f"Could not store result table: {e}")
+            return None
+        blob = buffer.getvalue()
+        result_id = hashlib.blake2b(blob, digest_size=16).hexdigest()
+        self._blobs.put(result_id, blob, size=len(blob))
+        return result_id
+
+    def get(self, result_id: str) -> Optional[pd.DataFrame]:
+        blob = self._blobs.get(result_id)
+        return None if blob is None else pd.read_feather(io.BytesIO(blob))
+
+    def stats(self):
+        return self._blobs.stats()
+
+@st.cache_resource
+def get_result_store() -> ResultStore:
+    """Process-wide store of agent result tables"""
+    return ResultStore()
+
+def page_count(n_rows: int, page_rows: int = RESULT_PAGE_ROWS) -> int:
+    return max((n_rows + page_rows - 1) // page_rows, 1)
+
+def result_page(
+    df: pd.DataFrame,
+    page: int = 1,
+    sort_by: Optional[str] = None,
+    ascending: bool = True,
+    page_rows: int = RESULT_PAGE_ROWS
+) -> pd.DataFrame:
+    """One page (1-based) of a result table, optionally sorted on a column first"""
+    if sort_by is not None:
+        df = df.sort_values(sort_by, ascending=ascending, kind="stable")
+    start = (page - 1) * page_rows
+    return df.iloc[start:start + page_rows]
@@ -0,0 +1,57 @@
+"""Lazily initialized pandasai/OpenAI clients.
+
+pandasai and pandasai_openai pull in a large dependency tree, so nothing
+imports them at module level: the dashboard never loads them, and the agent
+page and dataset bootstrap load them on first use (the agent page warms them
+up in the background while it renders, and is the only page that starts a
+background bootstrap).
+"""
+import importlib
+import logging
+import os
+import threading
+from threading import Lock
+import streamlit as st
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+
+_lock = Lock()
+_pandasai = None
+_llm_configured = False
+
+def pandasai():
+    """The pandasai module, imported and given its API key once per process"""
+    global _pandasai
+    with _lock:
+        if _pandasai is None:
+            module = importlib.import_module("pandasai")
+            module.api_key.set(os.getenv("PANDASAI_API_KEY"))
+            _pandasai = module
+        return _pandasai
+
+def configure_llm():
+    """Point pandasai at the OpenAI LLM, once per process"""
+    global _llm_configured
+    pai = pandasai()
+    with _lock:
+        if not _llm_configured:
+            from pandasai_openai import OpenAI
+            pai.config.set({"llm": OpenAI(api_token=os.getenv("OPENAI_API_KEY"))})
+            _llm_configured = True
+    return pai
+
+@st.cache_resource
+def warm_up() -> threading.Thread:
+    """Import and configure pandasai on a daemon thread, once per process"""
+    def _run():
+        try:
+            configure_llm()
+        except Exception as e:
+            logging.error(f"pandasai warm-up failed: {e}")
+
+    thread = threading.Thread(target=_run, name="pandasai-warm-up", daemon=True)
+    thread.start()
+    return thread
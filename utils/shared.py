@@ -0,0 +1,271 @@
+"""Publish cleaned rows and aggregate cubes once for every dashboard process on a host.
+
+One loader process builds the data and publishes it as uncompressed Arrow
+files; Streamlit processes memory-map them read-only, so the page cache
+holds one copy however many workers run:
+
+    python -m utils.shared --source data/store --watch 300
+
+Layout under MYMTN_SHARED_DIR:
+    CURRENT                           live generation number, replaced atomically
+    gen-<n>/manifest.json             {"generation", "source", "source_version", "regions", "units": {unit: subdir}}
+    gen-<n>/rows.arrow                cleaned fact rows for every published unit
+    gen-<n>/all/daily.arrow           cube over all units, daily grain sorted by date
+    gen-<n>/all/agents.arrow          cube over all units, agent grain
+    gen-<n>/all/*.index.arrow         published SelectionIndex orders for each grain
+    gen-<n>/<unit slug>/...           the same cube files for one unit
+
+A refresh publishes generation n + 1 and then swaps CURRENT. Workers pick up
+the new generation on their next rerun. Old generations stay readable through
+existing mappings even after they are pruned.
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import time
+from threading import Lock
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import streamlit as st
+from config.settings import REGIONS, SHARED_DIR, SHARED_KEEP_GENERATIONS
+from utils.cube import AggregateCube, build_agents, build_daily
+from utils.data_processing import TEXT_COLUMNS
+from utils.indexes import build_selection_index, selection_orders
+from utils.snapshot import write_feather_atomic
+from utils.store import current_source, load_source, source_version, unit_slug, write_json_atomic
+
+logging.basicConfig(level=logging.INFO)
+
+CURRENT = "CURRENT"
+MANIFEST = "manifest.json"
+ALL_UNITS = "all"
+GRAINS = ("daily", "agents")
+
+def generation_dir(shared_dir: str, generation: int) -> str:
+    return os.path.join(shared_dir, f"gen-{generation:06d}")
+
+def current_generation(shared_dir: str = SHARED_DIR) -> Optional[int]:
+    """The live generation, or None when shared mode is off or nothing is published yet"""
+    if not shared_dir:
+        return None
+    try:
+        with open(os.path.join(shared_dir, CURRENT)) as current:
+            return int(current.read().strip())
+    except (OSError, ValueError):
+        return None
+
+def _plain(data_type: pa.DataType) -> bool:
+    return pa.types.is_integer(data_type) or pa.types.is_floating(data_type) or (
+        pa.types.is_timestamp(data_type) and data_type.tz is None
+    )
+
+def _values(array: pa.Array) -> np.ndarray:
+    """A read-only numpy view of a fixed-width array's data buffer"""
+    dtype = np.dtype(array.type.to_pandas_dtype())
+    return np.frombuffer(array.buffers()[1], dtype=dtype, count=len(array), offset=array.offset * dtype.itemsize)
+
+def _column_view(column: pa.ChunkedArray):
+    """Zero-copy view of one column, or a pandas copy for layouts that cannot be viewed.
+
+    Files are written from pandas, so null slots already hold NaN (floats)
+    or -1 (categorical codes) in the data buffer and the view needs no mask.
+    """
+    if column.num_chunks == 1:
+        array = column.chunk(0)
+        if pa.types.is_dictionary(array.type) and _plain(array.type.index_type):
+            categories = pd.CategoricalDtype(array.dictionary.to_pandas())
+            return pd.Categorical.from_codes(_values(array.indices), dtype=categories)
+        if _plain(array.type):
+            return _values(array)
+    return column.to_pandas()
+
+def read_shared_frame(path: str) -> pd.DataFrame:
+    """Memory-map an Arrow file written by write_feather_atomic as a read-only frame over the mapping"""
+    table = feather.read_table(path, memory_map=True)
+    columns = {name: _column_view(table.column(name)) for name in table.column_names}
+    index = columns.pop("date_key", None)
+    if index is not None:
+        index = pd.DatetimeIndex(index, name="date_key", copy=False)
+    return pd.DataFrame(columns, index=index, copy=False)
+
+def _write_frame(df: pd.DataFrame, path: str) -> None:
+    # One record batch per file, so every column maps to a single buffer.
+    write_feather_atomic(df, path, chunksize=max(len(df), 1))
+
+def _write_cube(directory: str, daily: pd.DataFrame, agents: pd.DataFrame) -> None:
+    for grain, df in zip(GRAINS, (daily, agents)):
+        _write_frame(df, os.path.join(directory, f"{grain}.arrow"))
+        _write_frame(pd.DataFrame(selection_orders(df)), os.path.join(directory, f"{grain}.index.arrow"))
+
+def _unit_rows(df: pd.DataFrame, unit: str) -> pd.DataFrame:
+    rows = df[(df['salesbusinessunitname'] == unit).to_numpy()]
+    for col in TEXT_COLUMNS:
+        rows[col] = rows[col].cat.remove_unused_categories()
+    return rows
+
+def publish(
+    source: str,
+    shared_dir: str = SHARED_DIR,
+    regions: Optional[Sequence[str]] = REGIONS,
+    keep: int = SHARED_KEEP_GENERATIONS
+) -> int:
+    """Build rows and cubes from source into a new generation, swap it live and prune old ones"""
+    os.makedirs(shared_dir, exist_ok=True)
+    generation = (current_generation(shared_dir) or 0) + 1
+    directory = generation_dir(shared_dir, generation)
+    if os.path.isdir(directory):
+        shutil.rmtree(directory)
+
+    version = source_version(source)
+    rows = load_source(source, regions)
+    _write_frame(rows, os.path.join(directory, "rows.arrow"))
+
+    daily = build_daily(rows).sort_index(kind='stable')
+    _write_cube(os.path.join(directory, ALL_UNITS), daily, build_agents(daily))
+    units = sorted(str(unit) for unit in daily['salesbusinessunitname'].unique())
+    for unit in units:
+        unit_daily = _unit_rows(daily, unit)
+        _write_cube(os.path.join(directory, unit_slug(unit)), unit_daily, build_agents(unit_daily))
+
+    write_json_atomic(directory, MANIFEST, {
+        "generation": generation,
+        "source": os.path.abspath(source),
+        "source_version": version,
+        "regions": sorted(regions) if regions is not None else None,
+        "units": {unit: unit_slug(unit) for unit in units},
+        "published_at": time.time(),
+    })
+    write_json_atomic(shared_dir, CURRENT, generation)
+    logging.info(f"Published generation {generation} of {source} ({version}, {len(rows):,} rows)")
+    _prune(shared_dir, generation, keep)
+    return generation
+
+def _prune(shared_dir: str, live: int, keep: int) -> None:
+    """Remove generations older than the last keep, always keeping the one before live.
+
+    Workers attached to the previous generation map its cubes lazily, so it
+    must outlive the swap; workers still mapping pruned files keep their pages.
+    """
+    for name in os.listdir(shared_dir):
+        if name.startswith("gen-"):
+            try:
+                generation = int(name[4:])
+            except ValueError:
+                continue
+            if generation <= live - max(keep, 2):
+                shutil.rmtree(os.path.join(shared_dir, name), ignore_errors=True)
+
+def read_generation_manifest(shared_dir: str, generation: int) -> Dict:
+    with open(os.path.join(generation_dir(shared_dir, generation), MANIFEST)) as manifest:
+        return json.load(manifest)
+
+class SharedData:
+    """One published generation, attached read-only; rows and cubes are mapped on first use"""
+
+    def __init__(self, shared_dir: str, generation: int):
+        self.directory = generation_dir(shared_dir, generation)
+        manifest = read_generation_manifest(shared_dir, generation)
+        self.generation = generation
+        self.source = manifest["source"]
+        self.source_version = manifest["source_version"]
+        self.regions = manifest["regions"]
+        self.subdirs: Dict[str, str] = manifest["units"]
+        self.units: List[str] = sorted(self.subdirs)
+        self._rows: Optional[pd.DataFrame] = None
+        self._cubes: Dict[Optional[str], AggregateCube] = {}
+        self._lock = Lock()
+
+    def covers(self, regions: Optional[Sequence[str]]) -> bool:
+        """Whether the published rows are exactly what load_source(source, regions) would return"""
+        return self.regions == (sorted(regions) if regions is not None else None)
+
+    def rows(self) -> pd.DataFrame:
+        with self._lock:
+            if self._rows is None:
+                self._rows = read_shared_frame(os.path.join(self.directory, "rows.arrow"))
+            return self._rows
+
+    def cube(self, unit: Optional[str] = None) -> AggregateCube:
+        """The cube for one unit, or over all published units when unit is None"""
+        with self._lock:
+            cube = self._cubes.get(unit)
+            if cube is None:
+                subdir = os.path.join(self.directory, ALL_UNITS if unit is None else self.subdirs[unit])
+                frames, indexes = {}, {}
+                for grain in GRAINS:
+                    frames[grain] = read_shared_frame(os.path.join(subdir, f"{grain}.arrow"))
+                    orders = read_shared_frame(os.path.join(subdir, f"{grain}.index.arrow"))
+                    indexes[grain] = build_selection_index(
+                        frames[grain], orders={col: orders[col].to_numpy() for col in orders.columns}
+                    )
+                cube = self._cubes[unit] = AggregateCube(
+                    daily=frames["daily"],
+                    agents=frames["agents"],
+                    agents_index=indexes["agents"],
+                    daily_index=indexes["daily"],
+                    version=f"{unit or ALL_UNITS}@gen{self.generation}"
+                )
+            return cube
+
+@st.cache_resource(max_entries=2)
+def attach(shared_dir: str, generation: int) -> SharedData:
+    """Attach a generation once per process; the previous one is released after the next swap"""
+    logging.info(f"Attaching shared data generation {generation}")
+    return SharedData(shared_dir, generation)
+
+def shared_data(source: str, shared_dir: str = SHARED_DIR) -> Optional[SharedData]:
+    """The live shared generation for source, or None to load data in-process.
+
+    A generation published from an older version of source is ignored until
+    the publisher catches up, so workers never serve stale rows.
+    """
+    generation = current_generation(shared_dir)
+    if generation is None:
+        return None
+    try:
+        data = attach(shared_dir, generation)
+    except (OSError, ValueError, KeyError) as e:
+        logging.warning(f"Shared data generation {generation} is unreadable, loading in-process: {e}")
+        return None
+    if data.source != os.path.abspath(source):
+        return None
+    try:
+        version = source_version(source)
+    except (OSError, ValueError, KeyError) as e:
+        logging.warning(f"Cannot version {source}, loading in-process: {e}")
+        return None
+    if data.source_version != version:
+        logging.info(f"Shared data generation {generation} is stale ({data.source_version}, source is {version}), loading in-process")
+        return None
+    return data
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish MyMTN data for shared, read-only use by dashboard processes.")
+    parser.add_argument("--source", default=None, help="Raw extract or partitioned store (defaults to the dashboard's source)")
+    parser.add_argument("--shared-dir", default=SHARED_DIR or os.path.join("data", "shared"))
+    parser.add_argument("--watch", type=float, default=0, help="Re-publish when the source changes, checking every N seconds")
+    args = parser.parse_args()
+    source = args.source or current_source()
+
+    published = None
+    while True:
+        version = source_version(source)
+        if version != published:
+            generation = current_generation(args.shared_dir)
+            live = read_generation_manifest(args.shared_dir, generation) if generation else {}
+            if live.get("source_version") == version and live.get("source") == os.path.abspath(source):
+                logging.info(f"Generation {generation} is current ({version}).")
+            else:
+                publish(source, args.shared_dir)
+            published = version
+        if not args.watch:
+            break
+        time.sleep(args.watch)
+
+if __name__ == "__main__":
+    main()
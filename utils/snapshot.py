@@ -0,0 +1,106 @@
+import hashlib
+import logging
+import os
+import tempfile
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+import pyarrow.feather as feather
+
+logging.basicConfig(level=logging.INFO)
+
+# Bump whenever the cleaning pipeline changes so stale snapshots are ignored.
+PREPROCESSING_VERSION = 3
+
+SNAPSHOT_DIR = os.path.join("data", ".snapshots")
+
+def _file_digest(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """Hash the raw bytes of the source file"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as source:
+        for chunk in iter(lambda: source.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# path -> (size, mtime_ns, digest): each file is hashed once per change, not once per call.
+_digests: Dict[str, Tuple[int, int, str]] = {}
+
+def file_fingerprint(file_path: str) -> Tuple[int, int, str]:
+    """(size, mtime_ns, content hash) of a file, rehashing only when its size or mtime changes"""
+    stat = os.stat(file_path)
+    path = os.path.abspath(file_path)
+    cached = _digests.get(path)
+    if cached is None or cached[:2] != (stat.st_size, stat.st_mtime_ns):
+        cached = _digests[path] = (stat.st_size, stat.st_mtime_ns, _file_digest(file_path))
+    return cached
+
+def snapshot_key(file_path: str, scope: str = "") -> str:
+    """Build the cache key from the source mtime/size/hash, the preprocessing version and an optional scope"""
+    size, mtime_ns, digest = file_fingerprint(file_path)
+    raw = f"{PREPROCESSING_VERSION}:{size}:{mtime_ns}:{digest}:{scope}"
+    return hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+
+def snapshot_path(file_path: str, key: str, scope: str = "", snapshot_dir: str = SNAPSHOT_DIR) -> str:
+    """Location of the snapshot for a given source file, scope and key.
+
+    Each scope gets its own file stem so refreshing one scope's snapshot
+    does not remove another's.
+    """
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    if scope:
+        stem += "." + hashlib.blake2b(scope.encode(), digest_size=4).hexdigest()
+    return os.path.join(snapshot_dir, f"{stem}-{key}.feather")
+
+def read_snapshot(path: str) -> Optional[pd.DataFrame]:
+    """Read an Arrow file written by write_feather_atomic, or return None if missing/unreadable.
+
+    Memory mapping only speeds up the read: to_pandas copies every column
+    into private memory. utils.shared builds zero-copy views instead.
+    """
+    if not os.path.isfile(path):
+        return None
+    try:
+        table = feather.read_table(path, memory_map=True)
+        df = table.to_pandas()
+    except Exception as e:
+        logging.warning(f"Ignoring unreadable snapshot {path}: {e}")
+        return None
+    if "date_key" in df.columns:
+        df.set_index("date_key", inplace=True)
+    return df
+
+def write_feather_atomic(df: pd.DataFrame, path: str, chunksize: Optional[int] = None) -> None:
+    """Write a frame (named index included) as an uncompressed Arrow file via a temp file and rename"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    try:
+        # Uncompressed so later loads can memory-map the columns directly.
+        table = df.reset_index() if df.index.name else df.reset_index(drop=True)
+        feather.write_feather(table, temp_path, compression="uncompressed", chunksize=chunksize)
+        os.replace(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def write_snapshot(df: pd.DataFrame, path: str) -> None:
+    """Atomically write the cleaned frame as an uncompressed Arrow file and drop older snapshots"""
+    snapshot_dir = os.path.dirname(path)
+    prefix = os.path.basename(path).rsplit("-", 1)[0] + "-"
+
+    try:
+        write_feather_atomic(df, path)
+    except Exception as e:
+        logging.warning(f"Could not write snapshot {path}: {e}")
+        return
+
+    for name in os.listdir(snapshot_dir):
+        stale = os.path.join(snapshot_dir, name)
+        if name.startswith(prefix) and name.endswith(".feather") and stale != path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+    logging.info(f"Wrote preprocessed snapshot to {path}")
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from typing import Any, Dict, List, Optional, Sequence
+import pandas as pd
+from config.settings import DATA_SOURCE, STORE_DIR
+from utils.data_processing import load_extract, concat_compact, TEXT_COLUMNS
+from utils.snapshot import read_snapshot, snapshot_key, write_feather_atomic
+
+logging.basicConfig(level=logging.INFO)
+
+# Partitioned store of cleaned rows and their aggregates, split by business
+# unit and then by date:
+#   regions.json                             {"version": n, "units": {unit: subdir}}
+#   <unit>/rows/date_key=YYYYMMDD.feather    cleaned fact rows for one day
+#   <unit>/cube/date_key=YYYYMMDD.feather    daily cube rows for that day
+#   <unit>/agents.feather                    running per-agent totals
+#   <unit>/manifest.json                     {"version": n, "dates": [...], "rows": {date: count}}
+REGIONS_MANIFEST = "regions.json"
+MANIFEST = "manifest.json"
+
+def write_json_atomic(directory: str, name: str, payload: Any) -> None:
+    """Write payload as JSON to directory/name through a temp file and rename, so readers never see a partial file"""
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w") as out:
+        json.dump(payload, out)
+    os.replace(temp_path, os.path.join(directory, name))
+
+def is_store(source: str) -> bool:
+    """Whether source points at a partitioned store rather than a CSV extract"""
+    return os.path.isfile(os.path.join(source, REGIONS_MANIFEST))
+
+def current_source() -> str:
+    """The ingested store when there is one, otherwise the raw extract"""
+    return STORE_DIR if is_store(STORE_DIR) else DATA_SOURCE
+
+def read_regions(store_dir: str) -> Dict:
+    """Read the region manifest, or an empty one for a new store"""
+    try:
+        with open(os.path.join(store_dir, REGIONS_MANIFEST)) as manifest:
+            return json.load(manifest)
+    except FileNotFoundError:
+        return {"version": 0, "units": {}}
+
+def write_regions(store_dir: str, regions: Dict) -> None:
+    """Atomically replace the region manifest"""
+    write_json_atomic(store_dir, REGIONS_MANIFEST, regions)
+
+def unit_slug(unit: str) -> str:
+    """Filesystem-safe, collision-free directory name for a business unit"""
+    readable = re.sub(r"[^a-z0-9]+", "-", unit.lower()).strip("-")
+    return f"{readable}-{hashlib.blake2b(unit.encode(), digest_size=3).hexdigest()}"
+
+def unit_dir(store_dir: str, unit: str) -> str:
+    return os.path.join(store_dir, unit_slug(unit))
+
+def store_units(store_dir: str) -> List[str]:
+    return sorted(read_regions(store_dir)["units"])
+
+def read_manifest(unit_path: str) -> Dict:
+    """Read a unit partition's manifest, or an empty one for a new partition"""
+    try:
+        with open(os.path.join(unit_path, MANIFEST)) as manifest:
+            return json.load(manifest)
+    except FileNotFoundError:
+        return {"version": 0, "dates": [], "rows": {}}
+
+def write_manifest(unit_path: str, manifest: Dict) -> None:
+    """Atomically replace a unit manifest; readers only ever see complete versions"""
+    write_json_atomic(unit_path, MANIFEST, manifest)
+
+def partition_path(unit_path: str, kind: str, day: pd.Timestamp) -> str:
+    return os.path.join(unit_path, kind, f"date_key={day:%Y%m%d}.feather")
+
+def agents_path(unit_path: str) -> str:
+    return os.path.join(unit_path, "agents.feather")
+
+def recategorize(df: pd.DataFrame) -> pd.DataFrame:
+    """Restore categorical dimensions after concatenating partitions with different categories"""
+    for col in TEXT_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    return df
+
+def read_partitions(unit_path: str, kind: str, dates: Optional[List[str]] = None) -> pd.DataFrame:
+    """Concatenate the memory-mapped partitions of one kind ("rows" or "cube")"""
+    if dates is None:
+        dates = read_manifest(unit_path)["dates"]
+    frames = [
+        read_snapshot(partition_path(unit_path, kind, pd.Timestamp(day)))
+        for day in dates
+    ]
+    frames = [frame for frame in frames if frame is not None]
+    if not frames:
+        return pd.DataFrame()
+    return recategorize(pd.concat(frames))
+
+def read_agents(unit_path: str) -> pd.DataFrame:
+    return read_snapshot(agents_path(unit_path)) if os.path.isfile(agents_path(unit_path)) else pd.DataFrame()
+
+def write_partition(unit_path: str, kind: str, day: pd.Timestamp, df: pd.DataFrame) -> None:
+    write_feather_atomic(df, partition_path(unit_path, kind, day))
+
+def write_agents(unit_path: str, df: pd.DataFrame) -> None:
+    write_feather_atomic(df, agents_path(unit_path))
+
+def unit_version(store_dir: str, unit: str) -> str:
+    return f"{unit}@{read_manifest(unit_dir(store_dir, unit))['version']}"
+
+def source_version(source: str) -> str:
+    """Version of a data source: the region manifest version for a store, the snapshot key for a CSV"""
+    if is_store(source):
+        return f"store-{read_regions(source)['version']}"
+    return snapshot_key(source)
+
+def load_source(source: str, regions: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Cleaned fact rows for regions (None for all) from either a store or a CSV extract.
+
+    A CSV is read through its content-keyed snapshot rather than the
+    path-keyed st.cache_data, so long-running publishers see source changes.
+    """
+    if is_store(source):
+        units = [unit for unit in store_units(source) if regions is None or unit in regions]
+        frames = [read_partitions(unit_dir(source, unit), "rows") for unit in units]
+        return concat_compact([frame for frame in frames if not frame.empty])
+    return load_extract(source, regions)
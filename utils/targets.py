@@ -0,0 +1,151 @@
+import logging
+import os
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import streamlit as st
+from config.settings import TARGETS_SOURCE
+from utils.cube import AggregateCube
+from utils.data_processing import normalize_unit, TEXT_COLUMNS
+from utils.ranking import partial_select
+
+logging.basicConfig(level=logging.INFO)
+
+# Targets file: one yearly download target per row. Leave agentname blank for a
+# service-center target, and servicecentername too for a business-unit target.
+# A center or unit without an explicit target gets the sum of the targets below it.
+#   year,salesbusinessunitname,servicecentername,agentname,download_target
+LEVELS = {
+    'unit': ['salesbusinessunitname'],
+    'center': ['salesbusinessunitname', 'servicecentername'],
+    'agent': TEXT_COLUMNS,
+}
+
+@dataclass
+class TargetModel:
+    """Yearly targets joined to year-to-date actuals for every unit, center and agent.
+
+    Each level is a frame keyed by its name columns with ytd, target,
+    attainment (ytd / target, %), projected (year-end at the current run rate)
+    and projected_attainment. Entities without a target have NaN there.
+    """
+    year: int
+    units: pd.DataFrame
+    centers: pd.DataFrame
+    agents: pd.DataFrame
+
+def targets_version(path: str = TARGETS_SOURCE) -> Optional[str]:
+    """Size and mtime of the targets file, or None when there is none"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+def read_targets(path: str = TARGETS_SOURCE) -> pd.DataFrame:
+    """Load the targets file with names normalized the way the extract's are"""
+    targets = pd.read_csv(path, dtype={col: 'string' for col in TEXT_COLUMNS})
+    targets.columns = targets.columns.str.lower()
+    targets['salesbusinessunitname'] = normalize_unit(targets['salesbusinessunitname'].str.strip())
+    for col in ['servicecentername', 'agentname']:
+        targets[col] = targets[col].str.strip().str.title().replace('', pd.NA)
+    targets['download_target'] = pd.to_numeric(targets['download_target'], errors='coerce')
+    return targets.dropna(subset=['salesbusinessunitname', 'download_target'])
+
+def _explicit_targets(targets: pd.DataFrame, level: str) -> pd.Series:
+    """Targets set directly at one level, summed per key"""
+    keys = LEVELS[level]
+    deeper = [col for col in TEXT_COLUMNS if col not in keys]
+    rows = targets[targets[keys].notna().all(axis=1) & targets[deeper].isna().all(axis=1)]
+    return rows.groupby(keys)['download_target'].sum()
+
+def _join_keys(index: pd.Index) -> pd.Index:
+    """Entity keys with surrounding whitespace dropped, as the targets file is read"""
+    frame = index.to_frame(index=False).astype(str).apply(lambda col: col.str.strip())
+    return pd.MultiIndex.from_frame(frame) if frame.shape[1] > 1 else pd.Index(frame.iloc[:, 0])
+
+def _attainment(frame: pd.DataFrame, days_elapsed: int, days_in_year: int) -> pd.DataFrame:
+    frame['projected'] = frame['ytd'] / days_elapsed * days_in_year
+    frame['attainment'] = frame['ytd'] / frame['target'] * 100
+    frame['projected_attainment'] = frame['projected'] / frame['target'] * 100
+    return frame
+
+def build_target_model(cube: AggregateCube, targets: pd.DataFrame) -> TargetModel:
+    """Join targets to YTD actuals at every level in a few grouped, vectorized passes"""
+    anchor = cube.daily.index.max()
+    year = anchor.year
+    year_start = pd.Timestamp(year, 1, 1)
+    days_elapsed = (anchor - year_start).days + 1
+    days_in_year = 366 if pd.Timestamp(year, 12, 31).dayofyear == 366 else 365
+    if 'year' in targets.columns:
+        targets = targets[targets['year'].isna() | (targets['year'] == year)]
+
+    ytd_rows = cube.daily[cube.daily.index >= year_start]
+    agents = (
+        ytd_rows.groupby(TEXT_COLUMNS, observed=True)['download'].sum()
+        .reindex(pd.MultiIndex.from_frame(cube.agents[TEXT_COLUMNS]), fill_value=0)
+        .rename('ytd').to_frame()
+    )
+    agents['target'] = _explicit_targets(targets, 'agent').reindex(_join_keys(agents.index)).to_numpy()
+
+    levels = {'agent': agents}
+    for level, below in (('center', 'agent'), ('unit', 'center')):
+        keys = LEVELS[level]
+        grouped = levels[below].groupby(level=keys, observed=True)
+        rolled = pd.DataFrame({
+            'ytd': grouped['ytd'].sum(),
+            'target': grouped['target'].sum(min_count=1)
+        })
+        explicit = _explicit_targets(targets, level).reindex(_join_keys(rolled.index)).to_numpy()
+        rolled['target'] = np.where(np.isnan(explicit), rolled['target'], explicit)
+        levels[level] = rolled
+
+    return TargetModel(
+        year=year,
+        **{
+            plural: _attainment(levels[level], days_elapsed, days_in_year).reset_index()
+            for level, plural in (('unit', 'units'), ('center', 'centers'), ('agent', 'agents'))
+        }
+    )
+
+@st.cache_resource(max_entries=64)
+def _cached_target_model(cube_version: str, path: str, version: str, _cube: AggregateCube) -> TargetModel:
+    logging.info(f"Building target model for {cube_version}")
+    return build_target_model(_cube, read_targets(path))
+
+def target_model(cube: AggregateCube, path: str = TARGETS_SOURCE) -> Optional[TargetModel]:
+    """Target model for a cube, built once per (cube, targets file) version; None without targets"""
+    version = targets_version(path)
+    if version is None or cube.daily.empty:
+        return None
+    return _cached_target_model(cube.version, path, version, cube)
+
+def selection_target(
+    model: TargetModel,
+    selected_units: List[str],
+    selected_centers: List[str]
+) -> Tuple[float, float, float]:
+    """(ytd, target, projected) for a selection: unit targets when every center is selected, else center targets.
+
+    Only units or centers with a target count towards ytd and projected, so the
+    three always cover the same entities; the target is 0 when none has one.
+    """
+    if "All" in selected_centers:
+        rows = model.units if "All" in selected_units else model.units[model.units['salesbusinessunitname'].isin(selected_units)]
+    else:
+        rows = model.centers[model.centers['servicecentername'].isin(selected_centers)]
+        if "All" not in selected_units:
+            rows = rows[rows['salesbusinessunitname'].isin(selected_units)]
+    rows = rows[rows['target'].notna()]
+    return float(rows['ytd'].sum()), float(rows['target'].sum()), float(rows['projected'].sum())
+
+def rank_by_attainment(model: TargetModel, n: int = 5, projected: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """(top, bottom) n agents by attainment, ties broken on ytd; agents without a target are left out"""
+    column = 'projected_attainment' if projected else 'attainment'
+    agents = model.agents[np.isfinite(model.agents[column].to_numpy(dtype='float64'))]
+    primary = agents[column].to_numpy(dtype='float64')
+    secondary = agents['ytd'].to_numpy(dtype='float64')
+    top = agents.iloc[partial_select(primary, secondary, n, largest=True)]
+    bottom = agents.iloc[partial_select(primary, secondary, n, largest=False)]
+    return top.reset_index(drop=True), bottom.reset_index(drop=True)
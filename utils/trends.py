@@ -0,0 +1,139 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from utils.data_processing import MEASURE_COLUMNS
+
+# Comparison windows, each (current, previous), ending at the anchor date:
+#   wow: the last 7 days vs the 7 days before
+#   mom: month to date vs the same span of the previous month
+#   ytd: year to date vs the same span of the previous year
+PERIODS = ('wow', 'mom', 'ytd')
+
+RESAMPLE_RULES = {'daily': 'D', 'weekly': 'W-MON', 'monthly': 'MS'}
+
+# Sidebar period presets, resolved against the latest date in the data.
+PERIOD_PRESETS = ('All time', 'Today', 'Last 7 days', 'Last 30 days', 'This month', 'Last month', 'This year', 'Custom')
+
+def preset_range(preset: str, latest: pd.Timestamp) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+    """Inclusive (start, end) dates for a period preset; None for all time or a custom range"""
+    month_start = latest.replace(day=1)
+    ranges = {
+        'Today': (latest, latest),
+        'Last 7 days': (latest - pd.Timedelta(days=6), latest),
+        'Last 30 days': (latest - pd.Timedelta(days=29), latest),
+        'This month': (month_start, latest),
+        'Last month': ((month_start - pd.Timedelta(days=1)).replace(day=1), month_start - pd.Timedelta(days=1)),
+        'This year': (latest.replace(month=1, day=1), latest),
+    }
+    return ranges.get(preset)
+
+def previous_range(start: pd.Timestamp, end: pd.Timestamp) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    """The inclusive range of the same length ending the day before start"""
+    length = end - start + pd.Timedelta(days=1)
+    return start - length, start - pd.Timedelta(days=1)
+
+def period_label(date_range: Optional[Tuple[pd.Timestamp, pd.Timestamp]]) -> str:
+    """The period the download/MAU card values cover, for their titles"""
+    if date_range is None:
+        return "all time"
+    start, end = (pd.Timestamp(date) for date in date_range)
+    if start == end:
+        return f"{end:%d %b %Y}"
+    return f"{start:%d %b} – {end:%d %b %Y}"
+
+def delta_label(date_range: Optional[Tuple[pd.Timestamp, pd.Timestamp]]) -> str:
+    """Label for the download/MAU card deltas: MTD without a range, else the preceding equal-length range"""
+    if date_range is None:
+        return "month to date vs same days last month"
+    start, end = (pd.Timestamp(date) for date in date_range)
+    days = (end - start).days + 1
+    return "vs previous day" if days == 1 else f"vs previous {days} days"
+
+def range_totals(series: pd.DataFrame, prefix: np.ndarray, start: pd.Timestamp, end: pd.Timestamp) -> Dict[str, float]:
+    """download/mau totals between two dates from a series' prefix sums, via two binary searches"""
+    lo = series.index.searchsorted(start, side='left')
+    hi = series.index.searchsorted(end, side='right')
+    return dict(zip(MEASURE_COLUMNS, prefix[hi] - prefix[lo]))
+
+def prefix_sums(series: pd.DataFrame) -> np.ndarray:
+    """Cumulative download/mau totals with a leading zero row, so any date range sums in O(1)"""
+    values = series[MEASURE_COLUMNS].to_numpy(dtype='float64')
+    return np.vstack([np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)])
+
+def daily_series(daily_rows: pd.DataFrame) -> pd.DataFrame:
+    """Per-date download/mau totals for some cube.daily rows, sorted by date"""
+    if daily_rows.empty:
+        return pd.DataFrame(columns=MEASURE_COLUMNS, index=pd.DatetimeIndex([], name='date_key'), dtype='int64')
+    return daily_rows.groupby(level=0)[MEASURE_COLUMNS].sum().astype('int64')
+
+def resample_series(
+    daily_rows: pd.DataFrame,
+    frequency: str = 'daily',
+    by: Optional[str] = None
+) -> pd.DataFrame:
+    """Daily, weekly or monthly download/mau series, optionally one per unit, center or agent.
+
+    daily_rows are date-indexed cube.daily rows, or an already summed daily
+    series when by is None. Weeks start on Monday and months on the 1st.
+    """
+    rule = RESAMPLE_RULES[frequency]
+    if daily_rows.empty:
+        return daily_series(daily_rows)
+    if by is None:
+        return daily_series(daily_rows).resample(rule, label='left', closed='left').sum()
+    grouper = [daily_rows[by], pd.Grouper(level=0, freq=rule, label='left', closed='left')]
+    return daily_rows.groupby(grouper, observed=True)[MEASURE_COLUMNS].sum()
+
+def period_bounds(anchor: pd.Timestamp) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+    """Inclusive (start, end) date ranges: current then previous window for each of PERIODS"""
+    month_start = anchor.replace(day=1)
+    previous_month_end = anchor - pd.DateOffset(months=1)
+    year_start = anchor.replace(month=1, day=1)
+    previous_year_end = anchor - pd.DateOffset(years=1)
+    return [
+        (anchor - pd.Timedelta(days=6), anchor),
+        (anchor - pd.Timedelta(days=13), anchor - pd.Timedelta(days=7)),
+        (month_start, anchor),
+        (previous_month_end.replace(day=1), previous_month_end),
+        (year_start, anchor),
+        (previous_year_end.replace(month=1, day=1), previous_year_end),
+    ]
+
+def period_deltas(
+    series: pd.DataFrame,
+    anchor: Optional[pd.Timestamp] = None
+) -> Dict[str, Dict[str, Tuple[float, float]]]:
+    """(current, previous) totals per period and measure, e.g. result['mom']['download'].
+
+    All six windows are summed at once from one prefix-sum array: the window
+    edges are located with a single searchsorted over the sorted dates.
+    anchor defaults to the last date in the series; pass the latest date of
+    the whole dataset so that selections without recent activity show a drop.
+    """
+    if series.empty:
+        return {period: {measure: (0.0, 0.0) for measure in MEASURE_COLUMNS} for period in PERIODS}
+    if anchor is None:
+        anchor = series.index[-1]
+
+    dates = series.index.to_numpy()
+    prefix = prefix_sums(series)
+
+    bounds = period_bounds(pd.Timestamp(anchor))
+    starts = np.array([start for start, _ in bounds], dtype=dates.dtype)
+    ends = np.array([end for _, end in bounds], dtype=dates.dtype)
+    sums = prefix[np.searchsorted(dates, ends, side='right')] - prefix[np.searchsorted(dates, starts, side='left')]
+
+    return {
+        period: {
+            measure: (sums[2 * i, j], sums[2 * i + 1, j])
+            for j, measure in enumerate(MEASURE_COLUMNS)
+        }
+        for i, period in enumerate(PERIODS)
+    }
+
+def change(current: float, previous: float) -> Optional[Tuple[float, float]]:
+    """Absolute and percentage change from previous to current, or None without a baseline to compare with"""
+    if previous <= 0:
+        return None
+    delta = current - previous
+    return delta, delta / previous * 100
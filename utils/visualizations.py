@@ -1,80 +1,179 @@
-import plotly.graph_objects as go
+import hashlib
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
 import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from config.settings import CHART_MAX_POINTS, CHART_WEBGL_POINTS
+from utils.instrumentation import timed
+from utils.memo import LRUCache
+
+CHART_HEIGHT = 400
+# Figures stay small (five-agent rankings, series downsampled to CHART_MAX_POINTS),
+# so the cache is bounded by entries alone and never serializes to measure them.
+MAX_FIGURES = 128
+
+MEASURE_STYLES = {
+    'download': ('Downloads', '#FFD700', 'rgba(255, 215, 0, 0.5)'),
+    'mau': ('MAU', '#FFFFFF', 'rgba(255, 255, 255, 0.5)'),
+}
+
+AXIS_STYLE = dict(gridcolor='rgba(255,255,255,0.1)', tickfont=dict(color='#FFFFFF'))
+
+# Validated once at import: building a go.Layout coerces every property and
+# resolves the default template, which used to dominate each chart build.
+BASE_LAYOUT = go.Layout(
+    plot_bgcolor='rgba(0,0,0,0)',
+    paper_bgcolor='rgba(0,0,0,0)',
+    font_color='#FFFFFF',
+    height=CHART_HEIGHT,
+    margin=dict(l=50, r=50, t=80, b=50),
+    legend=dict(
+        orientation="h",
+        yanchor="bottom",
+        y=1.15,
+        xanchor="center",
+        x=0.5,
+        bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#FFFFFF')
+    ),
+    xaxis=AXIS_STYLE,
+    yaxis=AXIS_STYLE
+)
+BAR_LAYOUT = go.Layout(BASE_LAYOUT).update(barmode='group', xaxis=dict(tickangle=45), overwrite=False)
+
+@dataclass(frozen=True)
+class FigureSpec:
+    """A built figure; shared between sessions, so treat it as read-only"""
+    figure: go.Figure
+
+    @cached_property
+    def payload_bytes(self) -> int:
+        """Size of the figure's JSON, serialized on first access (only the debug panel asks)"""
+        return len(self.figure.to_json())
+
+@st.cache_resource
+def get_figure_cache() -> LRUCache:
+    """Process-wide figure cache shared by every session"""
+    return LRUCache(max_entries=MAX_FIGURES, name="figures")
+
+def _empty_figure() -> go.Figure:
+    fig = go.Figure(layout=BASE_LAYOUT)
+    fig.add_annotation(
+        text="No data available for the selected filters",
+        xref="paper",
+        yref="paper",
+        x=0.5,
+        y=0.5,
+        showarrow=False,
+        font=dict(color="white", size=16)
+    )
+    return fig
 
-def create_agent_performance_chart(df: pd.DataFrame, n_agents: int, direction: bool) -> go.Figure:
-    """Create a double bar chart for agent performance with validation"""
-    if df.empty:
-        fig = go.Figure()
-        fig.add_annotation(
-            text="No data available for the selected filters",
-            xref="paper",
-            yref="paper",
-            x=0.5,
-            y=0.5,
-            showarrow=False,
-            font=dict(color="white", size=16)
-        )
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font_color='#FFFFFF',
-            height=400
-        )
-        return fig
-    
-    
-    df_sorted = df.groupby('agentname').agg({
-        'download': 'sum',
-        'mau': 'sum'
-    }).reset_index().sort_values('download', ascending=direction).head(n_agents)
-    
-    fig = go.Figure()
-    
-    fig.add_trace(go.Bar(
-        name='Downloads',
-        x=df_sorted['agentname'],
-        y=df_sorted['download'],
-        marker_color='#FFD700',
-        hoverinfo='text',
-        hoverlabel=dict(bgcolor='rgba(255, 215, 0, 0.5)', font_color='#000', namelength=0),
-        hovertext=df_sorted['download'].apply(lambda d: f"Downloads: <b>{d}</b>"),
-    ))
-    
-    fig.add_trace(go.Bar(
-        name='MAU',
-        x=df_sorted['agentname'],
-        y=df_sorted['mau'],
-        marker_color='#FFFFFF',
-        hoverinfo='text',
-        hoverlabel=dict(bgcolor='rgba(255, 255, 255, 0.5)', font_color='#000', namelength=0),
-        hovertext=df_sorted['mau'].apply(lambda m: f"MAU: <b>{m}</b>"),
-    ))
-    
-    fig.update_layout(
-        barmode='group',
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font_color='#FFFFFF',
-        height=400,
-        margin=dict(l=50, r=50, t=80, b=50),
-        legend=dict(
-            orientation="h",    
-            yanchor="bottom",  
-            y=1.15,          
-            xanchor="center", 
-            x=0.5,            
-            bgcolor='rgba(0,0,0,0)',
-            font=dict(color='#FFFFFF')
-        ),
-        xaxis=dict(
-            gridcolor='rgba(255,255,255,0.1)',
-            tickfont=dict(color='#FFFFFF'),
-            tickangle=45
-        ),
-        yaxis=dict(
-            gridcolor='rgba(255,255,255,0.1)',
-            tickfont=dict(color='#FFFFFF')
-        )
+def _bar_trace(x: np.ndarray, y: np.ndarray, measure: str) -> Dict:
+    name, color, hover_color = MEASURE_STYLES[measure]
+    return dict(
+        type='bar',
+        name=name,
+        x=x,
+        y=y,
+        marker_color=color,
+        hoverlabel=dict(bgcolor=hover_color, font_color='#000'),
+        # Formatted in the browser, instead of one Python string per bar.
+        hovertemplate=f"{name}: <b>%{{y:d}}</b><extra></extra>",
     )
-    
-    return fig
\ No newline at end of file
+
+@timed()
+def create_agent_performance_chart(df_sorted: pd.DataFrame) -> go.Figure:
+    """Create a double bar chart from an agent ranking (see utils.ranking.rank_agents)"""
+    if df_sorted.empty:
+        return _empty_figure()
+    x = df_sorted['agentname'].to_numpy(dtype=object)
+    return go.Figure(
+        data=[_bar_trace(x, df_sorted[measure].to_numpy(), measure) for measure in MEASURE_STYLES],
+        layout=BAR_LAYOUT
+    )
+
+def ranking_key(df_sorted: pd.DataFrame) -> str:
+    """Content hash of an agent ranking: identical selections give identical keys"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("\x1f".join(map(str, df_sorted['agentname'])).encode())
+    for measure in MEASURE_STYLES:
+        digest.update(df_sorted[measure].to_numpy(dtype='int64').tobytes())
+    return digest.hexdigest()
+
+def _cached_spec(key: Tuple, build) -> FigureSpec:
+    cache = get_figure_cache()
+    spec = cache.get(key)
+    if spec is None:
+        spec = FigureSpec(figure=build())
+        cache.put(key, spec)
+    return spec
+
+def agent_chart_spec(df_sorted: pd.DataFrame) -> FigureSpec:
+    """The agent performance chart for a ranking, built once per distinct ranking"""
+    key = ("agents", ranking_key(df_sorted) if not df_sorted.empty else "")
+    return _cached_spec(key, lambda: create_agent_performance_chart(df_sorted))
+
+def downsample(x: np.ndarray, y: np.ndarray, max_points: int = CHART_MAX_POINTS) -> Tuple[np.ndarray, np.ndarray]:
+    """Reduce a series to about max_points, keeping each bucket's minimum and maximum.
+
+    Buckets are equal-width runs of consecutive points; keeping both extremes
+    (in their original order) preserves the peaks and dips a line chart shows.
+    """
+    n = len(y)
+    if n <= max_points or max_points < 4:
+        return x, y
+    buckets = max_points // 2
+    width = -(-n // buckets)
+    padded = np.full(buckets * width, np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(buckets, width)
+    blocks_valid = ~np.isnan(blocks)
+    lows = np.where(blocks_valid, blocks, np.inf).argmin(axis=1)
+    highs = np.where(blocks_valid, blocks, -np.inf).argmax(axis=1)
+    starts = np.arange(buckets) * width
+    keep = np.unique(np.concatenate([starts + lows, starts + highs]))
+    keep = keep[keep < n]
+    return x[keep], y[keep]
+
+@timed()
+def create_series_chart(
+    series: pd.DataFrame,
+    measures: Sequence[str] = tuple(MEASURE_STYLES),
+    max_points: int = CHART_MAX_POINTS,
+    webgl_points: int = CHART_WEBGL_POINTS
+) -> go.Figure:
+    """Line chart of download/mau over a date- (or agent-) indexed series.
+
+    Long series are downsampled to max_points per measure and drawn with
+    WebGL (Scattergl) once they exceed webgl_points, so charts over
+    thousands of days or agents stay cheap to serialize and render.
+    """
+    if series.empty:
+        return _empty_figure()
+    x = series.index.to_numpy()
+    trace_type = 'scattergl' if min(len(x), max_points) > webgl_points else 'scatter'
+    traces: List[Dict] = []
+    for measure in measures:
+        name, color, hover_color = MEASURE_STYLES[measure]
+        xs, ys = downsample(x, series[measure].to_numpy(dtype='float64'), max_points)
+        traces.append(dict(
+            type=trace_type,
+            mode='lines',
+            name=name,
+            x=xs,
+            y=ys,
+            line=dict(color=color),
+            hoverlabel=dict(bgcolor=hover_color, font_color='#000'),
+            hovertemplate=f"%{{x}}<br>{name}: <b>%{{y:,.0f}}</b><extra></extra>",
+        ))
+    return go.Figure(data=traces, layout=BASE_LAYOUT)
+
+def series_chart_spec(series: pd.DataFrame, key: Optional[Tuple] = None, **kwargs) -> FigureSpec:
+    """A cached series chart; key should identify the series (e.g. the selection and range)"""
+    if key is None:
+        return FigureSpec(figure=create_series_chart(series, **kwargs))
+    return _cached_spec(("series", key, tuple(sorted(kwargs.items()))), lambda: create_series_chart(series, **kwargs))